@@ -3,8 +3,10 @@ import google.generativeai as genai
 import streamlit as st
 import logging
 
+from utils.audit_log import configurar_logging
+
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+configurar_logging()
 
 def load_api():
     try:
@@ -1,7 +1,5 @@
 import streamlit as st
-from gdrive.gdrive_upload import GoogleDriveUploader
 from gdrive.config import ADMIN_SHEET_NAME
-import pandas as pd
 
 def is_oidc_available():
     """Verifica se o login OIDC está configurado e disponível"""
@@ -44,6 +42,10 @@ def get_admin_users_by_email():
     Retorna uma lista de e-mails em minúsculas.
     """
     try:
+        # Cliente do Google carregado só quando há um usuário logado a verificar
+        from gdrive.gdrive_upload import GoogleDriveUploader
+        import pandas as pd
+
         uploader = GoogleDriveUploader()
         admin_data = uploader.get_data_from_sheet(ADMIN_SHEET_NAME)
         if not admin_data or len(admin_data) < 2:
@@ -0,0 +1,7 @@
+"""
+Benchmarks e verificações de regressão de desempenho (executados offline).
+
+Uso:
+    python -m benchmarks.calc_bench                 # mede e compara com a baseline
+    python -m benchmarks.calc_bench --salvar        # grava a baseline atual
+"""
@@ -0,0 +1,68 @@
+"""
+Exportação em lote de relatórios: vazão e memória do processo principal.
+
+Exporta lotes de tamanhos crescentes para um ZIP temporário e informa relatórios por
+segundo e o pico de memória alocada no processo principal (tracemalloc), que deve ficar
+constante com o tamanho do lote. Com --pdf-sintetico os workers gravam um PDF de
+tamanho fixo em vez de chamar o WeasyPrint, medindo só o pipeline pool -> ZIP.
+
+    python -m benchmarks.bulk_export_bench [--lotes 20 200] [--workers 2] [--pdf-sintetico]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import tracemalloc
+
+import operations.bulk_export as bulk_export
+from benchmarks.report_bench import DADOS_ICAMENTO, DADOS_GUINDAUTO
+from benchmarks.cargas_sinteticas import pdf_sintetico
+
+
+def _avaliacoes(n):
+    for i in range(n):
+        yield DADOS_ICAMENTO.rename(f"{DADOS_ICAMENTO.name}-{i:05d}"), DADOS_GUINDAUTO
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bulk_export_bench')
+    parser.add_argument('--lotes', type=int, nargs='+', default=[20, 200])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--pdf-sintetico', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.pdf_sintetico:
+        bulk_export._gerar_relatorio_job = pdf_sintetico
+    diretorio = tempfile.mkdtemp(prefix='bulk_export_bench_')
+    os.environ.setdefault('PDF_DIAGRAM_CACHE_DIR', os.path.join(diretorio, 'diagramas'))
+    bulk_export.obter_pool(args.workers)  # criação e aquecimento do pool fora da medição
+
+    picos = []
+    for n in args.lotes:
+        caminho = os.path.join(diretorio, f'lote_{n}.zip')
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        resumo = bulk_export.exportar_relatorios_zip(_avaliacoes(n), caminho, args.workers)
+        decorrido = time.perf_counter() - inicio
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        picos.append(pico)
+        print(f"{n:6d} relatórios: {decorrido:7.2f} s  {resumo['relatorios'] / decorrido:6.1f} relatórios/s  "
+              f"ZIP {resumo['bytes'] / 1024 ** 2:7.1f} MB  pico de memória {pico / 1024 ** 2:5.2f} MB  "
+              f"erros {len(resumo['erros'])}")
+        if resumo['erros']:
+            print(f"      primeiro erro: {resumo['erros'][0][:160]}")
+        os.remove(caminho)
+
+    # A memória não deve acompanhar o tamanho do lote (tolerância para ruído do alocador)
+    if len(picos) > 1 and picos[-1] > 2 * picos[0] + 1024 ** 2:
+        print("FALHA: pico de memória cresce com o tamanho da exportação")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    logging.disable(logging.ERROR)
+    sys.exit(main())
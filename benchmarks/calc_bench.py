@@ -0,0 +1,256 @@
+"""
+Benchmarks do motor de cálculo e dos diagramas.
+
+Mede chamadas escalares e em lote, montagem e serialização do diagrama Plotly e a
+renderização PNG do diagrama do PDF. Antes de medir, confere que os caminhos
+otimizados (lote, memoização, solver e mapa what-if) devolvem os mesmos números
+que o código escalar de referência.
+
+    python -m benchmarks.calc_bench [--salvar] [--limite 1.3] [--filtro lote]
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+import plotly.io
+
+from operations.calc import (
+    LIMITE_SEGURANCA,
+    calcular_carga_total,
+    validar_guindaste,
+    calcular_carga_total_batch,
+    validar_guindaste_batch
+)
+from operations.solver import carga_total_maxima, peso_carga_maximo, raio_maximo, mapa_raio_carga
+from operations.plot import (
+    criar_diagrama_guindaste,
+    criar_diagrama_guindaste_cached,
+    criar_mapa_what_if,
+    criar_dispersao_frota,
+    reduzir_pontos_dispersao,
+    generate_static_diagram_for_pdf,
+    _renderizar_diagrama_pdf,
+    _data_uri,
+    cache_diagramas
+)
+from benchmarks.harness import main_suite
+
+# Caso de referência (operação adequada, fora da zona de atenção)
+CASO = {
+    'peso_carga': 2500.0,
+    'equipamento_novo': True,
+    'peso_acessorios': 120.0,
+    'raio_max': 12.0,
+    'extensao_lanca': 30.0,
+    'capacidade_raio': 8000.0,
+    'capacidade_alcance_max': 6500.0,
+    'angulo_minimo_fabricante': 40.0
+}
+
+TAMANHO_LOTE = 10_000
+TAMANHO_FROTA = 100_000
+SEMENTE = 20240501
+
+
+def _lote_aleatorio(n, semente=SEMENTE):
+    """Entradas aleatórias válidas para validar_guindaste (raio menor que a lança)."""
+    rng = np.random.default_rng(semente)
+    extensao = rng.uniform(5, 60, n)
+    return {
+        'peso_carga': np.round(rng.uniform(1, 10_000, n), 3),
+        'equipamento_novo': rng.random(n) < 0.5,
+        'peso_acessorios': np.round(rng.uniform(0, 100, n), 3),
+        'capacidade_raio': np.round(rng.uniform(1_000, 20_000, n), 3),
+        'capacidade_alcance_max': np.round(rng.uniform(1_000, 20_000, n), 3),
+        'raio_max': np.round(extensao * rng.uniform(0.05, 0.99, n), 3),
+        'extensao_lanca': np.round(extensao, 3),
+        'angulo_minimo_fabricante': np.round(rng.uniform(1, 89, n), 3)
+    }
+
+
+def _frota_aleatoria(n, semente=SEMENTE):
+    """Tabela da frota no formato de history.carregar_dados_frota, com uma cauda de casos extremos."""
+    rng = np.random.default_rng(semente)
+    utilizacao = np.clip(rng.normal(55, 12, n), 1, None)
+    utilizacao[rng.random(n) < 0.001] = rng.uniform(100, 160)
+    return pd.DataFrame({
+        'id': np.char.add('AV', np.arange(n).astype(str)),
+        'angulo': rng.uniform(25, 85, n),
+        'utilizacao': utilizacao,
+        'adequado': utilizacao <= LIMITE_SEGURANCA,
+        'guindaste': rng.choice(['Madal MD 45', 'Imap IM 30', 'Masal MS 20'], n),
+        'empresa': rng.choice(['Empresa A', 'Empresa B'], n)
+    })
+
+
+def _carga_caso():
+    return calcular_carga_total(CASO['peso_carga'], CASO['equipamento_novo'], CASO['peso_acessorios'])
+
+
+def _argumentos_validacao(carga_total):
+    return (
+        carga_total, CASO['capacidade_raio'], CASO['capacidade_alcance_max'],
+        CASO['raio_max'], CASO['extensao_lanca'], CASO['angulo_minimo_fabricante']
+    )
+
+
+# ==================== VERIFICAÇÕES DE EQUIVALÊNCIA ====================
+
+def verificar_lote_igual_escalar(n=2_000):
+    """Funções em lote devolvem exatamente os valores das funções escalares."""
+    e = _lote_aleatorio(n)
+    cargas = calcular_carga_total_batch(e['peso_carga'], e['equipamento_novo'], e['peso_acessorios'])
+    validacoes = validar_guindaste_batch(
+        cargas['carga_total'], e['capacidade_raio'], e['capacidade_alcance_max'],
+        e['raio_max'], e['extensao_lanca'], e['angulo_minimo_fabricante']
+    )
+    for i in range(n):
+        carga = calcular_carga_total(
+            float(e['peso_carga'][i]), bool(e['equipamento_novo'][i]), float(e['peso_acessorios'][i])
+        )
+        for campo, valor in carga.to_dict().items():
+            assert cargas[campo][i] == valor, f"linha {i}, {campo}: {cargas[campo][i]!r} != {valor!r}"
+        validacao = validar_guindaste(
+            carga.carga_total, float(e['capacidade_raio'][i]), float(e['capacidade_alcance_max'][i]),
+            float(e['raio_max'][i]), float(e['extensao_lanca'][i]), float(e['angulo_minimo_fabricante'][i])
+        )
+        for campo in validacoes:
+            assert validacoes[campo][i] == getattr(validacao, campo), (
+                f"linha {i}, {campo}: {validacoes[campo][i]!r} != {getattr(validacao, campo)!r}"
+            )
+
+
+def verificar_limites_solver(n=500):
+    """Limites do solver ficam na fronteira (até o arredondamento) sem violar a validação escalar."""
+    e = _lote_aleatorio(n, semente=SEMENTE + 2)
+    for i in range(n):
+        cap_r, cap_a = float(e['capacidade_raio'][i]), float(e['capacidade_alcance_max'][i])
+        raio, lanca, angulo = (
+            float(e['raio_max'][i]), float(e['extensao_lanca'][i]), float(e['angulo_minimo_fabricante'][i])
+        )
+
+        carga = carga_total_maxima(cap_r, cap_a)
+        assert validar_guindaste(carga, cap_r, cap_a, lanca * 0.01, lanca, 1).porcentagem_segura <= LIMITE_SEGURANCA, \
+            f"carga_total_maxima acima do limite, linha {i}"
+        assert carga >= min(cap_r, cap_a) * LIMITE_SEGURANCA / 100 * (1 - 1e-12), \
+            f"carga_total_maxima abaixo da fronteira, linha {i}"
+
+        novo, acessorios = bool(e['equipamento_novo'][i]), float(e['peso_acessorios'][i])
+        peso = peso_carga_maximo(cap_r, cap_a, novo, acessorios)
+        if peso > 0:
+            carga_peso = calcular_carga_total(peso, novo, acessorios).carga_total
+            assert validar_guindaste(carga_peso, cap_r, cap_a, lanca * 0.01, lanca, 1).porcentagem_segura \
+                <= LIMITE_SEGURANCA, f"peso_carga_maximo acima do limite, linha {i}"
+
+        r = raio_maximo(lanca, angulo)
+        if 0 < r <= lanca:
+            assert validar_guindaste(1.0, 1e9, 1e9, r, lanca, angulo).angulo_lanca >= angulo, \
+                f"raio_maximo viola o ângulo mínimo, linha {i}"
+        assert raio <= lanca
+
+
+def verificar_mapa_igual_escalar():
+    """Células do mapa what-if coincidem com validar_guindaste no mesmo ponto."""
+    lanca, cap_r, cap_a, angulo = CASO['extensao_lanca'], CASO['capacidade_raio'], \
+        CASO['capacidade_alcance_max'], CASO['angulo_minimo_fabricante']
+    raios = np.linspace(lanca / 40, lanca * 0.99, 40)
+    cargas = np.linspace(100, min(cap_r, cap_a) * 1.25, 40)
+    mapa = mapa_raio_carga(raios, cargas, lanca, angulo, cap_r, cap_a)
+    for i, carga in enumerate(cargas):
+        for j, raio in enumerate(raios):
+            validacao = validar_guindaste(float(carga), cap_r, cap_a, float(raio), lanca, angulo)
+            assert mapa['porcentagem_segura'][i, j] == validacao.porcentagem_segura, f"utilização em ({i}, {j})"
+            assert mapa['seguro'][i, j] == validacao.adequado, f"adequação em ({i}, {j})"
+            assert mapa['angulo_lanca'][j] == validacao.angulo_lanca, f"ângulo em {j}"
+
+
+def verificar_diagrama_cache_igual():
+    """Diagrama memoizado serializa igual ao diagrama montado do zero."""
+    carga = _carga_caso().carga_total
+    args = (CASO['raio_max'], CASO['extensao_lanca'], carga, CASO['capacidade_raio'],
+            CASO['angulo_minimo_fabricante'])
+    cache_diagramas.clear()
+    assert criar_diagrama_guindaste_cached(*args).to_json() == criar_diagrama_guindaste(*args).to_json()
+    # Serialização feita pelo st.plotly_chart, que usa o dicionário memoizado
+    assert plotly.io.to_json(criar_diagrama_guindaste_cached(*args), validate=False) == \
+        plotly.io.to_json(criar_diagrama_guindaste(*args), validate=False)
+
+
+def verificar_diagrama_pdf_cache_igual():
+    """Diagrama do PDF lido do cache em disco é idêntico ao rasterizado na hora."""
+    alcance = float(np.sqrt(CASO['extensao_lanca'] ** 2 - CASO['raio_max'] ** 2))
+    args = (CASO['raio_max'], alcance, CASO['angulo_minimo_fabricante'])
+    generate_static_diagram_for_pdf(*args)  # garante a entrada no cache
+    assert generate_static_diagram_for_pdf(*args) == _data_uri(_renderizar_diagrama_pdf(*args))
+
+
+def verificar_reducao_dispersao():
+    """A redução respeita o limite, não altera conjuntos pequenos e mantém células esparsas."""
+    frota = _frota_aleatoria(TAMANHO_FROTA)
+    x, y = frota['angulo'].to_numpy(), frota['utilizacao'].to_numpy()
+    assert np.array_equal(reduzir_pontos_dispersao(x[:500], y[:500], limite=1000), np.arange(500))
+    for limite in (100, 5_000, 20_000):
+        indices = reduzir_pontos_dispersao(x, y, limite=limite)
+        assert len(indices) <= limite and len(np.unique(indices)) == len(indices), f"limite {limite}"
+    indices = reduzir_pontos_dispersao(x, y, limite=20_000)
+    assert y[indices].max() == y.max(), "o ponto de maior utilização foi descartado"
+    fig = criar_dispersao_frota(frota)
+    assert sum(len(trace.x) for trace in fig.data) == len(indices)
+
+
+VERIFICACOES = (
+    verificar_lote_igual_escalar,
+    verificar_limites_solver,
+    verificar_mapa_igual_escalar,
+    verificar_diagrama_cache_igual,
+    verificar_diagrama_pdf_cache_igual,
+    verificar_reducao_dispersao
+)
+
+
+# ==================== BENCHMARKS ====================
+
+def _montar_benchmarks():
+    carga = _carga_caso()
+    args_validacao = _argumentos_validacao(carga.carga_total)
+    args_diagrama = (CASO['raio_max'], CASO['extensao_lanca'], carga.carga_total,
+                     CASO['capacidade_raio'], CASO['angulo_minimo_fabricante'])
+    args_mapa = (CASO['raio_max'], carga.carga_total, CASO['extensao_lanca'], CASO['capacidade_raio'],
+                 CASO['capacidade_alcance_max'], CASO['angulo_minimo_fabricante'])
+    alcance = float(np.sqrt(CASO['extensao_lanca'] ** 2 - CASO['raio_max'] ** 2))
+    figura = criar_diagrama_guindaste(*args_diagrama)
+    lote = _lote_aleatorio(TAMANHO_LOTE)
+    frota = _frota_aleatoria(TAMANHO_FROTA)
+
+    def lote_completo():
+        cargas = calcular_carga_total_batch(lote['peso_carga'], lote['equipamento_novo'], lote['peso_acessorios'])
+        validar_guindaste_batch(
+            cargas['carga_total'], lote['capacidade_raio'], lote['capacidade_alcance_max'],
+            lote['raio_max'], lote['extensao_lanca'], lote['angulo_minimo_fabricante']
+        )
+
+    return {
+        'escalar.calcular_carga_total': lambda: calcular_carga_total(
+            CASO['peso_carga'], CASO['equipamento_novo'], CASO['peso_acessorios']),
+        'escalar.validar_guindaste': lambda: validar_guindaste(*args_validacao),
+        f'lote.carga_e_validacao_{TAMANHO_LOTE}': lote_completo,
+        'diagrama.montagem': lambda: criar_diagrama_guindaste(*args_diagrama),
+        'diagrama.serializacao_json': figura.to_json,
+        'diagrama.cache': lambda: criar_diagrama_guindaste_cached(*args_diagrama),
+        'diagrama.json_cache': lambda: plotly.io.to_json(
+            criar_diagrama_guindaste_cached(*args_diagrama), validate=False),
+        'mapa_what_if.ponto_atual': lambda: criar_mapa_what_if(*args_mapa),
+        f'frota.dispersao_{TAMANHO_FROTA}_json': lambda: criar_dispersao_frota(frota).to_json(),
+        f'frota.dispersao_{TAMANHO_FROTA}_sem_reducao_json': lambda: criar_dispersao_frota(
+            frota, limite=TAMANHO_FROTA).to_json(),
+        'pdf.diagrama_png_renderizacao': lambda: _renderizar_diagrama_pdf(
+            CASO['raio_max'], alcance, CASO['angulo_minimo_fabricante']),
+        'pdf.diagrama_png_cache_disco': lambda: generate_static_diagram_for_pdf(
+            CASO['raio_max'], alcance, CASO['angulo_minimo_fabricante'])
+    }
+
+
+if __name__ == '__main__':
+    # Mede o cálculo, não a escrita dos logs no terminal
+    logging.disable(logging.WARNING)
+    main_suite('calc_bench', _montar_benchmarks(), VERIFICACOES)
@@ -0,0 +1,36 @@
+"""
+Cargas sintéticas para os benchmarks que usam os pools de processos.
+
+Ficam em um módulo importável (e não no script do benchmark, que roda como __main__)
+porque os workers recebem as funções por nome e não importam o __main__ do pai.
+"""
+import os
+import time
+import tempfile
+
+DURACAO_LAYOUT_SINTETICO_S = 1.5
+TAMANHO_PDF_SINTETICO = 150 * 1024
+
+
+def layout_sintetico(segundos=DURACAO_LAYOUT_SINTETICO_S):
+    """CPU em Python puro (segura o GIL), como o layout do WeasyPrint."""
+    fim = time.perf_counter() + segundos
+    total = 0
+    while time.perf_counter() < fim:
+        for i in range(2000):
+            total += i * i
+    return total
+
+
+def job_relatorio_sintetico(dados_icamento, dados_guindauto, renderizador):
+    """Substituto de report_jobs._gerar_relatorio_job."""
+    layout_sintetico()
+    return None, 0
+
+
+def pdf_sintetico(dados_icamento, dados_guindauto, diretorio):
+    """Substituto de bulk_export._gerar_relatorio_job: grava um PDF de tamanho fixo."""
+    fd, caminho = tempfile.mkstemp(dir=diretorio, suffix='.pdf')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(b'%PDF-1.7\n' + os.urandom(TAMANHO_PDF_SINTETICO))
+    return caminho
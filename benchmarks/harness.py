@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+
+# Fator de lentidão tolerado em relação à baseline (1.30 = até 30% mais lento)
+LIMITE_LENTIDAO_PADRAO = 1.30
+
+DIRETORIO_BASELINES = os.path.join(os.path.dirname(__file__), 'baselines')
+
+
+def medir(funcao, repeticoes=7, tempo_minimo=0.05):
+    """
+    Mede o tempo por chamada de uma função sem argumentos.
+
+    O número de chamadas por repetição é calibrado para que cada repetição dure ao
+    menos tempo_minimo segundos; o resultado é a mediana entre as repetições.
+
+    Returns:
+        dict: 'mediana_s' e 'minimo_s' (segundos por chamada) e 'chamadas' por repetição
+    """
+    chamadas = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(chamadas):
+            funcao()
+        decorrido = time.perf_counter() - inicio
+        if decorrido >= tempo_minimo or chamadas >= 1_000_000:
+            break
+        chamadas *= 2 if decorrido <= 0 else max(2, min(10, int(tempo_minimo / decorrido) + 1))
+
+    amostras = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for _ in range(chamadas):
+            funcao()
+        amostras.append((time.perf_counter() - inicio) / chamadas)
+
+    return {
+        'mediana_s': statistics.median(amostras),
+        'minimo_s': min(amostras),
+        'chamadas': chamadas
+    }
+
+
+def caminho_baseline(nome_suite):
+    """Arquivo JSON padrão da baseline de uma suíte."""
+    return os.path.join(DIRETORIO_BASELINES, f'{nome_suite}.json')
+
+
+def salvar_baseline(caminho, resultados):
+    """Grava os resultados como baseline, com a identificação do ambiente."""
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    dados = {
+        'gerado_em': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'resultados': resultados
+    }
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False, indent=2)
+
+
+def carregar_baseline(caminho):
+    """Lê a baseline gravada; retorna None se o arquivo não existir."""
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)['resultados']
+
+
+def comparar(resultados, baseline, limite_lentidao=LIMITE_LENTIDAO_PADRAO):
+    """
+    Compara as medianas atuais com a baseline.
+
+    Returns:
+        list[dict]: Uma linha por benchmark com 'nome', 'atual_s', 'baseline_s',
+                    'razao' e 'regressao' (razão acima do limite)
+    """
+    linhas = []
+    for nome, medida in resultados.items():
+        referencia = (baseline or {}).get(nome)
+        razao = medida['mediana_s'] / referencia['mediana_s'] if referencia else None
+        linhas.append({
+            'nome': nome,
+            'atual_s': medida['mediana_s'],
+            'baseline_s': referencia['mediana_s'] if referencia else None,
+            'razao': razao,
+            'regressao': razao is not None and razao > limite_lentidao
+        })
+    return linhas
+
+
+def _formatar_tempo(segundos):
+    if segundos is None:
+        return '-'
+    if segundos < 1e-3:
+        return f'{segundos * 1e6:9.1f} µs'
+    if segundos < 1:
+        return f'{segundos * 1e3:9.2f} ms'
+    return f'{segundos:9.3f} s '
+
+
+def imprimir_relatorio(linhas, limite_lentidao):
+    largura = max([len(linha['nome']) for linha in linhas] + [9])
+    print(f"{'benchmark':<{largura}}  {'atual':>12}  {'baseline':>12}  {'razão':>6}")
+    for linha in linhas:
+        razao = f"{linha['razao']:.2f}" if linha['razao'] is not None else '-'
+        marca = '  << REGRESSÃO' if linha['regressao'] else ''
+        print(
+            f"{linha['nome']:<{largura}}  {_formatar_tempo(linha['atual_s']):>12}  "
+            f"{_formatar_tempo(linha['baseline_s']):>12}  {razao:>6}{marca}"
+        )
+    print(f"(limite de lentidão: {limite_lentidao:.2f}x)")
+
+
+def executar_suite(nome_suite, benchmarks, verificacoes=(), argv=None):
+    """
+    Ponto de entrada comum das suítes.
+
+    Executa as verificações de equivalência (qualquer falha encerra com código 1),
+    mede os benchmarks e compara com a baseline, ou grava a baseline com --salvar.
+
+    Args:
+        nome_suite (str): Nome da suíte (define o arquivo padrão da baseline)
+        benchmarks (dict): nome -> função sem argumentos a ser medida
+        verificacoes (iterable): Funções sem argumentos que levantam AssertionError em divergência
+        argv (list): Argumentos da linha de comando (padrão: sys.argv)
+
+    Returns:
+        int: Código de saída (0 = ok, 1 = divergência ou regressão)
+    """
+    parser = argparse.ArgumentParser(prog=f'python -m benchmarks.{nome_suite}')
+    parser.add_argument('--baseline', default=caminho_baseline(nome_suite),
+                        help='Arquivo JSON da baseline')
+    parser.add_argument('--salvar', action='store_true',
+                        help='Grava os resultados atuais como baseline')
+    parser.add_argument('--limite', type=float,
+                        default=float(os.getenv('BENCH_LIMITE_LENTIDAO', LIMITE_LENTIDAO_PADRAO)),
+                        help='Fator de lentidão tolerado (ex.: 1.3 = 30%% mais lento)')
+    parser.add_argument('--repeticoes', type=int, default=7)
+    parser.add_argument('--filtro', default='', help='Executa apenas benchmarks cujo nome contém o texto')
+    parser.add_argument('--sem-verificacao', action='store_true',
+                        help='Pula as verificações de equivalência numérica')
+    args = parser.parse_args(argv)
+
+    if not args.sem_verificacao:
+        for verificacao in verificacoes:
+            try:
+                verificacao()
+            except AssertionError as e:
+                print(f"FALHA de equivalência em {verificacao.__name__}: {e}")
+                return 1
+            print(f"ok  {verificacao.__name__}")
+
+    resultados = {}
+    for nome, funcao in benchmarks.items():
+        if args.filtro in nome:
+            resultados[nome] = medir(funcao, repeticoes=args.repeticoes)
+
+    if args.salvar:
+        salvar_baseline(args.baseline, resultados)
+        print(f"Baseline gravada em {args.baseline}")
+        imprimir_relatorio(comparar(resultados, None), args.limite)
+        return 0
+
+    baseline = carregar_baseline(args.baseline)
+    if baseline is None:
+        print(f"Nenhuma baseline em {args.baseline}; use --salvar para criá-la.")
+    linhas = comparar(resultados, baseline, args.limite)
+    imprimir_relatorio(linhas, args.limite)
+    return 1 if any(linha['regressao'] for linha in linhas) else 0
+
+
+def main_suite(*args, **kwargs):
+    sys.exit(executar_suite(*args, **kwargs))
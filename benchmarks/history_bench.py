@@ -0,0 +1,134 @@
+"""
+Benchmarks da busca por ID no histórico.
+
+Compara a busca antiga (uma máscara booleana sobre cada aba inteira) com o índice por
+ID e a visão pré-unida de operations.history_index, em abas com centenas de milhares
+de avaliações. Antes de medir, confere que o índice devolve as mesmas linhas que as
+máscaras, inclusive com IDs repetidos e avaliações presentes em só uma das abas.
+
+As tabelas paginadas (operations.history_table) são medidas pela serialização em Arrow,
+o que o st.dataframe envia ao navegador: uma página contra a aba inteira, além do
+filtro e da ordenação completos, feitos uma vez e guardados em cache.
+
+    python -m benchmarks.history_bench [--salvar] [--limite 1.3] [--filtro busca]
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+
+from operations.history_index import IndiceAvaliacoes
+from operations.history_table import ordem_linhas, fatia_pagina, chave_ordenacao, TAMANHO_PAGINA_PADRAO
+from benchmarks.harness import main_suite
+
+TAMANHO_HISTORICO = 300_000
+TAMANHO_LOTE_EXPORTACAO = 1_000
+SEMENTE = 20240501
+
+
+def _abas_aleatorias(n, semente=SEMENTE):
+    """Abas de içamento e de guindauto como lidas da planilha (só texto), com IDs repetidos e órfãos."""
+    rng = np.random.default_rng(semente)
+    ids = np.array([f"AV20240101-{i:08x}" for i in range(n)], dtype=object)
+    lifting = pd.DataFrame({
+        'ID Avaliação': ids,
+        'Data': '2024-01-01 10:00:00',
+        'Raio Máximo (m)': rng.uniform(1, 30, n).round(2).astype(str),
+        'Alcance Máximo (m)': rng.uniform(30, 60, n).round(2).astype(str),
+        'Carga Total (kg)': rng.uniform(100, 9000, n).round(2).astype(str),
+        '% Utilização Raio': [f"{v:.1f}%" for v in rng.uniform(1, 100, n)],
+        'Adequado': np.where(rng.random(n) < 0.8, 'TRUE', 'FALSE')
+    })
+    # ~1% das avaliações sem linha de guindauto e algumas gravadas duas vezes
+    crane_ids = ids[rng.random(n) >= 0.01]
+    crane = pd.DataFrame({
+        'ID Avaliação': np.concatenate([crane_ids, crane_ids[:50]]),
+        'Empresa': np.resize(np.array(['ACME', 'Içamentos SA', 'Norte Guindastes'], dtype=object),
+                             len(crane_ids) + 50),
+        'Placa Guindaste': 'ABC1D23'
+    })
+    return lifting, crane
+
+
+def _busca_mascara(df_lifting, df_crane, id_avaliacao):
+    """Busca da página antes do índice: duas varreduras completas por consulta."""
+    result_lifting = df_lifting[df_lifting[df_lifting.columns[0]] == id_avaliacao]
+    result_crane = df_crane[df_crane.iloc[:, 0] == id_avaliacao]
+    if result_lifting.empty or result_crane.empty:
+        return None
+    return result_lifting.iloc[0].rename(id_avaliacao), result_crane.iloc[0]
+
+
+def verificar_indice_igual_mascara():
+    """O índice devolve as mesmas linhas que as máscaras (primeira ocorrência de cada aba)."""
+    lifting, crane = _abas_aleatorias(20_000)
+    lifting = pd.concat([lifting, lifting.iloc[:10].assign(Adequado='DUPLICADA')], ignore_index=True)
+    indice = IndiceAvaliacoes(lifting, crane)
+    rng = np.random.default_rng(SEMENTE)
+    amostra = list(rng.choice(lifting.iloc[:, 0].to_numpy(), 500)) + list(crane.iloc[:60, 0]) + ['inexistente', None]
+    for id_avaliacao in amostra:
+        esperado, obtido = _busca_mascara(lifting, crane, id_avaliacao), indice.par(id_avaliacao)
+        assert (esperado is None) == (obtido is None), f"presença divergente para {id_avaliacao}"
+        if esperado is not None:
+            for a, b in zip(esperado, obtido):
+                assert list(a.items()) == list(b.items()) and a.name == b.name, f"linhas divergentes para {id_avaliacao}"
+    pares = list(indice.pares(amostra))
+    assert len(pares) == sum(_busca_mascara(lifting, crane, i) is not None for i in amostra)
+
+
+def verificar_paginacao():
+    """Páginas cobrem o resultado sem repetição; filtro e ordenação numérica/textual conferem."""
+    lifting, _ = _abas_aleatorias(5_000)
+    lifting.loc[[3, 10], 'Carga Total (kg)'] = ['', None]
+    posicoes = ordem_linhas(lifting, coluna_ordem='Carga Total (kg)', crescente=False)
+    assert sorted(posicoes) == list(range(len(lifting)))
+    cargas = lifting['Carga Total (kg)'].iloc[posicoes]
+    numeros = pd.to_numeric(cargas.iloc[:-2])
+    assert numeros.is_monotonic_decreasing and set(posicoes[-2:]) == {3, 10}, "vazias devem ficar no fim"
+    paginas = [fatia_pagina(lifting, posicoes, p, TAMANHO_PAGINA_PADRAO) for p in range(1, 102)]
+    assert pd.concat(paginas).index.tolist() == lifting.index[posicoes].tolist()
+
+    filtradas = ordem_linhas(lifting, 'Adequado', 'fal', 'ID Avaliação', crescente=True)
+    assert (lifting['Adequado'].iloc[filtradas] == 'FALSE').all()
+    assert len(filtradas) == (lifting['Adequado'] == 'FALSE').sum()
+    assert lifting['ID Avaliação'].iloc[filtradas].is_monotonic_increasing
+
+    chave, _ = chave_ordenacao(pd.Series(['b', 'A', '10']))
+    assert chave.dtype == object, "coluna com texto deve ser ordenada como texto"
+
+
+VERIFICACOES = (
+    verificar_indice_igual_mascara,
+    verificar_paginacao
+)
+
+
+# ==================== BENCHMARKS ====================
+
+def _montar_benchmarks():
+    lifting, crane = _abas_aleatorias(TAMANHO_HISTORICO)
+    indice = IndiceAvaliacoes(lifting, crane)
+    alvo = lifting.iloc[TAMANHO_HISTORICO * 3 // 4, 0]
+    lote = list(lifting.iloc[::TAMANHO_HISTORICO // TAMANHO_LOTE_EXPORTACAO, 0])
+    ordem = ordem_linhas(lifting, coluna_ordem='Carga Total (kg)', crescente=False)
+    pagina_meio = len(ordem) // TAMANHO_PAGINA_PADRAO // 2
+
+    return {
+        f'historico.busca_mascara_{TAMANHO_HISTORICO}': lambda: _busca_mascara(lifting, crane, alvo),
+        f'historico.busca_indice_{TAMANHO_HISTORICO}': lambda: indice.par(alvo),
+        f'historico.montagem_indice_{TAMANHO_HISTORICO}': lambda: IndiceAvaliacoes(lifting, crane),
+        f'historico.pares_exportacao_{TAMANHO_LOTE_EXPORTACAO}': lambda: list(indice.pares(lote)),
+        f'tabela.completa_arrow_{TAMANHO_HISTORICO}': lambda: convert_pandas_df_to_arrow_bytes(lifting),
+        f'tabela.pagina_arrow_{TAMANHO_HISTORICO}': lambda: convert_pandas_df_to_arrow_bytes(
+            fatia_pagina(lifting, ordem, pagina_meio, TAMANHO_PAGINA_PADRAO)),
+        f'tabela.ordenacao_numerica_{TAMANHO_HISTORICO}': lambda: ordem_linhas(
+            lifting, coluna_ordem='Carga Total (kg)', crescente=False),
+        f'tabela.filtro_texto_{TAMANHO_HISTORICO}': lambda: ordem_linhas(lifting, 'ID Avaliação', '0000ff')
+    }
+
+
+if __name__ == '__main__':
+    logging.disable(logging.WARNING)
+    main_suite('history_bench', _montar_benchmarks(), VERIFICACOES)
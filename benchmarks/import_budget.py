@@ -0,0 +1,143 @@
+"""
+Relatório de tempo de importação por página, com orçamento (baseado em -X importtime).
+
+Cada página é importada em um processo Python novo, como no início a frio do servidor.
+A verificação falha quando o tempo total excede o orçamento da página ou quando a
+página carrega um módulo proibido para ela (por exemplo, o acesso de demonstração não
+pode importar as bibliotecas de IA, Drive e PDF).
+
+    python -m benchmarks.import_budget [--repeticoes 3] [--orcamento demo=1500] [--top 15]
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+DIRETORIO_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos importados por página (a partir de main, como o Streamlit executa o app)
+PAGINAS = {
+    'main': ['main'],
+    'demo': ['main', 'operations.demo_page'],
+    'calculadora': ['main', 'operations.front'],
+    'historico': ['main', 'operations.history']
+}
+
+# Orçamento de importação a frio por página, em milissegundos
+ORCAMENTOS_MS = {
+    'main': 1500,
+    'demo': 1800,
+    'calculadora': 3000,
+    'historico': 3000
+}
+
+# Bibliotecas pesadas que só devem ser carregadas quando a funcionalidade que as usa é executada
+PROIBIDOS = {
+    'main': ['google.generativeai', 'googleapiclient', 'gspread', 'weasyprint', 'matplotlib', 'pandas'],
+    'demo': ['google.generativeai', 'googleapiclient', 'gspread', 'weasyprint', 'matplotlib'],
+    'calculadora': ['weasyprint', 'matplotlib', 'google.generativeai', 'googleapiclient', 'gspread'],
+    'historico': ['weasyprint', 'matplotlib', 'google.generativeai', 'googleapiclient', 'gspread']
+}
+
+_SCRIPT = """
+import sys, json, importlib
+erro = None
+try:
+    for modulo in {modulos!r}:
+        importlib.import_module(modulo)
+except Exception as e:
+    erro = f"{{e.__class__.__name__}}: {{e}}"
+print(json.dumps({{'carregados': [m for m in {proibidos!r} if m in sys.modules], 'erro': erro}}))
+"""
+
+
+def _parse_importtime(saida_erro):
+    """Lê as linhas de -X importtime: retorna {modulo: cumulativo_us} e o total do nível superior."""
+    cumulativos = {}
+    total = 0
+    for linha in saida_erro.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        _, cumulativo, nome = linha[len('import time:'):].split('|')
+        cumulativo = int(cumulativo)
+        modulo = nome.rstrip()
+        if not modulo.startswith(' '):
+            continue
+        profundidade = len(modulo) - len(modulo.lstrip(' '))
+        modulo = modulo.strip()
+        cumulativos[modulo] = max(cumulativo, cumulativos.get(modulo, 0))
+        if profundidade == 1:
+            total += cumulativo
+    return cumulativos, total
+
+
+def medir_pagina(pagina, repeticoes=3):
+    """
+    Importa a página em processos novos e retorna a medição mais rápida.
+
+    Returns:
+        dict: 'total_ms', 'modulos' ({modulo: ms cumulativo}), 'proibidos_carregados' e 'erro'
+    """
+    script = _SCRIPT.format(modulos=PAGINAS[pagina], proibidos=PROIBIDOS.get(pagina, []))
+    melhor = None
+    for _ in range(repeticoes):
+        processo = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            cwd=DIRETORIO_RAIZ, capture_output=True, text=True
+        )
+        cumulativos, total = _parse_importtime(processo.stderr)
+        try:
+            resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+        except (IndexError, json.JSONDecodeError):
+            resultado = {'carregados': [], 'erro': processo.stderr.strip().splitlines()[-1:]}
+        medicao = {
+            'total_ms': total / 1000,
+            'modulos': {m: us / 1000 for m, us in cumulativos.items()},
+            'proibidos_carregados': resultado['carregados'],
+            'erro': resultado['erro']
+        }
+        if melhor is None or medicao['total_ms'] < melhor['total_ms']:
+            melhor = medicao
+    return melhor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.import_budget')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--orcamento', action='append', default=[], metavar='PAGINA=MS',
+                        help='Sobrescreve o orçamento de uma página (pode ser repetido)')
+    parser.add_argument('--top', type=int, default=10, help='Módulos mais lentos listados por página')
+    parser.add_argument('--paginas', nargs='*', default=list(PAGINAS), choices=list(PAGINAS))
+    args = parser.parse_args(argv)
+
+    orcamentos = dict(ORCAMENTOS_MS)
+    for item in args.orcamento:
+        pagina, valor = item.split('=', 1)
+        orcamentos[pagina] = float(valor)
+
+    falhas = 0
+    for pagina in args.paginas:
+        medicao = medir_pagina(pagina, args.repeticoes)
+        orcamento = orcamentos[pagina]
+        problemas = []
+        if medicao['erro']:
+            problemas.append(f"erro de importação ({medicao['erro']})")
+        if medicao['total_ms'] > orcamento:
+            problemas.append(f"acima do orçamento de {orcamento:.0f} ms")
+        if medicao['proibidos_carregados']:
+            problemas.append(f"carregou {', '.join(medicao['proibidos_carregados'])}")
+
+        status = 'FALHA' if problemas else 'ok'
+        print(f"{status:<5} {pagina:<12} {medicao['total_ms']:8.0f} ms / {orcamento:.0f} ms"
+              + (f"  <- {'; '.join(problemas)}" if problemas else ""))
+        mais_lentos = sorted(medicao['modulos'].items(), key=lambda item: item[1], reverse=True)
+        for modulo, ms in mais_lentos[:args.top]:
+            print(f"        {ms:8.1f} ms  {modulo}")
+        falhas += bool(problemas)
+
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
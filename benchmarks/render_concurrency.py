@@ -0,0 +1,96 @@
+"""
+Teste de concorrência do renderizador estático dos diagramas do PDF.
+
+Renderiza centenas de diagramas ao mesmo tempo (threads ou processos) e confere que
+cada PNG é idêntico, byte a byte, ao renderizado em série para as mesmas entradas.
+O cache em disco não é usado: todas as imagens são rasterizadas de fato.
+
+    python -m benchmarks.render_concurrency [--diagramas 300] [--workers 16] [--processos]
+"""
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+
+from operations.plot import _renderizar_diagrama_pdf
+
+SEMENTE = 20240502
+
+
+def _casos(n_distintos, semente=SEMENTE):
+    """Entradas distintas (raio, alcance, ângulo mínimo), incluindo casos de dados insuficientes."""
+    rng = np.random.default_rng(semente)
+    casos = [
+        (float(np.round(rng.uniform(2, 40), 2)), float(np.round(rng.uniform(2, 50), 2)), float(rng.integers(20, 80)))
+        for _ in range(n_distintos - 2)
+    ]
+    return casos + [(0.0, 10.0, 40.0), (10.0, 0.0, 40.0)]
+
+
+def executar(n_diagramas=300, n_workers=16, n_distintos=24, processos=False):
+    """
+    Returns:
+        dict: 'diagramas', 'divergentes', 'erros', 'tempo_serial_s' (por diagrama),
+              'tempo_paralelo_s' (total) e 'diagramas_por_s'
+    """
+    casos = _casos(n_distintos)
+
+    inicio = time.perf_counter()
+    referencia = {caso: _renderizar_diagrama_pdf(*caso) for caso in casos}
+    tempo_serial = (time.perf_counter() - inicio) / len(casos)
+
+    tarefas = [casos[i % len(casos)] for i in range(n_diagramas)]
+    executor_cls = ProcessPoolExecutor if processos else ThreadPoolExecutor
+    divergentes = 0
+    erros = []
+    inicio = time.perf_counter()
+    with executor_cls(max_workers=n_workers) as executor:
+        futuros = [(caso, executor.submit(_renderizar_diagrama_pdf, *caso)) for caso in tarefas]
+        for caso, futuro in futuros:
+            try:
+                if futuro.result() != referencia[caso]:
+                    divergentes += 1
+            except Exception as e:
+                erros.append(f"{caso}: {e!r}")
+    tempo_paralelo = time.perf_counter() - inicio
+
+    return {
+        'diagramas': n_diagramas,
+        'divergentes': divergentes,
+        'erros': erros,
+        'tempo_serial_s': tempo_serial,
+        'tempo_paralelo_s': tempo_paralelo,
+        'diagramas_por_s': n_diagramas / tempo_paralelo
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.render_concurrency')
+    parser.add_argument('--diagramas', type=int, default=300)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--distintos', type=int, default=24, help='Quantidade de entradas distintas')
+    parser.add_argument('--processos', action='store_true', help='Usa processos em vez de threads')
+    args = parser.parse_args(argv)
+
+    resultado = executar(args.diagramas, args.workers, args.distintos, args.processos)
+    modo = 'processos' if args.processos else 'threads'
+    print(
+        f"{resultado['diagramas']} diagramas em {args.workers} {modo}: "
+        f"{resultado['tempo_paralelo_s']:.2f} s ({resultado['diagramas_por_s']:.1f} diagramas/s; "
+        f"serial: {resultado['tempo_serial_s'] * 1e3:.0f} ms por diagrama)"
+    )
+    for erro in resultado['erros'][:10]:
+        print(f"ERRO {erro}")
+    if resultado['divergentes'] or resultado['erros']:
+        print(f"FALHA: {resultado['divergentes']} divergentes, {len(resultado['erros'])} erros")
+        return 1
+    print("ok  todos os PNGs idênticos à renderização em série")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.disable(logging.WARNING)
+    sys.exit(main())
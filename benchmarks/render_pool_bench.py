@@ -0,0 +1,66 @@
+"""
+Escalabilidade da renderização em lote de diagramas (pool de processos).
+
+Renderiza o mesmo lote de diagramas distintos, sem cache, com 1, 2, 4, ... processos
+(até o número de CPUs) e informa vazão, aceleração e eficiência em relação a 1 processo.
+O tempo de criação e aquecimento do pool não entra na medição.
+
+    python -m benchmarks.render_pool_bench [--diagramas 64] [--max-workers 8]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+
+import numpy as np
+
+
+def _lote(n, semente=20240503):
+    rng = np.random.default_rng(semente)
+    return [
+        (float(np.round(rng.uniform(2, 40), 3)), float(np.round(rng.uniform(2, 50), 3)), float(rng.integers(20, 80)))
+        for _ in range(n)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.render_pool_bench')
+    parser.add_argument('--diagramas', type=int, default=64)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--formato', default='png', choices=['png', 'svg'])
+    args = parser.parse_args(argv)
+
+    # Cache em disco temporário, limpo antes de cada rodada: todos os diagramas são renderizados
+    os.environ['PDF_DIAGRAM_CACHE_DIR'] = tempfile.mkdtemp(prefix='render_pool_bench_')
+    from operations.plot import obter_cache_diagramas_pdf
+    from operations.render_pool import obter_pool, renderizar_diagramas, encerrar_pool
+
+    lote = _lote(args.diagramas)
+    workers = [1]
+    while workers[-1] * 2 <= args.max_workers:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != args.max_workers:
+        workers.append(args.max_workers)
+
+    base = None
+    print(f"{args.diagramas} diagramas {args.formato}, {os.cpu_count()} CPUs")
+    for n in workers:
+        obter_pool(n)
+        obter_cache_diagramas_pdf(args.formato).clear()
+        inicio = time.perf_counter()
+        recebidos = sum(1 for _ in renderizar_diagramas(lote, args.formato, n))
+        decorrido = time.perf_counter() - inicio
+        assert recebidos == len(lote)
+        vazao = len(lote) / decorrido
+        base = base or vazao
+        print(f"{n:3d} processos: {decorrido:7.2f} s  {vazao:6.1f} diagramas/s  "
+              f"aceleração {vazao / base:4.2f}x  eficiência {vazao / base / n:5.0%}")
+    encerrar_pool()
+    return 0
+
+
+if __name__ == '__main__':
+    logging.disable(logging.WARNING)
+    sys.exit(main())
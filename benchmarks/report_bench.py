@@ -0,0 +1,115 @@
+"""
+Benchmark do relatório PDF: compara os renderizadores do diagrama (PNG x SVG).
+
+Para cada renderizador mede o tempo de renderização do diagrama e o tempo de geração
+do PDF com o diagrama já no cache em disco e renderizado do zero, e informa os
+tamanhos da imagem e do PDF resultante. Mede também a renderização do template HTML e
+o preparo de CSS e fontes que antes era refeito a cada relatório (hoje feito uma vez
+por processo). Usa um cache em disco temporário, isolado do cache da aplicação.
+
+    python -m benchmarks.report_bench [--salvar] [--limite 1.3]
+"""
+import os
+import logging
+import tempfile
+
+import pandas as pd
+
+from operations.plot import _renderizar_diagrama_pdf, obter_cache_diagramas_pdf, TIPOS_MIME_DIAGRAMA
+from operations.report_generator import get_report_html, get_report_css
+from benchmarks.harness import main_suite
+
+# Linha de exemplo nas colunas das abas do histórico
+DADOS_ICAMENTO = pd.Series({
+    'Peso Carga (kg)': 2500.0,
+    'Margem Segurança (%)': 10.0,
+    'Peso Segurança (kg)': 250.0,
+    'Peso Cabos (kg)': 82.5,
+    'Peso Acessórios (kg)': 120.0,
+    'Carga Total (kg)': 2952.5,
+    'Adequado': 'TRUE',
+    '% Utilização Raio': '36.9%',
+    '% Utilização Alcance': '45.4%',
+    'Fabricante Guindaste': 'Liebherr',
+    'Nome Guindaste': 'LTM 1050',
+    'Raio Máximo (m)': 12.0,
+    'Alcance Máximo (m)': 27.5,
+    'Ângulo Mínimo da Lança': 40.0
+}, name='AV20240101-bench000')
+
+DADOS_GUINDAUTO = pd.Series({
+    'Empresa': 'Empresa Exemplo',
+    'Nome Operador': 'Operador Exemplo',
+    'Placa Guindaste': 'ABC1D23'
+}, name='AV20240101-bench000')
+
+ARGS_DIAGRAMA = (
+    DADOS_ICAMENTO['Raio Máximo (m)'], DADOS_ICAMENTO['Alcance Máximo (m)'], DADOS_ICAMENTO['Ângulo Mínimo da Lança']
+)
+
+
+def _carregar_gerador():
+    """generate_abnt_report, ou None se as bibliotecas nativas do WeasyPrint não estiverem instaladas."""
+    try:
+        import weasyprint  # noqa: F401 (o gerador só importa o WeasyPrint ao gerar o PDF)
+    except (ImportError, OSError) as e:
+        print(f"WeasyPrint indisponível ({e.__class__.__name__}); medindo apenas diagramas e HTML.")
+        return None
+    from operations.report_generator import generate_abnt_report
+    return generate_abnt_report
+
+
+def _preparo_css_fontes():
+    """O que cada relatório fazia antes de o CSS e as fontes serem compartilhados."""
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    fontes = FontConfiguration()
+    return CSS(string=get_report_css(), font_config=fontes)
+
+
+def _montar_benchmarks(gerar_relatorio):
+    contexto = {
+        "id_avaliacao": DADOS_ICAMENTO.name,
+        "cidade": "Barueri, SP",
+        "data_emissao": "01 de janeiro de 2024",
+        "dados_icamento": DADOS_ICAMENTO,
+        "dados_guindauto": DADOS_GUINDAUTO,
+        "diagrama_base64": "data:image/png;base64,"
+    }
+    benchmarks = {'relatorio.html_template': lambda: get_report_html(contexto)}
+    if gerar_relatorio is not None:
+        benchmarks['relatorio.preparo_css_fontes_por_chamada'] = _preparo_css_fontes
+    for formato in TIPOS_MIME_DIAGRAMA:
+        benchmarks[f'diagrama.{formato}'] = (lambda f: lambda: _renderizar_diagrama_pdf(*ARGS_DIAGRAMA, f))(formato)
+        if gerar_relatorio is None:
+            continue
+
+        def com_cache(f=formato):
+            return gerar_relatorio(DADOS_ICAMENTO, DADOS_GUINDAUTO, f)
+
+        def sem_cache(f=formato):
+            obter_cache_diagramas_pdf(f).clear()
+            return gerar_relatorio(DADOS_ICAMENTO, DADOS_GUINDAUTO, f)
+
+        benchmarks[f'relatorio.{formato}.diagrama_em_cache'] = com_cache
+        benchmarks[f'relatorio.{formato}.diagrama_novo'] = sem_cache
+    return benchmarks
+
+
+def imprimir_tamanhos(gerar_relatorio):
+    for formato in TIPOS_MIME_DIAGRAMA:
+        linha = f"{formato}: diagrama {len(_renderizar_diagrama_pdf(*ARGS_DIAGRAMA, formato)) / 1024:.1f} KiB"
+        if gerar_relatorio is not None:
+            pdf = gerar_relatorio(DADOS_ICAMENTO, DADOS_GUINDAUTO, formato)
+            assert pdf.startswith(b'%PDF'), f"saída inválida com o renderizador {formato}"
+            linha += f", PDF {len(pdf) / 1024:.1f} KiB"
+        print(linha)
+
+
+if __name__ == '__main__':
+    logging.disable(logging.WARNING)
+    os.environ['PDF_DIAGRAM_CACHE_DIR'] = tempfile.mkdtemp(prefix='report_bench_')
+    gerador = _carregar_gerador()
+    imprimir_tamanhos(gerador)
+    main_suite('report_bench', _montar_benchmarks(gerador))
@@ -0,0 +1,180 @@
+"""
+Teste de carga: latência das outras sessões enquanto relatórios PDF são gerados.
+
+Várias threads simulam sessões do Streamlit reexecutando a calculadora (cálculo,
+validação e diagrama serializado, com uma pausa entre execuções). A latência dessas
+reexecuções é medida em quatro fases:
+
+    sem_relatorios        nenhum relatório em geração (referência)
+    partida_do_pool       relatórios enviados sem pool criado: o pool de processos é
+                          criado e aquecido durante a medição (partida a frio)
+    relatorios_na_thread  relatórios gerados em uma thread do próprio servidor (modo antigo)
+    relatorios_no_pool    relatórios enviados ao pool de processos já aquecido
+
+Na partida a frio também são medidos o tempo de enviar_relatorio (a thread da sessão
+que pede o relatório) e o tempo até o primeiro relatório ficar pronto. A verificação
+falha se o p95 de uma das fases com o pool passar de --limite vezes o p95 de referência. Sem as bibliotecas nativas do WeasyPrint (ou com --layout-sintetico), o
+layout é substituído por um laço em Python puro de duração equivalente, que segura o
+GIL da mesma forma.
+
+    python -m benchmarks.report_load [--sessoes 4] [--duracao 8] [--limite 1.5]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+
+from operations.calc import calcular_carga_total, validar_guindaste
+from operations.plot import criar_diagrama_guindaste
+from benchmarks.report_bench import DADOS_ICAMENTO, DADOS_GUINDAUTO
+from benchmarks.cargas_sinteticas import layout_sintetico, job_relatorio_sintetico
+
+PAUSA_ENTRE_EXECUCOES_S = 0.05
+
+
+def _rerun_simulado():
+    """Trabalho de uma reexecução da calculadora em outra sessão."""
+    carga = calcular_carga_total(2500.0, True, 120.0)
+    validar_guindaste(carga.carga_total, 8000.0, 6500.0, 12.0, 30.0, 40.0)
+    criar_diagrama_guindaste(12.0, 30.0, carga.carga_total, 8000.0, 40.0).to_json()
+
+
+def _medir_sessoes(n_sessoes, duracao, parar_carga=None):
+    latencias = []
+    lock = threading.Lock()
+    fim = time.perf_counter() + duracao
+
+    def sessao():
+        locais = []
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            _rerun_simulado()
+            locais.append(time.perf_counter() - inicio)
+            time.sleep(PAUSA_ENTRE_EXECUCOES_S)
+        with lock:
+            latencias.extend(locais)
+
+    threads = [threading.Thread(target=sessao) for _ in range(n_sessoes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if parar_carga:
+        parar_carga()
+    return np.array(latencias)
+
+
+def _carga_na_thread(gerar):
+    parar = threading.Event()
+
+    def laco():
+        while not parar.is_set():
+            gerar()
+
+    thread = threading.Thread(target=laco, daemon=True)
+    thread.start()
+    return lambda: (parar.set(), thread.join())
+
+
+def _carga_no_pool(report_jobs, n_workers, envios=None):
+    """
+    Mantém n_workers relatórios em geração no pool. Se dada, a lista `envios` recebe
+    (ID do job, duração de enviar_relatorio) de cada envio.
+    """
+    parar = threading.Event()
+
+    def laco():
+        contador = 0
+        ativos = []
+        while not parar.is_set():
+            ativos = [j for j in ativos if report_jobs.status_relatorio(j)['estado'] in ('pendente', 'executando')]
+            while len(ativos) < n_workers:
+                contador += 1
+                inicio = time.perf_counter()
+                ativos.append(report_jobs.enviar_relatorio(DADOS_ICAMENTO.rename(f"carga-{contador}"), DADOS_GUINDAUTO))
+                if envios is not None:
+                    envios.append((ativos[-1], time.perf_counter() - inicio))
+            time.sleep(0.1)
+
+    thread = threading.Thread(target=laco, daemon=True)
+    thread.start()
+    return lambda: (parar.set(), thread.join())
+
+
+def _resumo(latencias):
+    return {
+        'execucoes': len(latencias),
+        'p50_ms': float(np.percentile(latencias, 50) * 1e3),
+        'p95_ms': float(np.percentile(latencias, 95) * 1e3),
+        'max_ms': float(latencias.max() * 1e3)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.report_load')
+    parser.add_argument('--sessoes', type=int, default=4)
+    parser.add_argument('--duracao', type=float, default=8.0, help='Segundos por fase')
+    parser.add_argument('--limite', type=float, default=1.5, help='p95 máximo da fase com pool / p95 de referência')
+    parser.add_argument('--layout-sintetico', action='store_true')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('PDF_REPORT_CACHE_DIR', tempfile.mkdtemp(prefix='report_load_'))
+    os.environ.setdefault('PDF_DIAGRAM_CACHE_DIR', tempfile.mkdtemp(prefix='report_load_'))
+    import operations.report_jobs as report_jobs
+
+    sintetico = args.layout_sintetico
+    if not sintetico:
+        try:
+            import weasyprint  # noqa: F401
+        except (ImportError, OSError) as e:
+            print(f"WeasyPrint indisponível ({e.__class__.__name__}); usando layout sintético.")
+            sintetico = True
+    if sintetico:
+        report_jobs._gerar_relatorio_job = job_relatorio_sintetico
+        gerar = layout_sintetico
+    else:
+        from operations.report_generator import generate_abnt_report
+        gerar = lambda: generate_abnt_report(DADOS_ICAMENTO, DADOS_GUINDAUTO)
+
+    n_workers = report_jobs.numero_workers_relatorios()
+    for _ in range(20):
+        _rerun_simulado()
+
+    # Partida a frio: o pool ainda não existe quando o primeiro relatório é pedido
+    envios = []
+    fases = {
+        'sem_relatorios': lambda: _medir_sessoes(args.sessoes, args.duracao),
+        'partida_do_pool': lambda: _medir_sessoes(
+            args.sessoes, args.duracao, _carga_no_pool(report_jobs, n_workers, envios)),
+        'relatorios_na_thread': lambda: _medir_sessoes(args.sessoes, args.duracao, _carga_na_thread(gerar)),
+        'relatorios_no_pool': lambda: _medir_sessoes(
+            args.sessoes, args.duracao, _carga_no_pool(report_jobs, n_workers))
+    }
+    resultados = {}
+    print(f"{args.sessoes} sessões, {args.duracao:g} s por fase, {n_workers} workers de relatório, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'fase':<22}{'execuções':>10}{'p50':>10}{'p95':>10}{'máx':>10}")
+    for nome, executar in fases.items():
+        resultados[nome] = _resumo(executar())
+        r = resultados[nome]
+        print(f"{nome:<22}{r['execucoes']:>10}{r['p50_ms']:>8.1f}ms{r['p95_ms']:>8.1f}ms{r['max_ms']:>8.1f}ms")
+
+    primeiro = report_jobs.status_relatorio(envios[0][0])
+    print(f"partida a frio: enviar_relatorio máx {max(d for _, d in envios) * 1e3:.1f} ms, "
+          f"primeiro relatório ({primeiro['estado']}) em {primeiro['decorrido_s']:.2f} s")
+
+    referencia = resultados['sem_relatorios']['p95_ms']
+    razao = max(resultados[fase]['p95_ms'] for fase in ('partida_do_pool', 'relatorios_no_pool')) / referencia
+    print(f"p95 com pool / referência (pior fase): {razao:.2f}x (limite {args.limite:.2f}x)")
+    report_jobs.encerrar_pool_relatorios()
+    return 1 if razao > args.limite else 0
+
+
+if __name__ == '__main__':
+    logging.disable(logging.WARNING)
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Benchmarks da leitura incremental das planilhas do histórico.
+
+Usa a planilha em memória de gdrive.local_sheets (sem rede) e um espelho SQLite
+temporário. Compara a leitura antiga (a aba inteira a cada expiração do cache) com a
+sincronização incremental: consulta ao modifiedTime sem nenhuma leitura quando nada
+mudou, leitura só das linhas novas quando houve acréscimos e anexação delas ao
+DataFrame já montado (quadro_aba). Antes de medir, confere que o DataFrame incremental
+é igual ao da leitura completa depois de acréscimos aleatórios e de uma troca de cabeçalho.
+
+    python -m benchmarks.sheet_sync_bench [--salvar] [--limite 1.3] [--filtro sincronizacao]
+"""
+import os
+import logging
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# O espelho é aberto uma vez por processo; o caminho precisa estar definido antes
+_DIRETORIO = tempfile.mkdtemp(prefix='sheet_sync_bench_')
+os.environ['SHEET_MIRROR_PATH'] = os.path.join(_DIRETORIO, 'espelho.sqlite3')
+
+from gdrive import sheet_mirror  # noqa: E402
+from gdrive.sheet_mirror import sincronizar_abas, quadro_aba  # noqa: E402
+from gdrive.local_sheets import PlanilhasLocais  # noqa: E402
+from benchmarks.harness import main_suite  # noqa: E402
+
+TAMANHO_ABA = 100_000
+COLUNAS = 30
+LINHAS_NOVAS = 10
+SEMENTE = 20240501
+
+
+def _cabecalho(colunas=COLUNAS):
+    return ['ID Avaliação'] + [f'Campo {i}' for i in range(1, colunas)]
+
+
+def _linhas(rng, n, inicio=0, colunas=COLUNAS):
+    """Linhas como o append_row grava: texto, às vezes com células finais vazias."""
+    valores = rng.uniform(0, 1000, (n, colunas - 1)).round(2).astype(str).tolist()
+    linhas = []
+    for i, resto in enumerate(valores):
+        linha = [f'AV{inicio + i:08d}'] + resto
+        if rng.random() < 0.2:
+            vazias = int(rng.integers(1, 4))
+            linha[-vazias:] = [''] * vazias
+        linhas.append(linha)
+    return linhas
+
+
+def _quadro_completo(fonte, aba):
+    """Leitura antiga: a aba inteira, convertida em DataFrame."""
+    valores = fonte.get_data_from_sheet(aba)
+    return pd.DataFrame(valores[1:], columns=valores[0])
+
+
+def _confere_igual(aba, fonte):
+    quadro, esperado = quadro_aba(aba), _quadro_completo(fonte, aba)
+    assert list(quadro.columns) == list(esperado.columns), f"cabeçalho divergente em '{aba}'"
+    assert quadro.index.tolist() == list(range(len(esperado))), f"índice divergente em '{aba}'"
+    assert quadro.values.tolist() == esperado.values.tolist(), f"linhas divergentes em '{aba}'"
+
+
+def verificar_incremental_igual_completa():
+    """Acréscimos aleatórios sincronizados aos poucos dão o mesmo DataFrame da leitura completa."""
+    rng = np.random.default_rng(SEMENTE)
+    aba = 'verificacao_incremental'
+    fonte = PlanilhasLocais({aba: [_cabecalho(8)] + _linhas(rng, 50, colunas=8)})
+    total = 50
+    for _ in range(30):
+        for linha in _linhas(rng, int(rng.integers(0, 6)), total, colunas=8):
+            fonte.append_data_to_sheet(aba, linha)
+            total += 1
+        sincronizar_abas([aba], fonte=fonte)
+        _confere_igual(aba, fonte)
+    geracao = quadro_aba(aba).attrs['versao_espelho'][0]
+    assert geracao == 1, "acréscimos não devem reler a aba inteira"
+
+
+def verificar_troca_cabecalho():
+    """Cabeçalho alterado na planilha força a releitura completa (nova geração)."""
+    rng = np.random.default_rng(SEMENTE + 1)
+    aba = 'verificacao_cabecalho'
+    fonte = PlanilhasLocais({aba: [_cabecalho(6)] + _linhas(rng, 20, colunas=6)})
+    sincronizar_abas([aba], fonte=fonte)
+    geracao = quadro_aba(aba).attrs['versao_espelho'][0]
+    fonte.alterar_celula(aba, 1, 3, 'Campo renomeado')
+    fonte.alterar_celula(aba, 5, 2, 'editada')
+    fonte.append_data_to_sheet(aba, _linhas(rng, 1, 20, colunas=6)[0])
+    sincronizar_abas([aba], fonte=fonte)
+    assert quadro_aba(aba).attrs['versao_espelho'][0] == geracao + 1
+    _confere_igual(aba, fonte)
+
+
+def verificar_sem_mudanca_sem_leitura():
+    """Com o modifiedTime igual ao da última leitura, nenhuma linha é pedida à planilha."""
+    rng = np.random.default_rng(SEMENTE + 2)
+    abas = ['verificacao_parada_1', 'verificacao_parada_2']
+    fonte = PlanilhasLocais({aba: [_cabecalho(5)] + _linhas(rng, 10, colunas=5) for aba in abas})
+    sincronizar_abas(abas, fonte=fonte)
+    fonte.zerar_contadores()
+    assert sincronizar_abas(abas, fonte=fonte) == {aba: 0 for aba in abas}
+    assert fonte.requisicoes == 1 and fonte.celulas_lidas == 0, "só a data de modificação deve ser consultada"
+
+    # Sem a data de modificação (escopo sem acesso ao arquivo), a cauda é lida sempre
+    class SemDataModificacao(PlanilhasLocais):
+        def get_sheet_modified_time(self):
+            raise PermissionError('sem acesso aos metadados do arquivo')
+
+    sem_data = SemDataModificacao({aba: fonte.get_data_from_sheet(aba) for aba in abas})
+    sem_data.append_data_to_sheet(abas[0], _linhas(rng, 1, 10, colunas=5)[0])
+    assert sincronizar_abas(abas, fonte=sem_data) == {abas[0]: 1, abas[1]: 0}
+    _confere_igual(abas[0], sem_data)
+
+
+VERIFICACOES = (
+    verificar_incremental_igual_completa,
+    verificar_troca_cabecalho,
+    verificar_sem_mudanca_sem_leitura
+)
+
+
+# ==================== BENCHMARKS ====================
+
+def _montar_benchmarks():
+    rng = np.random.default_rng(SEMENTE)
+    aba = 'benchmark'
+    fonte = PlanilhasLocais({aba: [_cabecalho()] + _linhas(rng, TAMANHO_ABA)})
+    sincronizar_abas([aba], fonte=fonte)
+    quadro_aba(aba)
+    novas = _linhas(rng, LINHAS_NOVAS, TAMANHO_ABA)
+
+    def acrescentar_e_sincronizar():
+        for linha in novas:
+            fonte.append_data_to_sheet(aba, linha)
+        sincronizar_abas([aba], fonte=fonte)
+
+    def acrescentar_e_montar():
+        acrescentar_e_sincronizar()
+        return quadro_aba(aba)
+
+    def montar_do_zero():
+        sheet_mirror._quadros.pop(aba, None)
+        return quadro_aba(aba)
+
+    # Tráfego de uma rodada do cache: requisições e células lidas da planilha
+    fonte.zerar_contadores()
+    _quadro_completo(fonte, aba)
+    antigo = (fonte.requisicoes, fonte.celulas_lidas)
+    fonte.zerar_contadores()
+    sincronizar_abas([aba], fonte=fonte)
+    parado = (fonte.requisicoes, fonte.celulas_lidas)
+    for linha in novas:
+        fonte.append_data_to_sheet(aba, linha)
+    fonte.zerar_contadores()
+    sincronizar_abas([aba], fonte=fonte)
+    acrescimo = (fonte.requisicoes, fonte.celulas_lidas)
+    print(f"leitura completa: {antigo[0]} requisição, {antigo[1]} células | "
+          f"sem mudança: {parado[0]} requisição, {parado[1]} células | "
+          f"{LINHAS_NOVAS} linhas novas: {acrescimo[0]} requisições, {acrescimo[1]} células")
+
+    return {
+        f'planilha.leitura_completa_{TAMANHO_ABA}': lambda: _quadro_completo(fonte, aba),
+        f'planilha.sincronizacao_sem_mudanca_{TAMANHO_ABA}': lambda: sincronizar_abas([aba], fonte=fonte),
+        f'planilha.sincronizacao_{LINHAS_NOVAS}_linhas_{TAMANHO_ABA}': acrescentar_e_sincronizar,
+        f'quadro.incremental_{LINHAS_NOVAS}_linhas_{TAMANHO_ABA}': acrescentar_e_montar,
+        f'quadro.completo_espelho_{TAMANHO_ABA}': montar_do_zero
+    }
+
+
+if __name__ == '__main__':
+    logging.disable(logging.WARNING)
+    main_suite('sheet_sync_bench', _montar_benchmarks(), VERIFICACOES)
@@ -0,0 +1,3 @@
+from .catalog import CraneSpec, FleetCatalog, carregar_catalogo, salvar_catalogo, obter_catalogo
+
+__all__ = ['CraneSpec', 'FleetCatalog', 'carregar_catalogo', 'salvar_catalogo', 'obter_catalogo']
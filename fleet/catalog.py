@@ -0,0 +1,227 @@
+import os
+import json
+import tempfile
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import streamlit as st
+
+from operations.calc import LIMITE_SEGURANCA, validar_guindaste_batch
+from operations.load_chart import LoadChart
+from operations.solver import extensao_minima
+
+logger = logging.getLogger(__name__)
+
+# Resolução do índice de raio (em metros)
+PASSO_RAIO_INDICE = 0.1
+
+CAMINHO_PADRAO_CATALOGO = os.path.join(os.path.dirname(__file__), 'frota.json')
+
+
+def get_catalog_path():
+    """Caminho do arquivo do catálogo: variável de ambiente, secrets ou padrão do pacote."""
+    caminho = os.getenv('FLEET_CATALOG_PATH')
+    if caminho:
+        return caminho
+    try:
+        return st.secrets.fleet_config.catalog_path
+    except Exception:
+        return CAMINHO_PADRAO_CATALOGO
+
+
+@dataclass(frozen=True)
+class CraneSpec:
+    """Especificação persistente de um guindaste ou guindauto da frota."""
+    id: str
+    fabricante: str
+    modelo: str
+    angulo_minimo: float
+    grafico: LoadChart
+    tipo: str = "Guindaste"
+
+    @property
+    def lanca_min(self):
+        return float(self.grafico.comprimentos_lanca[0])
+
+    @property
+    def lanca_max(self):
+        return float(self.grafico.comprimentos_lanca[-1])
+
+    @property
+    def nome(self):
+        return f"{self.fabricante} {self.modelo}".strip()
+
+    @classmethod
+    def from_dict(cls, dados):
+        return cls(
+            id=str(dados['id']),
+            fabricante=dados.get('fabricante', ""),
+            modelo=dados.get('modelo', ""),
+            angulo_minimo=float(dados['angulo_minimo']),
+            grafico=LoadChart.from_dict(dados['grafico']),
+            tipo=dados.get('tipo', "Guindaste")
+        )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'fabricante': self.fabricante,
+            'modelo': self.modelo,
+            'tipo': self.tipo,
+            'angulo_minimo': self.angulo_minimo,
+            'grafico': self.grafico.to_dict()
+        }
+
+
+class FleetCatalog:
+    """
+    Catálogo da frota com índice ordenado de capacidade por raio.
+
+    Para cada raio da grade do índice (passo de 0,1 m) guarda, por guindaste, a maior
+    capacidade conservadora alcançável com alguma extensão de lança que respeite o ângulo
+    mínimo, e a menor extensão que a produz. As capacidades de cada raio ficam ordenadas, de modo
+    que "quais guindastes levantam X kg a Y m?" é uma busca binária seguida de uma única
+    chamada a validar_guindaste_batch sobre os candidatos.
+    """
+
+    def __init__(self, guindastes=()):
+        self.guindastes = []
+        self._por_id = {}
+        for spec in guindastes:
+            if spec.id in self._por_id:
+                raise ValueError(f"ID de guindaste duplicado no catálogo: {spec.id}")
+            self._por_id[spec.id] = spec
+            self.guindastes.append(spec)
+        self._construir_indice()
+
+    def __len__(self):
+        return len(self.guindastes)
+
+    def __contains__(self, id_guindaste):
+        return id_guindaste in self._por_id
+
+    def get(self, id_guindaste):
+        return self._por_id.get(id_guindaste)
+
+    def ids(self):
+        return [spec.id for spec in self.guindastes]
+
+    def _construir_indice(self):
+        n = len(self.guindastes)
+        raio_max = max((spec.grafico.raios[-1] for spec in self.guindastes), default=0.0)
+        self._raios = np.arange(0.0, raio_max + PASSO_RAIO_INDICE, PASSO_RAIO_INDICE)
+        self._capacidade = np.zeros((n, self._raios.size), dtype=np.float32)
+        self._lanca = np.full((n, self._raios.size), np.nan, dtype=np.float64)
+
+        r = self._raios[None, :]
+        for i, spec in enumerate(self.guindastes):
+            # Com o critério conservador a capacidade é constante entre extensões tabeladas,
+            # então o máximo está numa extensão tabelada ou na menor extensão que respeita o ângulo
+            lancas = np.vstack([
+                np.broadcast_to(spec.grafico.comprimentos_lanca[:, None], (spec.grafico.comprimentos_lanca.size, r.size)),
+                extensao_minima(r, spec.angulo_minimo)
+            ])
+            capacidade = spec.grafico.capacidade_conservadora(r, lancas)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                angulo = np.degrees(np.arccos(np.clip(r / lancas, -1.0, 1.0)))
+            viavel = (r < lancas) & (angulo >= spec.angulo_minimo) & (lancas <= spec.lanca_max)
+            capacidade = np.where(viavel, capacidade, 0.0)
+            # Entre extensões com a mesma capacidade, prefere a mais curta
+            capacidade_maxima = capacidade.max(axis=0)
+            lanca_melhor = np.where(capacidade == capacidade_maxima, lancas, np.inf).min(axis=0)
+            self._capacidade[i] = capacidade_maxima
+            self._lanca[i] = np.where(capacidade_maxima > 0, lanca_melhor, np.nan)
+
+        # Índice ordenado: para cada raio, guindastes em ordem crescente de capacidade
+        self._ordem = np.argsort(self._capacidade, axis=0, kind='stable').T
+        self._capacidade_ordenada = np.take_along_axis(self._capacidade.T, self._ordem, axis=1)
+        logger.info("Índice da frota construído: %d guindastes, %d raios", n, self._raios.size)
+
+    def guindastes_aptos(self, carga_total, raio):
+        """
+        Lista os guindastes capazes de içar a carga total no raio informado.
+
+        O raio é arredondado para cima na grade do índice (critério conservador, pois a
+        capacidade não aumenta com o raio) e os candidatos são confirmados pelas regras de
+        validar_guindaste com o ângulo calculado no raio exato.
+
+        Args:
+            carga_total (float): Carga total em kg (já com margens, cabos e acessórios)
+            raio (float): Raio de operação em metros
+
+        Returns:
+            list[dict]: Guindastes aptos, do menor para o maior percentual de utilização
+        """
+        if carga_total <= 0 or raio <= 0 or not self.guindastes:
+            return []
+        j = int(np.ceil(raio / PASSO_RAIO_INDICE - 1e-9))
+        if j >= self._raios.size:
+            return []
+
+        capacidade_necessaria = carga_total / (LIMITE_SEGURANCA / 100)
+        inicio = np.searchsorted(self._capacidade_ordenada[j], capacidade_necessaria, side='left')
+        candidatos = self._ordem[j, inicio:]
+        if candidatos.size == 0:
+            return []
+
+        capacidade = self._capacidade[candidatos, j].astype(np.float64)
+        lanca = self._lanca[candidatos, j]
+        angulo_minimo = np.array([self.guindastes[c].angulo_minimo for c in candidatos])
+        validacao = validar_guindaste_batch(carga_total, capacidade, capacidade, raio, lanca, angulo_minimo)
+
+        aptos = []
+        for k in np.argsort(validacao['porcentagem_segura'], kind='stable'):
+            if not validacao['adequado'][k]:
+                continue
+            spec = self.guindastes[candidatos[k]]
+            aptos.append({
+                'id': spec.id,
+                'fabricante': spec.fabricante,
+                'modelo': spec.modelo,
+                'tipo': spec.tipo,
+                'capacidade': capacidade[k],
+                'extensao_lanca': lanca[k],
+                'angulo_lanca': validacao['angulo_lanca'][k],
+                'porcentagem_segura': validacao['porcentagem_segura'][k],
+                'na_zona_atencao': bool(validacao['na_zona_atencao'][k])
+            })
+        return aptos
+
+
+def carregar_catalogo(caminho=None):
+    """Lê o catálogo da frota do arquivo JSON. Retorna catálogo vazio se o arquivo não existir."""
+    caminho = caminho or get_catalog_path()
+    if not os.path.exists(caminho):
+        logger.info("Catálogo da frota não encontrado em %s; iniciando vazio.", caminho)
+        return FleetCatalog()
+    with open(caminho, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    return FleetCatalog(CraneSpec.from_dict(item) for item in dados.get('guindastes', []))
+
+
+def salvar_catalogo(catalogo, caminho=None):
+    """Grava o catálogo no arquivo JSON de forma atômica (arquivo temporário + rename)."""
+    caminho = caminho or get_catalog_path()
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(diretorio, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'guindastes': [spec.to_dict() for spec in catalogo.guindastes]}, f, ensure_ascii=False)
+        os.replace(temp_path, caminho)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+@st.cache_resource
+def obter_catalogo():
+    """Catálogo da frota compartilhado pelo processo do servidor (carregado uma única vez)."""
+    try:
+        return carregar_catalogo()
+    except Exception as e:
+        logger.exception("Erro ao carregar o catálogo da frota")
+        st.error(f"Erro ao carregar o catálogo da frota: {e}")
+        return FleetCatalog()
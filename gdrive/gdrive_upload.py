@@ -1,4 +1,5 @@
 import os
+import logging
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
@@ -7,6 +8,8 @@ from gdrive.config import get_credentials_dict, GDRIVE_FOLDER_ID, GDRIVE_SHEETS_
 import tempfile
 import gspread
 
+logger = logging.getLogger(__name__)
+
 class GoogleDriveUploader:
     def __init__(self):
         self.SCOPES = [
@@ -112,3 +115,55 @@ class GoogleDriveUploader:
         except Exception as e:
             st.error(f"Erro ao ler dados da planilha '{sheet_name}' com gspread: {str(e)}")
             raise
+
+    def get_sheet_modified_time(self):
+        """
+        Data da última alteração da planilha (metadado modifiedTime do Drive), em uma
+        requisição pequena que não lê nenhuma célula. Se não mudou desde a última
+        leitura, as abas não precisam ser consultadas.
+
+        Returns:
+            str: modifiedTime no formato RFC 3339, ou None se o metadado não estiver
+                 acessível (o escopo drive.file só enxerga arquivos abertos pelo app)
+        """
+        try:
+            metadata = self.drive_service.files().get(
+                fileId=GDRIVE_SHEETS_ID,
+                fields='modifiedTime',
+                supportsAllDrives=True
+            ).execute()
+            return metadata.get('modifiedTime')
+        except Exception:
+            return None
+
+    def get_sheet_tail(self, sheet_name, first_row):
+        """
+        Lê o cabeçalho e as linhas a partir de first_row (numeração da planilha; a linha 1
+        é o cabeçalho) em uma única requisição, sem baixar as linhas anteriores. As abas
+        só recebem linhas no fim (append_data_to_sheet), então a cauda é tudo o que mudou.
+
+        Roda quase sempre na thread de sincronização do espelho, sem contexto de página:
+        as falhas vão para o log e as mensagens ao usuário ficam com load_sheet_data.
+
+        Returns:
+            tuple: (cabeçalho, linhas), ou None se a aba não existir
+        """
+        try:
+            spreadsheet = self.sheets_service.open_by_key(GDRIVE_SHEETS_ID)
+            worksheet = spreadsheet.worksheet(sheet_name)
+
+            # row_count vem dos metadados já lidos em worksheet(); além dele não há linhas
+            ranges = ['1:1']
+            if first_row <= worksheet.row_count:
+                ranges.append(f'{first_row}:{worksheet.row_count}')
+            values = worksheet.batch_get(ranges)
+            header = list(values[0][0]) if values[0] else []
+            rows = [list(row) for row in values[1]] if len(values) > 1 else []
+            return header, rows
+
+        except gspread.exceptions.WorksheetNotFound:
+            logger.warning("A aba '%s' não foi encontrada na planilha; verifique o nome no arquivo secrets.toml.", sheet_name)
+            return None
+        except Exception as e:
+            logger.error("Erro ao ler as linhas da aba '%s' a partir da linha %d: %s", sheet_name, first_row, e)
+            raise
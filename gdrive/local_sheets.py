@@ -0,0 +1,96 @@
+import time
+import threading
+from datetime import datetime, timezone
+
+
+class PlanilhasLocais:
+    """
+    Planilha em memória com a mesma interface de leitura e escrita do GoogleDriveUploader
+    (append_data_to_sheet, get_data_from_sheet, get_sheet_tail e get_sheet_modified_time),
+    para testar e medir a sincronização do espelho sem acesso à rede.
+
+    Reproduz o comportamento da API que importa para a sincronização: append_data_to_sheet
+    acrescenta ao fim da aba e avança o modifiedTime; get_data_from_sheet completa as
+    linhas com '' como get_all_values; a leitura por intervalo omite as células finais
+    vazias. Cada chamada conta como uma requisição, e `latencia_s` simula o tempo de ida
+    e volta da rede.
+
+    Args:
+        abas (dict): Nome da aba -> lista de linhas (a primeira é o cabeçalho)
+        latencia_s (float): Espera adicionada a cada requisição
+    """
+
+    def __init__(self, abas=None, latencia_s=0.0):
+        self._abas = {nome: [list(linha) for linha in linhas] for nome, linhas in (abas or {}).items()}
+        self.latencia_s = latencia_s
+        self._lock = threading.Lock()
+        self._modificado = time.time()
+        self.requisicoes = 0
+        self.celulas_lidas = 0
+
+    def _requisicao(self, linhas=()):
+        if self.latencia_s:
+            time.sleep(self.latencia_s)
+        self.requisicoes += 1
+        self.celulas_lidas += sum(len(linha) for linha in linhas)
+
+    def _alterada(self):
+        # O Drive informa milissegundos; duas alterações seguidas nunca têm o mesmo valor
+        self._modificado = max(time.time(), self._modificado + 0.001)
+
+    def zerar_contadores(self):
+        self.requisicoes = 0
+        self.celulas_lidas = 0
+
+    def criar_aba(self, sheet_name, cabecalho):
+        with self._lock:
+            self._abas[sheet_name] = [list(cabecalho)]
+            self._alterada()
+
+    def append_data_to_sheet(self, sheet_name, data_row):
+        with self._lock:
+            self._requisicao()
+            self._abas[sheet_name].append(list(data_row))
+            self._alterada()
+
+    def alterar_celula(self, sheet_name, linha, coluna, valor):
+        """Edição manual de uma célula (linha 1 = cabeçalho, colunas a partir de 1)."""
+        with self._lock:
+            valores = self._abas[sheet_name][linha - 1]
+            valores.extend([''] * (coluna - len(valores)))
+            valores[coluna - 1] = valor
+            self._alterada()
+
+    def get_data_from_sheet(self, sheet_name):
+        with self._lock:
+            linhas = self._abas.get(sheet_name)
+            if linhas is None:
+                self._requisicao()
+                return None
+            largura = max((len(linha) for linha in linhas), default=0)
+            valores = [linha + [''] * (largura - len(linha)) for linha in linhas]
+            self._requisicao(valores)
+            return valores
+
+    def get_sheet_tail(self, sheet_name, first_row):
+        with self._lock:
+            linhas = self._abas.get(sheet_name)
+            if linhas is None:
+                self._requisicao()
+                return None
+            cabecalho = _sem_celulas_finais_vazias(linhas[0]) if linhas else []
+            novas = [_sem_celulas_finais_vazias(linha) for linha in linhas[max(first_row, 2) - 1:]]
+            self._requisicao([cabecalho] + novas)
+            return cabecalho, novas
+
+    def get_sheet_modified_time(self):
+        with self._lock:
+            self._requisicao()
+            return datetime.fromtimestamp(self._modificado, timezone.utc).isoformat(timespec='milliseconds')
+
+
+def _sem_celulas_finais_vazias(linha):
+    linha = list(linha)
+    while linha and linha[-1] == '':
+        linha.pop()
+    return linha
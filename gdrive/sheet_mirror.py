@@ -0,0 +1,377 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import tempfile
+import functools
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+CAMINHO_PADRAO_ESPELHO = os.path.join(tempfile.gettempdir(), 'pip_rev01', 'espelho_planilhas.sqlite3')
+
+# Intervalo da sincronização em segundo plano (busca só as linhas novas de cada aba)
+INTERVALO_SINCRONIZACAO_S = 60
+
+# O aplicativo só acrescenta linhas; edições manuais em linhas antigas só aparecem em uma
+# releitura completa, feita com esta periodicidade ou ao limpar o cache do histórico
+INTERVALO_RESSINCRONIZACAO_COMPLETA_S = 24 * 3600
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS abas (
+    aba TEXT PRIMARY KEY,
+    cabecalho TEXT NOT NULL,
+    linhas INTEGER NOT NULL,
+    geracao INTEGER NOT NULL,
+    sincronizado_em REAL NOT NULL,
+    completo_em REAL NOT NULL,
+    modificado TEXT
+);
+CREATE TABLE IF NOT EXISTS linhas (
+    aba TEXT NOT NULL,
+    numero INTEGER NOT NULL,
+    valores TEXT NOT NULL,
+    PRIMARY KEY (aba, numero)
+) WITHOUT ROWID;
+"""
+
+# Sincronizações deste processo (thread de fundo e botão da página) não se sobrepõem
+_lock_sincronizacao = threading.Lock()
+_lock_thread = threading.Lock()
+_thread = None
+_acordar = threading.Event()
+_abas_sincronizadas = set()
+
+# DataFrame da última versão lida de cada aba neste processo (ver quadro_aba)
+_lock_quadros = threading.Lock()
+_quadros = {}
+
+
+def get_sheet_mirror_path():
+    """Arquivo SQLite do espelho: variável de ambiente SHEET_MIRROR_PATH, secrets ou diretório temporário do host."""
+    caminho = os.getenv('SHEET_MIRROR_PATH')
+    if caminho:
+        return caminho
+    try:
+        return st.secrets.cache_config.sheet_mirror_path
+    except Exception:
+        return CAMINHO_PADRAO_ESPELHO
+
+
+def intervalo_sincronizacao():
+    """Segundos entre sincronizações: variável de ambiente SHEET_SYNC_INTERVAL_S ou o padrão."""
+    return max(1.0, float(os.getenv('SHEET_SYNC_INTERVAL_S', INTERVALO_SINCRONIZACAO_S)))
+
+
+class EspelhoPlanilhas:
+    """
+    Cópia local (SQLite) das abas do Google Sheets, compartilhada pelos processos do host.
+
+    Cada linha da aba é gravada como uma lista JSON, numerada na ordem da planilha; o
+    cabeçalho e o número de linhas já copiadas ficam na tabela `abas`. A versão de uma aba
+    é o par (geração, linhas): muda a cada linha nova e a cada releitura completa, e
+    serve de chave para os caches em memória das páginas.
+
+    O banco usa WAL, então a página lê enquanto a sincronização grava. A coluna
+    `modificado` guarda o modifiedTime da planilha visto na última leitura da aba.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        diretorio = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(diretorio, exist_ok=True)
+        with self._conexao() as conexao:
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.executescript(_ESQUEMA)
+            colunas = {linha[1] for linha in conexao.execute('PRAGMA table_info(abas)')}
+            if 'modificado' not in colunas:  # espelhos criados antes da detecção de mudanças
+                conexao.execute('ALTER TABLE abas ADD COLUMN modificado TEXT')
+
+    @contextmanager
+    def _conexao(self):
+        conexao = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+        try:
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            yield conexao
+        finally:
+            conexao.close()
+
+    def estado(self, aba):
+        """
+        Returns:
+            dict: 'cabecalho', 'linhas', 'geracao', 'sincronizado_em', 'completo_em' e
+                  'modificado'; None se a aba nunca foi copiada
+        """
+        with self._conexao() as conexao:
+            registro = conexao.execute(
+                'SELECT cabecalho, linhas, geracao, sincronizado_em, completo_em, modificado FROM abas WHERE aba = ?',
+                (aba,)
+            ).fetchone()
+        if registro is None:
+            return None
+        return {
+            'cabecalho': json.loads(registro[0]),
+            'linhas': registro[1],
+            'geracao': registro[2],
+            'sincronizado_em': registro[3],
+            'completo_em': registro[4],
+            'modificado': registro[5]
+        }
+
+    def versao(self, aba):
+        """(geração, linhas) da aba, ou None se ela nunca foi copiada."""
+        with self._conexao() as conexao:
+            registro = conexao.execute('SELECT geracao, linhas FROM abas WHERE aba = ?', (aba,)).fetchone()
+        return tuple(registro) if registro else None
+
+    def ler(self, aba):
+        """
+        Returns:
+            tuple: (cabeçalho, linhas) na ordem da planilha; ([], []) se a aba não foi copiada
+        """
+        cabecalho, linhas, _ = self.ler_desde(aba, 0)
+        return cabecalho, linhas
+
+    def ler_desde(self, aba, inicio):
+        """
+        Linhas da aba a partir da linha de dados `inicio`, com a versão a que pertencem.
+
+        Returns:
+            tuple: (cabeçalho, linhas, versão); ([], [], None) se a aba não foi copiada
+        """
+        with self._conexao() as conexao:
+            # Leitura em uma transação: cabeçalho, linhas e versão consistentes entre si
+            conexao.execute('BEGIN')
+            registro = conexao.execute('SELECT cabecalho, geracao, linhas FROM abas WHERE aba = ?', (aba,)).fetchone()
+            if registro is None:
+                conexao.execute('COMMIT')
+                return [], [], None
+            linhas = [json.loads(valores) for (valores,) in conexao.execute(
+                'SELECT valores FROM linhas WHERE aba = ? AND numero >= ? ORDER BY numero', (aba, inicio))]
+            conexao.execute('COMMIT')
+        return json.loads(registro[0]), linhas, (registro[1], registro[2])
+
+    def gravar(self, aba, cabecalho, linhas, inicio, modificado=None):
+        """
+        Grava linhas lidas da planilha a partir da linha de dados `inicio` (0 = cópia completa).
+        `modificado` é o modifiedTime da planilha obtido antes da leitura.
+
+        Uma cópia completa substitui a aba e incrementa a geração. Uma continuação só é
+        aplicada se o espelho ainda tiver exatamente `inicio` linhas com o mesmo cabeçalho
+        (outro processo pode ter sincronizado antes).
+
+        Returns:
+            bool: True se as linhas foram gravadas
+        """
+        agora = time.time()
+        cabecalho_json = json.dumps(cabecalho, ensure_ascii=False)
+        with self._conexao() as conexao:
+            conexao.execute('BEGIN IMMEDIATE')
+            try:
+                atual = conexao.execute(
+                    'SELECT cabecalho, linhas, geracao, completo_em FROM abas WHERE aba = ?', (aba,)
+                ).fetchone()
+                if inicio:
+                    if atual is None or atual[0] != cabecalho_json or atual[1] != inicio:
+                        conexao.execute('ROLLBACK')
+                        return False
+                    geracao, completo_em = atual[2], atual[3]
+                else:
+                    conexao.execute('DELETE FROM linhas WHERE aba = ?', (aba,))
+                    geracao, completo_em = (atual[2] + 1 if atual else 1), agora
+                conexao.executemany(
+                    'INSERT OR REPLACE INTO linhas (aba, numero, valores) VALUES (?, ?, ?)',
+                    ((aba, inicio + i, json.dumps(linha, ensure_ascii=False)) for i, linha in enumerate(linhas))
+                )
+                conexao.execute(
+                    'INSERT OR REPLACE INTO abas (aba, cabecalho, linhas, geracao, sincronizado_em, completo_em, '
+                    'modificado) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (aba, cabecalho_json, inicio + len(linhas), geracao, agora, completo_em, modificado)
+                )
+                conexao.execute('COMMIT')
+            except Exception:
+                conexao.execute('ROLLBACK')
+                raise
+        return True
+
+    def marcar_sincronizada(self, aba):
+        """Registra uma sincronização que não encontrou mudanças (nenhuma linha lida)."""
+        with self._conexao() as conexao:
+            conexao.execute('UPDATE abas SET sincronizado_em = ? WHERE aba = ?', (time.time(), aba))
+
+
+@functools.lru_cache(maxsize=None)
+def obter_espelho():
+    """Espelho local das planilhas, aberto uma vez por processo."""
+    return EspelhoPlanilhas(get_sheet_mirror_path())
+
+
+def _completar_linha(linha, colunas):
+    """Completa com '' as células finais vazias, que a leitura por intervalo omite (como get_all_values)."""
+    return list(linha) + [''] * (colunas - len(linha))
+
+
+def sincronizar_aba(espelho, aba, fonte, completa=False, modificado=None):
+    """
+    Traz para o espelho as linhas da aba que ele ainda não tem.
+
+    Se o modifiedTime da planilha (`modificado`) é o mesmo da última leitura da aba,
+    nada é pedido ao Google. Caso contrário, só as linhas depois da última copiada são
+    lidas (get_sheet_tail). Se o cabeçalho mudou, ou se a última cópia completa é mais
+    antiga que INTERVALO_RESSINCRONIZACAO_COMPLETA_S, a aba é relida inteira.
+
+    Args:
+        espelho (EspelhoPlanilhas): Destino
+        aba (str): Nome da aba
+        fonte: Objeto com get_sheet_tail(aba, primeira_linha), como GoogleDriveUploader
+            ou gdrive.local_sheets.PlanilhasLocais
+        completa (bool): Força a releitura da aba inteira
+        modificado (str): modifiedTime atual da planilha (None se desconhecido: sempre lê)
+
+    Returns:
+        int: Linhas gravadas (None se a aba não existir na planilha)
+    """
+    estado = espelho.estado(aba)
+    if estado is None or completa or time.time() - estado['completo_em'] > INTERVALO_RESSINCRONIZACAO_COMPLETA_S:
+        inicio = 0
+    elif modificado is not None and modificado == estado['modificado']:
+        espelho.marcar_sincronizada(aba)
+        return 0
+    else:
+        inicio = estado['linhas']
+
+    # Linha 1 da planilha é o cabeçalho; a linha de dados n é a linha n + 2 da planilha
+    resultado = fonte.get_sheet_tail(aba, inicio + 2)
+    if resultado is None:
+        return None
+    cabecalho, novas = resultado
+    if inicio and cabecalho != estado['cabecalho']:
+        logger.info("Cabeçalho da aba '%s' mudou; relendo a aba inteira", aba)
+        return sincronizar_aba(espelho, aba, fonte, completa=True, modificado=modificado)
+
+    colunas = len(cabecalho)
+    if not espelho.gravar(aba, cabecalho, [_completar_linha(l, colunas) for l in novas], inicio, modificado):
+        # Outro processo sincronizou no meio tempo; a próxima rodada continua de onde ele parou
+        return 0
+    if novas or not inicio:
+        logger.info("Espelho da aba '%s': %d linhas gravadas a partir da linha %d", aba, len(novas), inicio)
+    return len(novas)
+
+
+def _fonte_padrao():
+    from gdrive.gdrive_upload import GoogleDriveUploader
+
+    return GoogleDriveUploader()
+
+
+def _momento_modificacao(fonte):
+    """modifiedTime da planilha, ou None se a fonte não o informar (as abas são lidas sempre)."""
+    try:
+        return fonte.get_sheet_modified_time()
+    except Exception as e:
+        logger.warning("Falha ao consultar a data de modificação da planilha: %s", e)
+        return None
+
+
+def sincronizar_abas(abas, completa=False, fonte=None):
+    """
+    Sincroniza as abas informadas agora, na thread de quem chamou.
+
+    A data de modificação da planilha é consultada uma vez, antes das leituras (uma
+    alteração feita durante a leitura só faz a próxima rodada ler de novo).
+
+    Returns:
+        dict: Linhas gravadas por aba
+    """
+    espelho = obter_espelho()
+    with _lock_sincronizacao:
+        fonte = fonte or _fonte_padrao()
+        modificado = None if completa else _momento_modificacao(fonte)
+        return {aba: sincronizar_aba(espelho, aba, fonte, completa, modificado) for aba in abas}
+
+
+def _laco_sincronizacao():
+    fonte = None
+    solicitada = False
+    while True:
+        intervalo = intervalo_sincronizacao()
+        espelho = obter_espelho()
+        agora = time.time()
+        with _lock_thread:
+            abas = sorted(_abas_sincronizadas)
+        # Com vários processos no host, só sincroniza quem encontrar a aba desatualizada
+        pendentes = [aba for aba in abas if solicitada
+                     or (espelho.estado(aba) or {}).get('sincronizado_em', 0) <= agora - intervalo]
+        if pendentes:
+            try:
+                fonte = fonte or _fonte_padrao()
+                sincronizar_abas(pendentes, fonte=fonte)
+            except Exception as e:
+                logger.warning("Falha na sincronização do espelho das planilhas: %s", e)
+                fonte = None  # credenciais ou conexão são recriadas na próxima rodada
+        solicitada = _acordar.wait(intervalo)
+        _acordar.clear()
+
+
+def _montar_quadro(cabecalho, linhas, inicio):
+    colunas = len(cabecalho)
+    return pd.DataFrame(
+        [linha[:colunas] + [None] * (colunas - len(linha)) for linha in linhas],
+        columns=cabecalho,
+        index=pd.RangeIndex(inicio, inicio + len(linhas))
+    )
+
+
+def quadro_aba(aba):
+    """
+    DataFrame da aba na versão atual do espelho, um por processo.
+
+    Quando a sincronização acrescenta linhas, só elas são lidas do espelho e anexadas ao
+    DataFrame anterior; a aba inteira só é relida na primeira vez ou depois de uma
+    releitura completa (nova geração). O DataFrame devolvido é compartilhado e não
+    deve ser alterado; a versão dele fica em attrs['versao_espelho'].
+
+    Returns:
+        pd.DataFrame: A aba (None se ela nunca foi copiada)
+    """
+    espelho = obter_espelho()
+    with _lock_quadros:
+        versao = espelho.versao(aba)
+        if versao is None:
+            return None
+        anterior = _quadros.get(aba)
+        versao_anterior = anterior.attrs['versao_espelho'] if anterior is not None else None
+        if versao_anterior == versao:
+            return anterior
+        quadro = None
+        if versao_anterior and versao_anterior[0] == versao[0] and versao_anterior[1] < versao[1]:
+            cabecalho, novas, versao = espelho.ler_desde(aba, versao_anterior[1])
+            # Uma releitura completa entre as duas consultas invalida a continuação
+            if versao[0] == versao_anterior[0]:
+                quadro = pd.concat([anterior, _montar_quadro(cabecalho, novas, versao_anterior[1])])
+        if quadro is None:
+            cabecalho, linhas, versao = espelho.ler_desde(aba, 0)
+            quadro = _montar_quadro(cabecalho, linhas, 0)
+        quadro.attrs['versao_espelho'] = versao
+        _quadros[aba] = quadro
+        return quadro
+
+
+def iniciar_sincronizacao(abas):
+    """Inclui as abas na sincronização em segundo plano deste processo (iniciada no primeiro uso)."""
+    global _thread
+    with _lock_thread:
+        _abas_sincronizadas.update(aba for aba in abas if aba)
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_laco_sincronizacao, name='sincronizacao_planilhas', daemon=True)
+            _thread.start()
+
+
+def solicitar_sincronizacao():
+    """Antecipa a próxima rodada da sincronização em segundo plano (por exemplo, após gravar uma avaliação)."""
+    _acordar.set()
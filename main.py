@@ -1,9 +1,10 @@
 import streamlit as st
-from operations.front import front_page
-from operations.history import show_history_page
-from operations.demo_page import show_demo_page
 from auth.login_page import show_login_page, show_user_header, show_logout_button
 from auth.auth_utils import is_user_logged_in, is_admin_user
+from utils.audit_log import configurar_logging
+
+# Configurado antes do roteamento: o acesso de demonstração não importa a calculadora completa
+configurar_logging()
 
 def main():
     st.set_page_config(
@@ -18,7 +19,12 @@ def main():
     show_user_header()
     show_logout_button()
 
+    # As páginas são importadas sob demanda: o acesso de demonstração não carrega
+    # as bibliotecas de Drive, IA e PDF usadas apenas pela calculadora completa e pelo histórico
     if is_admin_user():
+        from operations.front import front_page
+        from operations.history import show_history_page
+
         st.sidebar.success("✅ Acesso completo")
         tab_calc, tab_history = st.tabs(["Calculadora de Carga", "Histórico"])
         with tab_calc:
@@ -26,6 +32,8 @@ def main():
         with tab_history:
             show_history_page()
     else:
+        from operations.demo_page import show_demo_page
+
         st.sidebar.error("🔒 Acesso de demonstração")
         show_demo_page()
 
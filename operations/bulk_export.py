@@ -0,0 +1,135 @@
+import os
+import re
+import time
+import shutil
+import zipfile
+import logging
+import tempfile
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from operations.render_pool import obter_pool, numero_workers_padrao
+
+logger = logging.getLogger(__name__)
+
+CAMINHO_PADRAO_EXPORTACOES = os.path.join(tempfile.gettempdir(), 'pip_rev01', 'exportacoes')
+
+# Arquivos de exportação mais antigos que isto são apagados ao iniciar uma nova exportação
+IDADE_MAXIMA_EXPORTACAO_S = 24 * 3600
+
+# Relatórios em andamento por processo do pool: limita quantos PDFs existem ao mesmo tempo
+RELATORIOS_POR_WORKER = 2
+
+
+def get_export_dir():
+    """Diretório dos ZIPs de exportação: variável de ambiente BULK_EXPORT_DIR ou o diretório temporário do host."""
+    return os.getenv('BULK_EXPORT_DIR', CAMINHO_PADRAO_EXPORTACOES)
+
+
+def nome_arquivo_relatorio(id_avaliacao):
+    """Nome do PDF dentro do ZIP, o mesmo do download individual (caracteres inválidos trocados por '_')."""
+    return f"Relatorio_Tecnico_{re.sub(r'[^0-9A-Za-z._-]', '_', str(id_avaliacao))}.pdf"
+
+
+def _gerar_relatorio_job(dados_icamento, dados_guindauto, diretorio):
+    """Executado no pool: gera o PDF e o grava em disco, devolvendo só o caminho ao processo principal."""
+    from operations.report_generator import generate_abnt_report_cached
+
+    pdf = generate_abnt_report_cached(dados_icamento, dados_guindauto)
+    fd, caminho = tempfile.mkstemp(dir=diretorio, suffix='.pdf')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(pdf)
+    return caminho
+
+
+def limpar_exportacoes_antigas(diretorio=None, idade_maxima_s=IDADE_MAXIMA_EXPORTACAO_S):
+    diretorio = diretorio or get_export_dir()
+    limite = time.time() - idade_maxima_s
+    try:
+        entradas = list(os.scandir(diretorio))
+    except FileNotFoundError:
+        return
+    for entrada in entradas:
+        try:
+            if entrada.is_file() and entrada.stat().st_mtime < limite:
+                os.remove(entrada.path)
+        except OSError as e:
+            logger.warning("Falha ao remover a exportação antiga %s: %s", entrada.path, e)
+
+
+def exportar_relatorios_zip(avaliacoes, caminho_zip, max_workers=None, ao_progredir=None):
+    """
+    Gera os relatórios PDF das avaliações no pool de processos e os grava em um ZIP em disco.
+
+    O ZIP é escrito de forma incremental: cada PDF é gravado pelo worker em um arquivo
+    temporário, copiado para o ZIP assim que fica pronto e apagado em seguida. Como no
+    máximo RELATORIOS_POR_WORKER relatórios por processo estão em andamento, o uso de
+    memória não cresce com o tamanho da exportação. Falhas em um relatório não
+    interrompem a exportação; elas são listadas em erros.txt dentro do ZIP.
+
+    Args:
+        avaliacoes (iterable): Pares (dados_icamento, dados_guindauto) de pd.Series, com o
+            ID da avaliação como nome da série de içamento. Pode ser um gerador.
+        caminho_zip (str): Arquivo ZIP de saída (sobrescrito se existir)
+        max_workers (int): Processos do pool (padrão: número de CPUs)
+        ao_progredir (callable): Chamado como ao_progredir(concluidos) a cada relatório
+
+    Returns:
+        dict: 'relatorios' (quantidade no ZIP), 'erros' (lista de 'ID: mensagem'),
+              'caminho' e 'bytes' (tamanho do ZIP)
+    """
+    max_workers = max_workers or numero_workers_padrao()
+    pool = obter_pool(max_workers)
+    janela = max_workers * RELATORIOS_POR_WORKER
+    diretorio_temp = tempfile.mkdtemp(prefix='relatorios_', dir=os.path.dirname(os.path.abspath(caminho_zip)))
+    em_andamento = {}
+    erros = []
+    concluidos = 0
+    incluidos = 0
+
+    def coletar(futuros, zf):
+        nonlocal concluidos, incluidos
+        for futuro in futuros:
+            id_avaliacao = em_andamento.pop(futuro)
+            try:
+                caminho_pdf = futuro.result()
+            except Exception as e:
+                logger.error("Falha ao gerar o relatório %s na exportação em lote: %s", id_avaliacao, e)
+                erros.append(f"{id_avaliacao}: {e}")
+            else:
+                zf.write(caminho_pdf, arcname=nome_arquivo_relatorio(id_avaliacao))
+                os.remove(caminho_pdf)
+                incluidos += 1
+            concluidos += 1
+            if ao_progredir:
+                ao_progredir(concluidos)
+
+    inicio = time.perf_counter()
+    try:
+        # PDFs já são comprimidos internamente: armazenar sem recomprimir poupa CPU
+        with zipfile.ZipFile(caminho_zip, 'w', compression=zipfile.ZIP_STORED) as zf:
+            for dados_icamento, dados_guindauto in avaliacoes:
+                if len(em_andamento) >= janela:
+                    prontos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                    coletar(prontos, zf)
+                futuro = pool.submit(_gerar_relatorio_job, dados_icamento, dados_guindauto, diretorio_temp)
+                em_andamento[futuro] = dados_icamento.name
+            while em_andamento:
+                prontos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                coletar(prontos, zf)
+            if erros:
+                zf.writestr('erros.txt', "\n".join(erros) + "\n")
+    finally:
+        for futuro in em_andamento:
+            futuro.cancel()
+        shutil.rmtree(diretorio_temp, ignore_errors=True)
+
+    logger.info(
+        "Exportação em lote concluída: %d relatórios, %d erros em %.1f s",
+        incluidos, len(erros), time.perf_counter() - inicio
+    )
+    return {
+        'relatorios': incluidos,
+        'erros': erros,
+        'caminho': caminho_zip,
+        'bytes': os.path.getsize(caminho_zip)
+    }
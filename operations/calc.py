@@ -1,10 +1,18 @@
 import numpy as np
 import logging
 
-# Configuração de logging
-logging.basicConfig(level=logging.INFO)
+from operations.results import LoadResult, CraneValidation
+
+# O log é configurado pela aplicação (utils.audit_log); aqui apenas se emitem eventos
 logger = logging.getLogger(__name__)
 
+# Regras de cálculo compartilhadas entre as versões escalar e vetorizada
+MARGEM_EQUIPAMENTO_NOVO = 0.10
+MARGEM_EQUIPAMENTO_USADO = 0.25
+FATOR_CABOS = 0.03
+MARGEM_ANGULO_ATENCAO = 5.0
+LIMITE_SEGURANCA = 80.0
+
 
 def calcular_carga_total(peso_carga, equipamento_novo=True, peso_acessorios=0):
     """
@@ -17,7 +25,7 @@ def calcular_carga_total(peso_carga, equipamento_novo=True, peso_acessorios=0):
         peso_acessorios (float): Peso dos acessórios (cintas, grilhetas, etc.) em kg
     
     Returns:
-        dict: Dicionário com todos os valores calculados
+        LoadResult: Resultado imutável com todos os valores calculados
     
     Raises:
         ValueError: Se os valores de entrada forem inválidos
@@ -40,38 +48,38 @@ def calcular_carga_total(peso_carga, equipamento_novo=True, peso_acessorios=0):
     
     try:
         # Definição da margem de segurança
-        margem_seguranca = 0.10 if equipamento_novo else 0.25
+        margem_seguranca = MARGEM_EQUIPAMENTO_NOVO if equipamento_novo else MARGEM_EQUIPAMENTO_USADO
         
         # Cálculo do peso com margem de segurança
         peso_seguranca = peso_carga * margem_seguranca
         peso_considerar = peso_carga + peso_seguranca
         
         # Cálculo do peso dos cabos (3% do peso a considerar)
-        peso_cabos = peso_considerar * 0.03
+        peso_cabos = peso_considerar * FATOR_CABOS
         
         # Cálculo da carga total
         carga_total = peso_considerar + peso_acessorios + peso_cabos
         
         # Log para auditoria
-        logger.info(
-            f"Cálculo de carga: Peso={peso_carga}kg, "
-            f"Margem={margem_seguranca*100}%, "
-            f"Acessórios={peso_acessorios}kg, "
-            f"Total={carga_total:.2f}kg"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Cálculo de carga: Peso=%skg, Margem=%s%%, Acessórios=%skg, Total=%.2fkg",
+                peso_carga, margem_seguranca * 100, peso_acessorios, carga_total,
+                extra={'evento': 'calculo_carga', 'peso_carga': peso_carga, 'carga_total': carga_total}
+            )
         
-        return {
-            'peso_carga': peso_carga,
-            'peso_seguranca': peso_seguranca,
-            'peso_considerar': peso_considerar,
-            'peso_cabos': peso_cabos,
-            'peso_acessorios': peso_acessorios,
-            'carga_total': carga_total,
-            'margem_seguranca_percentual': margem_seguranca * 100
-        }
+        return LoadResult(
+            peso_carga=peso_carga,
+            peso_seguranca=peso_seguranca,
+            peso_considerar=peso_considerar,
+            peso_cabos=peso_cabos,
+            peso_acessorios=peso_acessorios,
+            carga_total=carga_total,
+            margem_seguranca_percentual=margem_seguranca * 100
+        )
         
     except Exception as e:
-        logger.error(f"Erro no cálculo de carga total: {e}")
+        logger.error("Erro no cálculo de carga total: %s", e)
         raise
 
 
@@ -89,7 +97,7 @@ def validar_guindaste(carga_total, capacidade_raio, capacidade_alcance_max,
         angulo_minimo_fabricante (float): Ângulo mínimo de segurança especificado em graus
     
     Returns:
-        dict: Dicionário com resultados da validação e detalhes
+        CraneValidation: Resultado imutável da validação e seus detalhes
     
     Raises:
         ValueError: Se os valores de entrada forem inválidos
@@ -154,20 +162,18 @@ def validar_guindaste(carga_total, capacidade_raio, capacidade_alcance_max,
         angulo_rad = np.arccos(razao_segura)
         angulo = np.degrees(angulo_rad)
         
-        logger.info(
-            f"Cálculo de ângulo: Raio={raio_max}m, "
-            f"Lança={extensao_lanca}m, "
-            f"Ângulo calculado={angulo:.2f}°"
+        logger.debug(
+            "Cálculo de ângulo: Raio=%sm, Lança=%sm, Ângulo calculado=%.2f°",
+            raio_max, extensao_lanca, angulo
         )
         
     except Exception as e:
-        logger.error(f"Erro no cálculo trigonométrico: {e}")
+        logger.error("Erro no cálculo trigonométrico: %s", e)
         raise ValueError(f"Erro ao calcular o ângulo da lança: {e}")
     
     # ==================== VALIDAÇÃO DE ÂNGULO ====================
     
     # Define a zona de atenção (5° acima do mínimo)
-    MARGEM_ANGULO_ATENCAO = 5.0
     angulo_zona_atencao = angulo_minimo_fabricante + MARGEM_ANGULO_ATENCAO
     
     adequado = True
@@ -181,7 +187,7 @@ def validar_guindaste(carga_total, capacidade_raio, capacidade_alcance_max,
             f"do mínimo permitido pelo fabricante ({angulo_minimo_fabricante}°). "
             f"Esta configuração pode causar tombamento do equipamento."
         )
-        logger.warning(f"Ângulo inseguro detectado: {angulo:.1f}° < {angulo_minimo_fabricante}°")
+        logger.warning("Ângulo inseguro detectado: %.1f° < %s°", angulo, angulo_minimo_fabricante)
     
     # 2. Verifica se está na ZONA DE ATENÇÃO (próximo ao limite)
     elif angulo < angulo_zona_atencao:
@@ -191,7 +197,7 @@ def validar_guindaste(carga_total, capacidade_raio, capacidade_alcance_max,
             f"do limite mínimo de segurança ({angulo_minimo_fabricante}°). "
             f"Recomenda-se maior margem de segurança."
         )
-        logger.warning(f"Ângulo na zona de atenção: {angulo:.1f}°")
+        logger.warning("Ângulo na zona de atenção: %.1f°", angulo)
     
     else:
         mensagem = f"Ângulo da lança adequado ({angulo:.1f}°)."
@@ -205,9 +211,6 @@ def validar_guindaste(carga_total, capacidade_raio, capacidade_alcance_max,
     # A porcentagem crítica é a maior entre as duas
     porcentagem_segura = max(porcentagem_raio, porcentagem_alcance_max)
     
-    # Define limite de segurança em 80%
-    LIMITE_SEGURANCA = 80.0
-    
     # Verifica se excede o limite de 80%
     if porcentagem_segura > LIMITE_SEGURANCA:
         adequado = False
@@ -217,8 +220,8 @@ def validar_guindaste(carga_total, capacidade_raio, capacidade_alcance_max,
             f"Esta operação requer análise adicional da engenharia."
         )
         logger.warning(
-            f"Capacidade excedida: {porcentagem_segura:.1f}% "
-            f"(Raio: {porcentagem_raio:.1f}%, Alcance: {porcentagem_alcance_max:.1f}%)"
+            "Capacidade excedida: %.1f%% (Raio: %.1f%%, Alcance: %.1f%%)",
+            porcentagem_segura, porcentagem_raio, porcentagem_alcance_max
         )
         
         # Se já estava com problema de ângulo, concatena as mensagens
@@ -229,30 +232,33 @@ def validar_guindaste(carga_total, capacidade_raio, capacidade_alcance_max,
     
     # ==================== PREPARAÇÃO DO RESULTADO ====================
     
-    resultado = {
-        'porcentagem_segura': porcentagem_segura,
-        'adequado': adequado,
-        'mensagem': mensagem,
-        'detalhes': {
-            'raio_max': raio_max,
-            'extensao_lanca': extensao_lanca,
-            'capacidade_raio': capacidade_raio,
-            'capacidade_alcance': capacidade_alcance_max,
-            'porcentagem_raio': porcentagem_raio,
-            'porcentagem_alcance': porcentagem_alcance_max,
-            'angulo_lanca': angulo,
-            'angulo_minimo_fabricante': angulo_minimo_fabricante,
-            'na_zona_atencao': angulo < angulo_zona_atencao and angulo >= angulo_minimo_fabricante
-        }
-    }
+    resultado = CraneValidation(
+        porcentagem_segura=float(porcentagem_segura),
+        adequado=adequado,
+        mensagem=mensagem,
+        raio_max=raio_max,
+        extensao_lanca=extensao_lanca,
+        capacidade_raio=capacidade_raio,
+        capacidade_alcance=capacidade_alcance_max,
+        porcentagem_raio=porcentagem_raio,
+        porcentagem_alcance=porcentagem_alcance_max,
+        angulo_lanca=float(angulo),
+        angulo_minimo_fabricante=angulo_minimo_fabricante,
+        na_zona_atencao=bool(angulo < angulo_zona_atencao and angulo >= angulo_minimo_fabricante)
+    )
     
     # Log do resultado final
-    status = "ADEQUADO" if adequado else "INADEQUADO"
-    logger.info(
-        f"Validação concluída: {status} | "
-        f"Ângulo: {angulo:.1f}° | "
-        f"Utilização: {porcentagem_segura:.1f}%"
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Validação concluída: %s | Ângulo: %.1f° | Utilização: %.1f%%",
+            "ADEQUADO" if adequado else "INADEQUADO", angulo, porcentagem_segura,
+            extra={
+                'evento': 'validacao_guindaste',
+                'adequado': adequado,
+                'angulo_lanca': resultado.angulo_lanca,
+                'porcentagem_segura': resultado.porcentagem_segura
+            }
+        )
     
     return resultado
 
@@ -304,6 +310,163 @@ def calcular_fator_seguranca(carga_total, capacidade):
     return capacidade / carga_total
 
 
+# ==================== VERSÕES VETORIZADAS (LOTE) ====================
+
+def _como_array(valor, nome):
+    """Converte escalar, lista, ndarray ou coluna do pandas em ndarray float64."""
+    try:
+        return np.asarray(valor, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError(f"{nome} deve conter apenas números.")
 
 
+def _verificar_lote(condicao_invalida, mensagem):
+    """Levanta ValueError indicando a primeira linha inválida do lote, se houver."""
+    if np.any(condicao_invalida):
+        indices = np.flatnonzero(condicao_invalida)
+        raise ValueError(
+            f"{mensagem} ({indices.size} linha(s) inválida(s); primeira na posição {indices[0]})."
+        )
+
+
+def _carga_total_vetorizada(peso_carga, equipamento_novo, peso_acessorios):
+    """Núcleo vetorizado do cálculo de carga, sem validação de entradas nem log."""
+    margem_seguranca = np.where(equipamento_novo, MARGEM_EQUIPAMENTO_NOVO, MARGEM_EQUIPAMENTO_USADO)
+    peso_seguranca = peso_carga * margem_seguranca
+    peso_considerar = peso_carga + peso_seguranca
+    peso_cabos = peso_considerar * FATOR_CABOS
+    carga_total = peso_considerar + peso_acessorios + peso_cabos
+    
+    return {
+        'peso_carga': peso_carga,
+        'peso_seguranca': peso_seguranca,
+        'peso_considerar': peso_considerar,
+        'peso_cabos': peso_cabos,
+        'peso_acessorios': peso_acessorios,
+        'carga_total': carga_total,
+        'margem_seguranca_percentual': margem_seguranca * 100
+    }
+
+
+def _validacao_vetorizada(carga_total, capacidade_raio, capacidade_alcance_max,
+                          raio_max, extensao_lanca, angulo_minimo_fabricante):
+    """
+    Núcleo vetorizado da validação, sem checagem de entradas nem log.
+    
+    Configurações impossíveis (raio maior que a lança) resultam em ângulo 0° e
+    capacidade nula em utilização infinita, ambas classificadas como inadequadas.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        angulo = np.degrees(np.arccos(np.clip(raio_max / extensao_lanca, -1.0, 1.0)))
+        porcentagem_raio = (carga_total / capacidade_raio) * 100
+        porcentagem_alcance = (carga_total / capacidade_alcance_max) * 100
+    porcentagem_segura = np.maximum(porcentagem_raio, porcentagem_alcance)
+    
+    angulo_seguro = angulo >= angulo_minimo_fabricante
+    adequado = angulo_seguro & (porcentagem_segura <= LIMITE_SEGURANCA)
+    na_zona_atencao = angulo_seguro & (angulo < angulo_minimo_fabricante + MARGEM_ANGULO_ATENCAO)
+    
+    return {
+        'porcentagem_segura': porcentagem_segura,
+        'adequado': adequado,
+        'porcentagem_raio': porcentagem_raio,
+        'porcentagem_alcance': porcentagem_alcance,
+        'angulo_lanca': angulo,
+        'na_zona_atencao': na_zona_atencao
+    }
+
 
+def calcular_carga_total_batch(peso_carga, equipamento_novo=True, peso_acessorios=0):
+    """
+    Versão vetorizada de calcular_carga_total para muitas operações de uma vez.
+    
+    Aceita escalares, listas, arrays NumPy ou colunas do pandas (com broadcast
+    entre os argumentos) e aplica exatamente as mesmas regras da versão escalar.
+    
+    Args:
+        peso_carga (array-like): Pesos principais das cargas em kg
+        equipamento_novo (array-like de bool): True para novo (10%), False para usado (25%)
+        peso_acessorios (array-like): Pesos dos acessórios em kg
+    
+    Returns:
+        dict: Colunas (ndarray) com os mesmos campos de LoadResult
+    
+    Raises:
+        ValueError: Se algum valor de entrada for inválido
+    """
+    peso_carga = _como_array(peso_carga, "peso_carga")
+    peso_acessorios = _como_array(peso_acessorios, "peso_acessorios")
+    equipamento_novo = np.asarray(equipamento_novo)
+    if equipamento_novo.dtype != np.bool_:
+        raise ValueError("equipamento_novo deve conter apenas True ou False.")
+    
+    peso_carga, equipamento_novo, peso_acessorios = np.broadcast_arrays(
+        peso_carga, equipamento_novo, peso_acessorios
+    )
+    
+    _verificar_lote(~(peso_carga > 0), "O peso da carga deve ser um valor positivo")
+    _verificar_lote(~(peso_acessorios >= 0), "O peso dos acessórios não pode ser negativo")
+    
+    resultado = _carga_total_vetorizada(peso_carga, equipamento_novo, peso_acessorios)
+    logger.info("Cálculo de carga em lote: %d operações", peso_carga.size)
+    return resultado
+
+
+def validar_guindaste_batch(carga_total, capacidade_raio, capacidade_alcance_max,
+                            raio_max, extensao_lanca, angulo_minimo_fabricante):
+    """
+    Versão vetorizada de validar_guindaste para revalidar muitas operações de uma vez.
+    
+    As regras (ângulo mínimo, zona de atenção de 5° e limite de 80% de utilização)
+    são idênticas às da versão escalar; apenas as mensagens de texto não são geradas.
+    Aceita escalares, arrays NumPy ou colunas do pandas, com broadcast.
+    
+    Args:
+        carga_total (array-like): Cargas totais calculadas em kg
+        capacidade_raio (array-like): Capacidades no raio especificado em kg
+        capacidade_alcance_max (array-like): Capacidades no alcance máximo em kg
+        raio_max (array-like): Raios de operação em metros
+        extensao_lanca (array-like): Extensões da lança em metros
+        angulo_minimo_fabricante (array-like): Ângulos mínimos em graus
+    
+    Returns:
+        dict: Colunas (ndarray) 'porcentagem_segura', 'adequado', 'porcentagem_raio',
+              'porcentagem_alcance', 'angulo_lanca' e 'na_zona_atencao'
+    
+    Raises:
+        ValueError: Se algum valor de entrada for inválido
+    """
+    colunas = np.broadcast_arrays(
+        _como_array(carga_total, "carga_total"),
+        _como_array(capacidade_raio, "capacidade_raio"),
+        _como_array(capacidade_alcance_max, "capacidade_alcance_max"),
+        _como_array(raio_max, "raio_max"),
+        _como_array(extensao_lanca, "extensao_lanca"),
+        _como_array(angulo_minimo_fabricante, "angulo_minimo_fabricante")
+    )
+    carga_total, capacidade_raio, capacidade_alcance_max, raio_max, extensao_lanca, angulo_minimo = colunas
+    
+    # Mesmas validações da versão escalar (NaN também é rejeitado)
+    _verificar_lote(~(carga_total > 0), "A carga total deve ser um valor positivo")
+    _verificar_lote(~(capacidade_raio > 0), "A capacidade no raio deve ser um valor positivo")
+    _verificar_lote(~(capacidade_alcance_max > 0), "A capacidade no alcance deve ser um valor positivo")
+    _verificar_lote(~(raio_max > 0), "O raio de operação deve ser um valor positivo")
+    _verificar_lote(~(extensao_lanca > 0), "A extensão da lança deve ser um valor positivo")
+    _verificar_lote(
+        ~((angulo_minimo >= 1) & (angulo_minimo <= 89)),
+        "O ângulo mínimo deve estar entre 1° e 89°"
+    )
+    _verificar_lote(
+        raio_max > extensao_lanca,
+        "Configuração geometricamente impossível: o raio de operação não pode ser maior que a extensão da lança"
+    )
+    
+    resultado = _validacao_vetorizada(
+        carga_total, capacidade_raio, capacidade_alcance_max, raio_max, extensao_lanca, angulo_minimo
+    )
+    adequado = resultado['adequado']
+    logger.info(
+        "Validação em lote: %d operações, %d inadequadas",
+        adequado.size, adequado.size - np.count_nonzero(adequado)
+    )
+    return resultado
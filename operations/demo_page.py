@@ -1,7 +1,7 @@
 import streamlit as st
-import pandas as pd
 from operations.calc import calcular_carga_total, validar_guindaste
-from operations.plot import criar_diagrama_guindaste
+from operations.plot import criar_diagrama_guindaste_cached, criar_mapa_what_if
+from operations.results import tabela_resumo_carga
 
 def show_demo_page():
     """
@@ -74,7 +74,7 @@ def show_demo_page():
                 resultado_calc = calcular_carga_total(st.session_state.demo_peso_carga, equip_novo, st.session_state.demo_peso_acessorios)
                 
                 validacao = validar_guindaste(
-                    carga_total=resultado_calc['carga_total'], 
+                    carga_total=resultado_calc.carga_total, 
                     capacidade_raio=st.session_state.demo_capacidade_raio, 
                     capacidade_alcance_max=st.session_state.demo_capacidade_alcance, 
                     raio_max=st.session_state.demo_raio_max, 
@@ -82,7 +82,7 @@ def show_demo_page():
                     angulo_minimo_fabricante=st.session_state.demo_angulo_minimo_input
                 )
 
-                mensagem_validacao = validacao.get('mensagem', 'Falha na validação.')
+                mensagem_validacao = validacao.mensagem or 'Falha na validação.'
                 if "INSEGURA" in mensagem_validacao.upper():
                     st.error(f"❌ {mensagem_validacao}")
                 elif "ATENÇÃO" in mensagem_validacao.upper():
@@ -91,33 +91,33 @@ def show_demo_page():
                     st.success(f"✅ {mensagem_validacao}")
                 
                 st.plotly_chart(
-                    criar_diagrama_guindaste(
+                    criar_diagrama_guindaste_cached(
                         st.session_state.demo_raio_max, st.session_state.demo_extensao_lanca, 
-                        resultado_calc['carga_total'], st.session_state.demo_capacidade_raio, 
+                        resultado_calc.carga_total, st.session_state.demo_capacidade_raio, 
                         st.session_state.demo_angulo_minimo_input
                     ), 
                     use_container_width=True
                 )
 
+                with st.expander("🗺️ Mapa What-if (Raio × Carga)"):
+                    st.plotly_chart(
+                        criar_mapa_what_if(
+                            st.session_state.demo_raio_max, resultado_calc.carga_total,
+                            st.session_state.demo_extensao_lanca, st.session_state.demo_capacidade_raio,
+                            st.session_state.demo_capacidade_alcance, st.session_state.demo_angulo_minimo_input
+                        ),
+                        use_container_width=True
+                    )
+                    st.caption("Áreas em cinza: ângulo da lança abaixo do mínimo. O marcador indica a operação atual.")
+
                 col_tabela, col_metricas = st.columns(2)
                 with col_tabela:
-                    st.dataframe(pd.DataFrame({
-                        'Descrição': ['Peso Carga', 'Margem (%)', 'Peso Segurança', 'Peso Acessórios', 'Peso Cabos (3%)', 'CARGA TOTAL'],
-                        'Valor (kg)': [
-                            f"{resultado_calc.get('peso_carga', 0):.2f}",
-                            f"{resultado_calc.get('margem_seguranca_percentual', 0):.2f}",
-                            f"{resultado_calc.get('peso_seguranca', 0):.2f}",
-                            f"{resultado_calc.get('peso_acessorios', 0):.2f}",
-                            f"{resultado_calc.get('peso_cabos', 0):.2f}",
-                            f"**{resultado_calc.get('carga_total', 0):.2f}**"
-                        ]
-                    }), hide_index=True)
+                    st.dataframe(tabela_resumo_carga(resultado_calc), hide_index=True)
                 
                 with col_metricas:
-                    detalhes = validacao.get('detalhes', {})
-                    st.metric("Ângulo da Lança", f"{detalhes.get('angulo_lanca', 0):.1f}°")
-                    st.metric("Utilização no Raio", f"{detalhes.get('porcentagem_raio', 0):.1f}%")
-                    st.metric("Utilização na Lança", f"{detalhes.get('porcentagem_alcance', 0):.1f}%")
+                    st.metric("Ângulo da Lança", f"{validacao.angulo_lanca:.1f}°")
+                    st.metric("Utilização no Raio", f"{validacao.porcentagem_raio:.1f}%")
+                    st.metric("Utilização na Lança", f"{validacao.porcentagem_alcance:.1f}%")
 
                 # --- SEÇÃO DE EXPLICAÇÃO DOS CÁLCULOS (TEXTO MELHORADO) ---
                 st.divider()
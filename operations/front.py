@@ -7,14 +7,19 @@ from datetime import datetime, date
 import time
 import logging
 
-from operations.plot import criar_diagrama_guindaste
+from operations.plot import criar_diagrama_guindaste_cached, criar_mapa_what_if
 from operations.calc import calcular_carga_total, validar_guindaste
-from gdrive.gdrive_upload import GoogleDriveUploader
+from operations.solver import limites_operacao
+from operations.load_chart import validar_guindaste_por_grafico
+from operations.monte_carlo import simular_incerteza, DISTRIBUICOES
+from operations.results import linha_planilha_icamento, tabela_resumo_carga
+from fleet.catalog import obter_catalogo
+from utils.audit_log import configurar_logging, definir_id_avaliacao
 from gdrive.config import LIFTING_SHEET_NAME, CRANE_SHEET_NAME
-from AI.api_Operation import PDFQA
+from gdrive.sheet_mirror import solicitar_sincronizacao
 from utils.prompts import get_crlv_prompt, get_art_prompt, get_cnh_prompt, get_nr11_prompt, get_mprev_prompt
 
-logging.basicConfig(level=logging.INFO)
+configurar_logging()
 
 def mostrar_instrucoes():
     with st.expander("📖 Como usar este aplicativo", expanded=False):
@@ -118,7 +123,7 @@ def handle_upload_with_id(uploader, arquivo, tipo_doc, id_avaliacao):
             
     except Exception as e:
         st.error(f"Erro no upload de '{tipo_doc}': {e}")
-        logging.exception(f"Erro no upload de {tipo_doc}")
+        logging.exception("Erro no upload de %s", tipo_doc)
         return {'success': False, 'error': str(e)}
 
 
@@ -174,6 +179,8 @@ def inicializar_session_state():
         st.session_state.fabricante_guindaste_calc = ""
     if 'nome_guindaste_calc' not in st.session_state:
         st.session_state.nome_guindaste_calc = ""
+    if 'guindaste_frota' not in st.session_state:
+        st.session_state.guindaste_frota = ""
     
     # ID e dados da avaliação
     if 'id_avaliacao' not in st.session_state: 
@@ -182,6 +189,16 @@ def inicializar_session_state():
         st.session_state.dados_icamento = {}
 
 
+def aplicar_guindaste_frota():
+    """Preenche identificação e ângulo mínimo a partir do guindaste selecionado na frota"""
+    spec = obter_catalogo().get(st.session_state.get('guindaste_frota'))
+    if spec is None:
+        return
+    st.session_state.fabricante_guindaste_calc = spec.fabricante
+    st.session_state.nome_guindaste_calc = spec.modelo
+    st.session_state.angulo_minimo_input = float(spec.angulo_minimo)
+
+
 def validar_inputs_calculo():
     """
     Valida se todos os inputs necessários para o cálculo estão preenchidos corretamente.
@@ -204,7 +221,7 @@ def validar_inputs_calculo():
         return all(checks.values()), checks
         
     except (KeyError, TypeError, AttributeError) as e:
-        logging.error(f"Erro na validação de inputs: {e}")
+        logging.error("Erro na validação de inputs: %s", e)
         return False, {}
 
 
@@ -235,10 +252,19 @@ def validar_geometria_guindaste(raio, extensao):
     return True, "Geometria válida"
 
 
+def formatar_limite(valor, unidade):
+    """Formata um limite do envelope; NaN indica que nenhuma configuração atende."""
+    if np.isnan(valor):
+        return "Não atende"
+    return f"{valor:.2f} {unidade}"
+
+
 def front_page():
     """Página principal da calculadora de içamento"""
     # Inicialização do session_state
     inicializar_session_state()
+    # Registros de log desta execução ficam associados à avaliação em curso
+    definir_id_avaliacao(st.session_state.id_avaliacao)
     
     st.title("Calculadora de Movimentação de Carga")
     mostrar_instrucoes()
@@ -285,6 +311,20 @@ def front_page():
             )
 
             st.divider()
+
+            # Seleção opcional de um guindaste cadastrado no catálogo da frota
+            catalogo = obter_catalogo()
+            spec_frota = None
+            if len(catalogo):
+                st.selectbox(
+                    "Guindaste da Frota",
+                    [""] + catalogo.ids(),
+                    key="guindaste_frota",
+                    format_func=lambda id_g: "Informar manualmente" if not id_g else f"{catalogo.get(id_g).nome} ({id_g})",
+                    on_change=aplicar_guindaste_frota,
+                    help="Preenche fabricante, modelo, ângulo mínimo e capacidades a partir do gráfico de carga cadastrado"
+                )
+                spec_frota = catalogo.get(st.session_state.guindaste_frota)
             
             st.text_input(
                 "Fabricante do Guindaste", 
@@ -306,11 +346,22 @@ def front_page():
                 help="Distância horizontal do centro do guindaste até o ponto de içamento"
             )
             
+            # Com guindaste da frota, a capacidade vem do gráfico de carga no raio e extensão exatos
+            if spec_frota is not None:
+                capacidade_grafico = spec_frota.grafico.capacidade_conservadora(
+                    st.session_state.raio_max, st.session_state.extensao_lanca
+                )
+                st.session_state.capacidade_raio = capacidade_grafico
+                st.session_state.capacidade_alcance = capacidade_grafico
+                if capacidade_grafico <= 0 and st.session_state.raio_max > 0 and st.session_state.extensao_lanca > 0:
+                    st.warning("Configuração fora do gráfico de carga cadastrado para este guindaste.")
+            
             st.number_input(
                 "Capacidade no Raio (kg)", 
                 min_value=0.0, 
                 step=100.0, 
                 key="capacidade_raio",
+                disabled=spec_frota is not None,
                 help="Capacidade máxima do guindaste no raio informado"
             )
             
@@ -327,6 +378,7 @@ def front_page():
                 min_value=0.0, 
                 step=100.0, 
                 key="capacidade_alcance",
+                disabled=spec_frota is not None,
                 help="Capacidade máxima na extensão máxima da lança"
             )
 
@@ -379,32 +431,38 @@ def front_page():
                             st.session_state.peso_acessorios
                         )
                         
-                        # Validação do guindaste
-                        validacao = validar_guindaste(
-                            carga_total=resultado_calc['carga_total'], 
-                            capacidade_raio=st.session_state.capacidade_raio, 
-                            capacidade_alcance_max=st.session_state.capacidade_alcance, 
-                            raio_max=st.session_state.raio_max, 
-                            extensao_lanca=st.session_state.extensao_lanca,
-                            angulo_minimo_fabricante=st.session_state.angulo_minimo_input
-                        )
+                        # Validação do guindaste: com guindaste da frota, pela capacidade do
+                        # gráfico de carga no raio e na extensão exatos da operação
+                        if spec_frota is not None:
+                            validacao = validar_guindaste_por_grafico(
+                                resultado_calc.carga_total,
+                                spec_frota.grafico,
+                                st.session_state.raio_max,
+                                st.session_state.extensao_lanca,
+                                st.session_state.angulo_minimo_input
+                            )
+                        else:
+                            validacao = validar_guindaste(
+                                carga_total=resultado_calc.carga_total, 
+                                capacidade_raio=st.session_state.capacidade_raio, 
+                                capacidade_alcance_max=st.session_state.capacidade_alcance, 
+                                raio_max=st.session_state.raio_max, 
+                                extensao_lanca=st.session_state.extensao_lanca,
+                                angulo_minimo_fabricante=st.session_state.angulo_minimo_input
+                            )
 
                         # Armazenar dados para uso posterior
+                        # Os resultados são imutáveis e já trazem raio, lança, capacidades e ângulo
                         st.session_state.dados_icamento = {
-                            **resultado_calc,
+                            'carga': resultado_calc,
+                            'validacao': validacao,
                             'fabricante_guindaste': st.session_state.fabricante_guindaste_calc,
                             'nome_guindaste': st.session_state.nome_guindaste_calc,
-                            'modelo_guindaste': "",
-                            'raio_max': st.session_state.raio_max,
-                            'capacidade_raio': st.session_state.capacidade_raio,
-                            'extensao_lanca': st.session_state.extensao_lanca,
-                            'capacidade_alcance': st.session_state.capacidade_alcance,
-                            'angulo_minimo_fabricante': st.session_state.angulo_minimo_input,
-                            'validacao': validacao
+                            'modelo_guindaste': ""
                         }
 
                         # Exibir mensagem de validação
-                        mensagem_validacao = validacao.get('mensagem', 'Falha na validação.')
+                        mensagem_validacao = validacao.mensagem or 'Falha na validação.'
                         
                         if "INSEGURA" in mensagem_validacao.upper():
                             st.error(f"❌ {mensagem_validacao}")
@@ -415,10 +473,10 @@ def front_page():
                         
                         # Diagrama
                         try:
-                            diagrama = criar_diagrama_guindaste(
+                            diagrama = criar_diagrama_guindaste_cached(
                                 st.session_state.raio_max, 
                                 st.session_state.extensao_lanca, 
-                                resultado_calc['carga_total'], 
+                                resultado_calc.carga_total, 
                                 st.session_state.capacidade_raio, 
                                 st.session_state.angulo_minimo_input
                             )
@@ -427,39 +485,154 @@ def front_page():
                             st.error(f"Erro ao gerar diagrama: {e}")
                             logging.exception("Erro ao gerar diagrama")
 
+                        with st.expander("🗺️ Mapa What-if (Raio × Carga)"):
+                            st.plotly_chart(
+                                criar_mapa_what_if(
+                                    st.session_state.raio_max, resultado_calc.carga_total,
+                                    st.session_state.extensao_lanca, st.session_state.capacidade_raio,
+                                    st.session_state.capacidade_alcance, st.session_state.angulo_minimo_input,
+                                    grafico=spec_frota.grafico if spec_frota is not None else None
+                                ),
+                                use_container_width=True
+                            )
+                            if spec_frota is not None:
+                                st.caption(
+                                    "Capacidade por raio do gráfico de carga do guindaste. Áreas em cinza: ângulo "
+                                    "da lança abaixo do mínimo ou raio fora do gráfico. O marcador indica a operação atual."
+                                )
+                            else:
+                                st.caption("Áreas em cinza: ângulo da lança abaixo do mínimo. O marcador indica a operação atual.")
+
+                        # Envelope de trabalho seguro (limites da configuração atual)
+                        limites = limites_operacao(
+                            resultado_calc.carga_total,
+                            st.session_state.capacidade_raio,
+                            st.session_state.capacidade_alcance,
+                            st.session_state.raio_max,
+                            st.session_state.extensao_lanca,
+                            st.session_state.angulo_minimo_input,
+                            equip_novo,
+                            st.session_state.peso_acessorios,
+                            grafico=spec_frota.grafico if spec_frota is not None else None
+                        )
+                        if spec_frota is not None:
+                            ajuda_raio = "Maior raio que mantém o ângulo mínimo e a utilização do gráfico de carga até 80%, com a extensão de lança atual"
+                            ajuda_extensao = "Menor extensão que mantém o ângulo mínimo e a utilização do gráfico de carga até 80%, no raio atual"
+                        else:
+                            ajuda_raio = "Maior raio que mantém o ângulo mínimo com a extensão de lança atual"
+                            ajuda_extensao = "Menor extensão que mantém o ângulo mínimo no raio atual"
+                        with st.expander("🧭 Envelope de Trabalho Seguro", expanded=not validacao.adequado):
+                            col_env1, col_env2 = st.columns(2)
+                            with col_env1:
+                                st.metric("Peso Máximo da Carga", f"{limites['peso_carga_maximo']:,.2f} kg")
+                                st.metric("Carga Total Máxima (80%)", f"{limites['carga_total_maxima']:,.2f} kg")
+                            with col_env2:
+                                st.metric(
+                                    "Raio Máximo",
+                                    formatar_limite(limites['raio_maximo'], "m"),
+                                    help=ajuda_raio
+                                )
+                                st.metric(
+                                    "Extensão Mínima da Lança",
+                                    formatar_limite(limites['extensao_minima'], "m"),
+                                    help=ajuda_extensao
+                                )
+                            if limites['folga_carga'] < 0:
+                                st.error(f"Carga excede o limite em {-limites['folga_carga']:,.2f} kg.")
+                            else:
+                                st.caption(f"Folga até o limite de 80%: {limites['folga_carga']:,.2f} kg")
+
+                        # Guindastes da frota que atendem a carga no raio informado
+                        if len(catalogo):
+                            with st.expander("🏗️ Guindastes da Frota Aptos para esta Operação"):
+                                aptos = catalogo.guindastes_aptos(
+                                    resultado_calc.carga_total, st.session_state.raio_max
+                                )
+                                if aptos:
+                                    st.dataframe(
+                                        pd.DataFrame(aptos).rename(columns={
+                                            'id': 'ID', 'fabricante': 'Fabricante', 'modelo': 'Modelo',
+                                            'tipo': 'Tipo', 'capacidade': 'Capacidade (kg)',
+                                            'extensao_lanca': 'Lança (m)', 'angulo_lanca': 'Ângulo (°)',
+                                            'porcentagem_segura': 'Utilização (%)',
+                                            'na_zona_atencao': 'Zona de Atenção'
+                                        }),
+                                        hide_index=True,
+                                        use_container_width=True
+                                    )
+                                else:
+                                    st.info("Nenhum guindaste da frota atende esta carga neste raio.")
+
+                        # Análise probabilística para pesos estimados
+                        with st.expander("🎲 Análise de Incerteza (Monte Carlo)"):
+                            col_mc1, col_mc2, col_mc3 = st.columns(3)
+                            with col_mc1:
+                                incerteza_peso = st.number_input(
+                                    "Incerteza do peso (%)", min_value=0.0, max_value=100.0,
+                                    value=10.0, step=1.0, key="mc_incerteza_peso"
+                                )
+                                distribuicao = st.selectbox("Distribuição", DISTRIBUICOES, key="mc_distribuicao")
+                            with col_mc2:
+                                incerteza_acessorios = st.number_input(
+                                    "Incerteza dos acessórios (%)", min_value=0.0, max_value=100.0,
+                                    value=10.0, step=1.0, key="mc_incerteza_acessorios"
+                                )
+                                n_amostras = st.selectbox(
+                                    "Amostras", [100_000, 250_000, 500_000, 1_000_000],
+                                    format_func=lambda n: f"{n:,}".replace(",", "."), key="mc_amostras"
+                                )
+                            with col_mc3:
+                                incerteza_raio = st.number_input(
+                                    "Incerteza do raio (m)", min_value=0.0, value=0.0,
+                                    step=0.1, key="mc_incerteza_raio"
+                                )
+                            st.caption(
+                                "Normal: incerteza = desvio padrão. Triangular/uniforme: incerteza = "
+                                "variação máxima em torno do valor informado."
+                            )
+                            if st.button("Simular", key="mc_button"):
+                                simulacao = simular_incerteza(
+                                    st.session_state.peso_carga, equip_novo, st.session_state.peso_acessorios,
+                                    st.session_state.raio_max, st.session_state.extensao_lanca,
+                                    st.session_state.capacidade_raio, st.session_state.capacidade_alcance,
+                                    st.session_state.angulo_minimo_input,
+                                    incerteza_peso=incerteza_peso / 100,
+                                    incerteza_acessorios=incerteza_acessorios / 100,
+                                    incerteza_raio=incerteza_raio,
+                                    distribuicao=distribuicao,
+                                    n_amostras=n_amostras,
+                                    grafico=spec_frota.grafico if spec_frota is not None else None
+                                )
+                                col_p1, col_p2, col_p3 = st.columns(3)
+                                col_p1.metric("P(Utilização > 80%)", f"{simulacao['prob_excedencia'] * 100:.2f}%")
+                                col_p2.metric("P(Ângulo Inseguro)", f"{simulacao['prob_angulo_inseguro'] * 100:.2f}%")
+                                col_p3.metric("P(Operação Inadequada)", f"{simulacao['prob_inadequado'] * 100:.2f}%")
+                                percentis = simulacao['percentis']
+                                st.dataframe(
+                                    pd.DataFrame({
+                                        'Percentil': [f"P{p}" for p in percentis['carga_total']],
+                                        'Carga Total (kg)': [f"{v:.2f}" for v in percentis['carga_total'].values()],
+                                        'Utilização (%)': [f"{v:.1f}" for v in percentis['porcentagem_segura'].values()],
+                                        'Ângulo (°)': [f"{v:.1f}" for v in percentis['angulo_lanca'].values()]
+                                    }),
+                                    hide_index=True,
+                                    use_container_width=True
+                                )
+
                         # Tabelas e métricas
                         col_tabela, col_metricas = st.columns(2)
                         
                         with col_tabela:
-                            df_calculo = pd.DataFrame({
-                                'Descrição': [
-                                    'Peso Carga', 
-                                    'Margem (%)', 
-                                    'Peso Segurança', 
-                                    'Peso Acessórios', 
-                                    'Peso Cabos (3%)', 
-                                    'CARGA TOTAL'
-                                ],
-                                'Valor (kg)': [
-                                    f"{resultado_calc.get('peso_carga', 0):.2f}",
-                                    f"{resultado_calc.get('margem_seguranca_percentual', 0):.2f}",
-                                    f"{resultado_calc.get('peso_seguranca', 0):.2f}",
-                                    f"{resultado_calc.get('peso_acessorios', 0):.2f}",
-                                    f"{resultado_calc.get('peso_cabos', 0):.2f}",
-                                    f"**{resultado_calc.get('carga_total', 0):.2f}**"
-                                ]
-                            })
-                            st.dataframe(df_calculo, hide_index=True, use_container_width=True)
+                            st.dataframe(tabela_resumo_carga(resultado_calc), hide_index=True, use_container_width=True)
                         
                         with col_metricas:
-                            detalhes = validacao.get('detalhes', {})
-                            st.metric("Ângulo da Lança", f"{detalhes.get('angulo_lanca', 0):.1f}°")
-                            st.metric("Utilização no Raio", f"{detalhes.get('porcentagem_raio', 0):.1f}%")
-                            st.metric("Utilização na Lança", f"{detalhes.get('porcentagem_alcance', 0):.1f}%")
+                            st.metric("Ângulo da Lança", f"{validacao.angulo_lanca:.1f}°")
+                            st.metric("Utilização no Raio", f"{validacao.porcentagem_raio:.1f}%")
+                            st.metric("Utilização na Lança", f"{validacao.porcentagem_alcance:.1f}%")
                 
                 except ValueError as e:
                     st.error(f"⚠️ Erro de Validação: {e}")
-                    logging.error(f"ValueError no cálculo: {e}")
+                    logging.error("ValueError no cálculo: %s", e)
                     
                 except Exception as e:
                     st.error(f"❌ Ocorreu um erro inesperado: {e}")
@@ -473,6 +646,10 @@ def front_page():
         st.info(f"ID da Avaliação: **{st.session_state.id_avaliacao}**")
         
         try:
+            # Drive e IA são carregados apenas quando a aba de documentos é executada
+            from gdrive.gdrive_upload import GoogleDriveUploader
+            from AI.api_Operation import PDFQA
+
             uploader = GoogleDriveUploader()
             ai_processor = PDFQA()
         except Exception as e:
@@ -690,11 +867,11 @@ def front_page():
                                     )
                                     if result and result.get('success'):
                                         uploads[upload_key] = result
-                                        logging.info(f"Upload bem-sucedido: {doc_type}")
+                                        logging.info("Upload bem-sucedido: %s", doc_type)
                                     else:
                                         error_msg = result.get('error', 'Erro desconhecido') if result else 'Resultado nulo'
                                         st.warning(f"Falha no upload de {doc_type}: {error_msg}")
-                                        logging.warning(f"Falha no upload de {doc_type}: {error_msg}")
+                                        logging.warning("Falha no upload de %s: %s", doc_type, error_msg)
                             
                             # Função auxiliar para obter URLs de forma segura
                             def get_url(key):
@@ -702,7 +879,7 @@ def front_page():
                                 try:
                                     return uploads.get(key, {}).get('url', '')
                                 except Exception as e:
-                                    logging.error(f"Erro ao obter URL para {key}: {e}")
+                                    logging.error("Erro ao obter URL para %s: %s", key, e)
                                     return ''
                             
                             # Preparar linha de dados do guindauto
@@ -736,50 +913,28 @@ def front_page():
                             
                             # Preparar linha de dados de içamento
                             d_icamento = st.session_state.dados_icamento
-                            v_icamento = d_icamento.get('validacao', {})
-                            det_icamento = v_icamento.get('detalhes', {})
-                            
-                            # Função auxiliar para obter valores com segurança
-                            def safe_get(dictionary, key, default=0):
-                                """Obtém valor de dicionário com fallback seguro"""
-                                try:
-                                    value = dictionary.get(key, default)
-                                    return value if value is not None else default
-                                except Exception as e:
-                                    logging.error(f"Erro ao obter {key}: {e}")
-                                    return default
-                            
-                            dados_icamento_row = [
+                            dados_icamento_row = linha_planilha_icamento(
                                 id_avaliacao,
                                 datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                                safe_get(d_icamento, 'peso_carga', 0),
-                                safe_get(d_icamento, 'margem_seguranca_percentual', 0),
-                                safe_get(d_icamento, 'peso_seguranca', 0),
-                                safe_get(d_icamento, 'peso_cabos', 0),
-                                safe_get(d_icamento, 'peso_acessorios', 0),
-                                safe_get(d_icamento, 'carga_total', 0),
-                                safe_get(v_icamento, 'adequado', False),
-                                f"{safe_get(det_icamento, 'porcentagem_raio', 0):.1f}%",
-                                f"{safe_get(det_icamento, 'porcentagem_alcance', 0):.1f}%",
-                                safe_get(d_icamento, 'fabricante_guindaste', ''),
-                                safe_get(d_icamento, 'nome_guindaste', ''),
-                                safe_get(d_icamento, 'modelo_guindaste', ''),
-                                safe_get(d_icamento, 'raio_max', 0),
-                                safe_get(d_icamento, 'capacidade_raio', 0),
-                                safe_get(d_icamento, 'extensao_lanca', 0),
-                                safe_get(d_icamento, 'capacidade_alcance', 0),
-                                safe_get(d_icamento, 'angulo_minimo_fabricante', 40)
-                            ]
+                                d_icamento['carga'],
+                                d_icamento['validacao'],
+                                d_icamento['fabricante_guindaste'],
+                                d_icamento['nome_guindaste'],
+                                d_icamento['modelo_guindaste']
+                            )
 
                             # Salvar nas planilhas
                             try:
                                 # Salvar dados de içamento
                                 uploader.append_data_to_sheet(LIFTING_SHEET_NAME, dados_icamento_row)
-                                logging.info(f"Dados de içamento salvos: {id_avaliacao}")
+                                logging.info("Dados de içamento salvos: %s", id_avaliacao)
                                 
                                 # Salvar dados do guindauto
                                 uploader.append_data_to_sheet(CRANE_SHEET_NAME, dados_guindauto_row)
-                                logging.info(f"Dados do guindauto salvos: {id_avaliacao}")
+                                logging.info("Dados do guindauto salvos: %s", id_avaliacao)
+
+                                # A nova avaliação aparece no histórico sem esperar a próxima rodada
+                                solicitar_sincronizacao()
                                 
                                 st.success(f"✅ Operação registrada com sucesso! ID: {id_avaliacao}")
                                 st.balloons()
@@ -793,14 +948,14 @@ def front_page():
                                              'capacidade_raio', 'extensao_lanca', 
                                              'capacidade_alcance', 'fabricante_guindaste_calc',
                                              'nome_guindaste_calc', 'estado_equip_radio',
-                                             'angulo_minimo_input']
+                                             'angulo_minimo_input', 'guindaste_frota']
                                 ]
                                 
                                 for key in keys_to_clear:
                                     if key in st.session_state:
                                         del st.session_state[key]
                                 
-                                logging.info(f"Session state limpa após salvamento: {id_avaliacao}")
+                                logging.info("Session state limpa após salvamento: %s", id_avaliacao)
                                 
                                 time.sleep(2)
                                 st.rerun()
@@ -835,7 +990,7 @@ def front_page():
                                  'capacidade_raio', 'extensao_lanca', 
                                  'capacidade_alcance', 'fabricante_guindaste_calc',
                                  'nome_guindaste_calc', 'estado_equip_radio',
-                                 'angulo_minimo_input']
+                                 'angulo_minimo_input', 'guindaste_frota']
                     ]
                     
                     for key in keys_to_clear:
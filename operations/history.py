@@ -1,29 +1,214 @@
+import os
+import uuid
+import functools
 import streamlit as st
 import pandas as pd
-from datetime import datetime
-from gdrive.gdrive_upload import GoogleDriveUploader
+import numpy as np
+from datetime import datetime, date
 from gdrive.config import LIFTING_SHEET_NAME, CRANE_SHEET_NAME
-from operations.plot import criar_diagrama_guindaste
-from operations.report_generator import generate_abnt_report
+from gdrive.sheet_mirror import obter_espelho, iniciar_sincronizacao, sincronizar_abas, quadro_aba
+from operations.plot import criar_diagrama_guindaste_cached, criar_dispersao_frota
+from operations.history_index import IndiceAvaliacoes
+from operations.history_table import (
+    TAMANHOS_PAGINA,
+    TAMANHO_PAGINA_PADRAO,
+    ordem_linhas,
+    numero_paginas,
+    fatia_pagina
+)
 from utils.helpers import safe_to_numeric
 
-@st.cache_data(ttl=600)
+ABAS_HISTORICO = [LIFTING_SHEET_NAME, CRANE_SHEET_NAME]
+
+def _versao_espelho(df):
+    """Versão do espelho de onde o DataFrame foi lido; identifica os dados nas chaves dos caches derivados."""
+    return df.attrs.get('versao_espelho')
+
 def load_sheet_data(sheet_name):
-    """Carrega dados de uma aba específica do Google Sheets."""
+    """
+    Carrega dados de uma aba a partir do espelho local das planilhas.
+
+    O espelho é atualizado em segundo plano, buscando no Google Sheets só as linhas
+    novas; esta função nunca espera pela rede, exceto no primeiro acesso do host, em
+    que a aba ainda não foi copiada. O DataFrame é o mesmo para todas as sessões do
+    processo (sem cópia a cada reexecução) e recebe as linhas novas por anexação, então
+    quem o recebe não deve alterá-lo.
+    """
     try:
-        uploader = GoogleDriveUploader()
-        data = uploader.get_data_from_sheet(sheet_name)
-        if not data or len(data) < 2: 
+        espelho = obter_espelho()
+        iniciar_sincronizacao(ABAS_HISTORICO)
+        versao = espelho.versao(sheet_name)
+        if versao is None:
+            sincronizar_abas([sheet_name])
+            versao = espelho.versao(sheet_name)
+        if versao is None or versao[1] == 0:
             st.warning(f"A planilha '{sheet_name}' está vazia ou não foi encontrada.")
             return pd.DataFrame()
-        headers, rows = data[0], data[1:]
-        max_cols = len(headers)
-        cleaned_rows = [row[:max_cols] + [None] * (max_cols - len(row)) for row in rows]
-        return pd.DataFrame(cleaned_rows, columns=headers)
+        return quadro_aba(sheet_name)
     except Exception as e:
         st.error(f"Erro ao carregar dados da planilha '{sheet_name}': {e}")
         return pd.DataFrame()
 
+def carregar_indice_avaliacoes(df_lifting, df_crane):
+    """Índice por ID e visão pré-unida das duas abas, montados uma vez por versão do espelho."""
+    return _montar_indice_avaliacoes(_versao_espelho(df_lifting), _versao_espelho(df_crane), df_lifting, df_crane)
+
+@st.cache_resource(max_entries=2)
+def _montar_indice_avaliacoes(versao_lifting, versao_crane, _df_lifting, _df_crane):
+    # Os DataFrames (prefixo _) não entram no hash da chave; as versões do espelho já os identificam
+    return IndiceAvaliacoes(_df_lifting, _df_crane)
+
+def _coluna_numerica(df, coluna):
+    """Versão vetorizada de safe_to_numeric para uma coluna inteira (aceita vírgula decimal e '%')."""
+    if coluna not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    texto = df[coluna].astype(str).str.replace(',', '.', regex=False).str.rstrip('%')
+    return pd.to_numeric(texto, errors='coerce')
+
+def carregar_dados_frota():
+    """Tabela da frota da versão atual do espelho (recalculada só quando chegam linhas novas)."""
+    df_lifting = load_sheet_data(LIFTING_SHEET_NAME)
+    df_crane = load_sheet_data(CRANE_SHEET_NAME)
+    return _montar_dados_frota(_versao_espelho(df_lifting), _versao_espelho(df_crane), df_lifting, df_crane)
+
+@st.cache_data(max_entries=4)
+def _montar_dados_frota(versao_lifting, versao_crane, _df_lifting, _df_crane):
+    """
+    Monta a tabela da frota (uma linha por avaliação) usada no gráfico de dispersão e
+    nos filtros da exportação em lote: data, ângulo da lança, utilização crítica,
+    resultado, guindaste e empresa.
+
+    O ângulo é recalculado a partir do raio e da extensão da lança, como em
+    validar_guindaste; a utilização é a maior entre a do raio e a do alcance. Os
+    DataFrames ficam fora da chave do cache (prefixo _); as versões os identificam.
+    """
+    df_lifting, df_crane = _df_lifting, _df_crane
+    if df_lifting.empty:
+        return pd.DataFrame(columns=['id', 'data', 'angulo', 'utilizacao', 'adequado', 'guindaste', 'empresa'])
+
+    raio = _coluna_numerica(df_lifting, 'Raio Máximo (m)').to_numpy()
+    lanca = _coluna_numerica(df_lifting, 'Alcance Máximo (m)').to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        angulo = np.degrees(np.arccos(np.clip(raio / lanca, -1.0, 1.0)))
+    angulo[~(lanca > 0)] = np.nan
+
+    utilizacao = np.fmax(
+        _coluna_numerica(df_lifting, '% Utilização Raio').to_numpy(),
+        _coluna_numerica(df_lifting, '% Utilização Alcance').to_numpy()
+    )
+
+    fabricante = df_lifting.get('Fabricante Guindaste', pd.Series('', index=df_lifting.index)).fillna('').astype(str)
+    modelo = df_lifting.get('Modelo Guindaste', pd.Series('', index=df_lifting.index)).fillna('').astype(str)
+    guindaste = (fabricante.str.strip() + ' ' + modelo.str.strip()).str.strip().replace('', 'Não informado')
+
+    frota = pd.DataFrame({
+        'id': df_lifting.iloc[:, 0].astype(str).to_numpy(),
+        'data': pd.to_datetime(df_lifting.iloc[:, 1], format='%Y-%m-%d %H:%M:%S', errors='coerce').to_numpy(),
+        'angulo': angulo,
+        'utilizacao': utilizacao,
+        'adequado': (df_lifting.get('Adequado', pd.Series('', index=df_lifting.index))
+                     .astype(str).str.strip().str.upper() == 'TRUE').to_numpy(),
+        'guindaste': guindaste.to_numpy()
+    })
+
+    if not df_crane.empty and 'Empresa' in df_crane.columns:
+        empresas = (df_crane.iloc[:, [0]].set_axis(['id'], axis=1)
+                    .assign(empresa=df_crane['Empresa'].fillna('').astype(str).str.strip().to_numpy())
+                    .drop_duplicates('id', keep='last'))
+        frota = frota.merge(empresas, on='id', how='left')
+    else:
+        frota['empresa'] = ''
+    frota['empresa'] = frota['empresa'].fillna('').replace('', 'Não informado')
+    return frota
+
+def render_dispersao_frota():
+    """Gráfico ângulo × utilização de toda a frota, com filtros por guindaste e empresa."""
+    st.subheader("Visão da Frota: Ângulo × Utilização")
+    frota = carregar_dados_frota()
+    if frota.empty:
+        st.info("Nenhuma avaliação disponível para o gráfico da frota.")
+        return
+
+    col_guindaste, col_empresa = st.columns(2)
+    with col_guindaste:
+        guindastes = st.multiselect("Filtrar por guindaste", sorted(frota['guindaste'].unique()), key="frota_guindastes")
+    with col_empresa:
+        empresas = st.multiselect("Filtrar por empresa", sorted(frota['empresa'].unique()), key="frota_empresas")
+
+    filtro = np.ones(len(frota), dtype=bool)
+    if guindastes:
+        filtro &= frota['guindaste'].isin(guindastes).to_numpy()
+    if empresas:
+        filtro &= frota['empresa'].isin(empresas).to_numpy()
+    selecionadas = frota[filtro]
+    if selecionadas.empty:
+        st.info("Nenhuma avaliação corresponde aos filtros selecionados.")
+        return
+    st.plotly_chart(criar_dispersao_frota(selecionadas), use_container_width=True)
+
+def render_exportacao_lote(indice):
+    """Exportação dos relatórios PDF de um período (com filtros por empresa e guindaste) em um único ZIP."""
+    # Importado aqui: o pool de processos só é criado quando alguém exporta
+    from operations.bulk_export import exportar_relatorios_zip, get_export_dir, limpar_exportacoes_antigas
+
+    frota = carregar_dados_frota()
+    if frota.empty:
+        st.info("Nenhuma avaliação disponível para exportação.")
+        return
+
+    hoje = date.today()
+    periodo = st.date_input("Período", value=(hoje.replace(day=1), hoje), format="DD/MM/YYYY", key="exportacao_periodo")
+    col_empresa, col_guindaste = st.columns(2)
+    with col_empresa:
+        empresas = st.multiselect("Empresas", sorted(frota['empresa'].unique()), key="exportacao_empresas")
+    with col_guindaste:
+        guindastes = st.multiselect("Guindastes", sorted(frota['guindaste'].unique()), key="exportacao_guindastes")
+    if not isinstance(periodo, (tuple, list)) or len(periodo) != 2:
+        st.info("Selecione a data inicial e a data final do período.")
+        return
+
+    inicio, fim = pd.Timestamp(periodo[0]), pd.Timestamp(periodo[1]) + pd.Timedelta(days=1)
+    filtro = ((frota['data'] >= inicio) & (frota['data'] < fim)).to_numpy()
+    if empresas:
+        filtro &= frota['empresa'].isin(empresas).to_numpy()
+    if guindastes:
+        filtro &= frota['guindaste'].isin(guindastes).to_numpy()
+    ids = frota.loc[filtro, 'id'].tolist()
+    st.write(f"**{len(ids)}** avaliações selecionadas.")
+
+    if ids and st.button("📦 Gerar ZIP dos Relatórios", key="exportacao_gerar"):
+        diretorio = get_export_dir()
+        os.makedirs(diretorio, exist_ok=True)
+        limpar_exportacoes_antigas(diretorio)
+        nome = f"Relatorios_{periodo[0]:%Y%m%d}_{periodo[1]:%Y%m%d}.zip"
+        progresso = st.progress(0.0, text="Gerando relatórios...")
+        resumo = exportar_relatorios_zip(
+            indice.pares(ids),
+            os.path.join(diretorio, f"{uuid.uuid4().hex[:12]}_{nome}"),
+            ao_progredir=lambda n: progresso.progress(min(n / len(ids), 1.0), text=f"{n} de {len(ids)} relatórios")
+        )
+        progresso.empty()
+        st.session_state.exportacao_zip = {'caminho': resumo['caminho'], 'nome': nome}
+        if resumo['erros']:
+            st.warning(f"{len(resumo['erros'])} relatórios falharam e estão listados em erros.txt no ZIP.")
+        st.success(f"{resumo['relatorios']} relatórios exportados ({resumo['bytes'] / 1024 ** 2:.1f} MB).")
+
+    exportacao = st.session_state.get('exportacao_zip')
+    if exportacao and os.path.exists(exportacao['caminho']):
+        # Leitura adiada: o ZIP só é carregado na memória do servidor quando o botão é
+        # clicado, e não a cada reexecução enquanto a exportação estiver na sessão
+        st.download_button(
+            label="⬇️ Baixar ZIP",
+            data=functools.partial(_ler_arquivo, exportacao['caminho']),
+            file_name=exportacao['nome'],
+            mime="application/zip",
+            key="exportacao_download"
+        )
+
+def _ler_arquivo(caminho):
+    with open(caminho, 'rb') as arquivo:
+        return arquivo.read()
+
 def get_status_from_date(date_str):
     """Calcula o status (Válido/Vencido) a partir de uma string de data."""
     if not date_str or not isinstance(date_str, str): return "Status Indeterminado"
@@ -79,17 +264,145 @@ def render_diagrama(dados_icamento):
             angulo_minimo = 40.0
             st.info("Ângulo mínimo da lança não informado. Adotando 40° como padrão para o diagrama.")
         if all(pd.notna([raio_max, alcance_max, carga_total, capacidade_raio])):
-            fig = criar_diagrama_guindaste(raio_max, alcance_max, carga_total, capacidade_raio, angulo_minimo)
+            fig = criar_diagrama_guindaste_cached(raio_max, alcance_max, carga_total, capacidade_raio, angulo_minimo)
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.warning("Não foi possível gerar o diagrama. Verifique se os campos de Raio, Alcance e Capacidades estão preenchidos no registro.")
     except Exception as e:
         st.error(f"Ocorreu um erro ao renderizar o diagrama: {e}")
 
+# Intervalo de consulta do status de um relatório em geração
+INTERVALO_CONSULTA_RELATORIO_S = 1.0
+
+@st.fragment(run_every=INTERVALO_CONSULTA_RELATORIO_S)
+def _acompanhar_relatorio(chave_sessao):
+    """Consulta o job do relatório; só este trecho da página é reexecutado enquanto ele roda."""
+    from operations.report_jobs import status_relatorio, caminho_resultado_relatorio, CONCLUIDO, ERRO
+
+    id_job = st.session_state.get(chave_sessao)
+    status = status_relatorio(id_job)
+    if status is None:
+        # Expirado: a página volta ao botão de geração
+        st.session_state.pop(chave_sessao, None)
+        st.rerun()
+    elif status['estado'] == CONCLUIDO and caminho_resultado_relatorio(id_job) is not None:
+        # A página inteira é refeita e mostra o download com o PDF do job
+        st.rerun()
+    elif status['estado'] in (CONCLUIDO, ERRO):
+        erro = status['erro'] or "o relatório foi gerado, mas o PDF não está mais no cache em disco."
+        st.error(f"Erro ao gerar o relatório PDF: {erro}")
+        if st.button("Tentar novamente", key=f"{chave_sessao}_repetir"):
+            st.session_state.pop(chave_sessao, None)
+            st.rerun()
+    else:
+        st.info(f"⏳ Gerando relatório PDF... ({status['decorrido_s']:.0f} s)")
+
+def render_botao_relatorio(dados_icamento, dados_guindauto, id_avaliacao):
+    """
+    O PDF só é gerado quando o usuário pede, em um processo do pool de relatórios:
+    a thread desta sessão apenas enfileira o job e acompanha o status. Depois de pronto
+    (ou se outro usuário já o gerou) o arquivo está no cache em disco e só é lido quando o
+    botão de download é clicado, não a cada reexecução da página.
+    O PDF de um job da sessão é buscado pela chave que o job usou, que pode diferir da
+    calculada agora (a data de emissão muda à meia-noite).
+    """
+    from operations.report_generator import caminho_relatorio_em_cache
+
+    chave_sessao = f"job_relatorio_{id_avaliacao}"
+    id_job = st.session_state.get(chave_sessao)
+    caminho_pdf = caminho_relatorio_em_cache(dados_icamento, dados_guindauto)
+    if caminho_pdf is not None:
+        st.session_state.pop(chave_sessao, None)
+    elif id_job is not None:
+        from operations.report_jobs import caminho_resultado_relatorio
+        caminho_pdf = caminho_resultado_relatorio(id_job)
+    if caminho_pdf is None:
+        if id_job is None:
+            from operations.report_jobs import iniciar_pool_relatorios, enviar_relatorio
+            # Os processos do pool são criados em segundo plano enquanto a avaliação é exibida
+            iniciar_pool_relatorios()
+            if not st.button("📄 Gerar Relatório Técnico (PDF)", key=f"gerar_relatorio_{id_avaliacao}", use_container_width=True):
+                return
+            st.session_state[chave_sessao] = enviar_relatorio(dados_icamento, dados_guindauto)
+        _acompanhar_relatorio(chave_sessao)
+        return
+    st.download_button(
+        label="📄 Baixar Relatório Técnico (PDF)",
+        data=functools.partial(_ler_arquivo, caminho_pdf),
+        file_name=f"Relatorio_Tecnico_{id_avaliacao}.pdf",
+        mime="application/pdf",
+        use_container_width=True
+    )
+
+ORDEM_PLANILHA = "Ordem da planilha"
+
+@st.cache_resource(max_entries=16)
+def _ordem_tabela(chave_dados, coluna_filtro, texto_filtro, coluna_ordem, crescente, _df):
+    """Filtro e ordenação da tabela inteira, feitos uma vez por combinação e versão dos dados."""
+    return ordem_linhas(_df, coluna_filtro, texto_filtro, coluna_ordem, crescente)
+
+def render_tabela_paginada(df, chave, column_config=None):
+    """
+    Tabela com paginação, filtro e ordenação no servidor: só as linhas da página atual
+    são serializadas e enviadas ao navegador. Trocar de página apenas fatia a ordem já
+    calculada, então o custo não cresce com o tamanho do histórico.
+    """
+    colunas = list(df.columns)
+    col_filtro, col_texto, col_ordem, col_direcao = st.columns([2, 2, 2, 1])
+    with col_filtro:
+        coluna_filtro = st.selectbox("Filtrar na coluna", colunas, key=f"{chave}_coluna_filtro")
+    with col_texto:
+        texto_filtro = st.text_input("Contém", key=f"{chave}_texto_filtro").strip()
+    with col_ordem:
+        coluna_ordem = st.selectbox("Ordenar por", [ORDEM_PLANILHA] + colunas, key=f"{chave}_coluna_ordem")
+    with col_direcao:
+        direcao = st.selectbox("Direção", ["Crescente", "Decrescente"], key=f"{chave}_direcao")
+
+    posicoes = _ordem_tabela(
+        (chave, _versao_espelho(df), len(df)),
+        coluna_filtro, texto_filtro,
+        None if coluna_ordem == ORDEM_PLANILHA else coluna_ordem,
+        direcao == "Crescente",
+        df
+    )
+    if len(posicoes) == 0:
+        st.info("Nenhuma linha corresponde ao filtro.")
+        return
+
+    chave_pagina, chave_tamanho = f"{chave}_pagina", f"{chave}_tamanho_pagina"
+    tamanho_pagina = st.session_state.get(chave_tamanho, TAMANHO_PAGINA_PADRAO)
+    paginas = numero_paginas(len(posicoes), tamanho_pagina)
+    # Outro filtro ou ordenação volta à primeira página; menos páginas limita a atual
+    assinatura = (coluna_filtro, texto_filtro, coluna_ordem, direcao, tamanho_pagina)
+    if st.session_state.get(f"{chave}_assinatura") != assinatura:
+        st.session_state[f"{chave}_assinatura"] = assinatura
+        st.session_state[chave_pagina] = 1
+    st.session_state[chave_pagina] = min(st.session_state.get(chave_pagina, 1), paginas)
+
+    pagina = st.session_state[chave_pagina]
+    st.dataframe(
+        fatia_pagina(df, posicoes, pagina, tamanho_pagina),
+        use_container_width=True, column_config=column_config, hide_index=True
+    )
+    col_pagina, col_tamanho, col_resumo = st.columns([1, 1, 2])
+    with col_pagina:
+        st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1, key=chave_pagina)
+    with col_tamanho:
+        st.selectbox("Linhas por página", TAMANHOS_PAGINA, index=TAMANHOS_PAGINA.index(TAMANHO_PAGINA_PADRAO), key=chave_tamanho)
+    with col_resumo:
+        inicio = (pagina - 1) * tamanho_pagina
+        st.caption(f"Linhas {inicio + 1}–{min(inicio + tamanho_pagina, len(posicoes))} de {len(posicoes)}"
+                   + (f" (filtradas de {len(df)})" if len(posicoes) != len(df) else ""))
+
 def show_history_page():
     st.title("Histórico de Avaliações")
-    st.info("Os dados são atualizados a cada 10 minutos. Para forçar a atualização, limpe o cache.")
+    st.info("Os dados vêm de uma cópia local das planilhas, que recebe as novas avaliações a cada minuto. Para reler as planilhas inteiras, limpe o cache.")
     if st.button("Limpar Cache e Recarregar Dados"):
+        with st.spinner("Relendo as planilhas..."):
+            try:
+                sincronizar_abas(ABAS_HISTORICO, completa=True)
+            except Exception as e:
+                st.error(f"Erro ao reler as planilhas: {e}")
         st.cache_data.clear()
         st.rerun()
     with st.spinner("Carregando dados das planilhas..."):
@@ -99,30 +412,23 @@ def show_history_page():
         st.warning("Não foi possível carregar os dados do histórico. Verifique se ambas as planilhas estão preenchidas.")
         return
 
+    indice = carregar_indice_avaliacoes(df_lifting, df_crane)
+
     st.subheader("Buscar e Analisar Avaliação por ID")
-    id_column = df_lifting.columns[0]
     search_id = st.text_input("Digite o ID da Avaliação (ex: AV20240101-abcdefgh)", key="search_id_input")
     if search_id and (st.button("Buscar por ID", key="search_button") or 'search_id_input' in st.session_state):
-        result_lifting = df_lifting[df_lifting[id_column] == search_id]
-        result_crane = df_crane[df_crane.iloc[:, 0] == search_id]
-        if not result_lifting.empty and not result_crane.empty:
-            dados_icamento = result_lifting.iloc[0]
-            dados_guindauto = result_crane.iloc[0]
+        # Consulta ao índice por ID: as duas linhas de uma vez, sem varrer as abas
+        avaliacao = indice.par(search_id)
+        if avaliacao is not None:
+            # O nome da série de içamento é o ID impresso no relatório (e não o número da linha)
+            dados_icamento, dados_guindauto = avaliacao
             
             st.markdown("---")
             st.header(f"Análise Detalhada da Avaliação: {search_id}")
 
             col_btn, _ = st.columns([1, 2])
             with col_btn:
-                with st.spinner("Preparando relatório PDF..."):
-                    pdf_report = generate_abnt_report(dados_icamento, dados_guindauto)
-                    st.download_button(
-                        label="📄 Baixar Relatório Técnico (PDF)",
-                        data=pdf_report,
-                        file_name=f"Relatorio_Tecnico_{search_id}.pdf",
-                        mime="application/pdf",
-                        use_container_width=True
-                    )
+                render_botao_relatorio(dados_icamento, dados_guindauto, search_id)
             
             col1, col2 = st.columns([2, 1])
             with col1:
@@ -152,24 +458,32 @@ def show_history_page():
         else:
             st.warning(f"Nenhum registro completo encontrado para o ID: {search_id}.")
 
+    st.markdown("---")
+    render_dispersao_frota()
+
+    with st.expander("📦 Exportação em Lote (PDF)"):
+        render_exportacao_lote(indice)
+
     st.markdown("---")
     st.subheader("Histórico Completo (Visão Geral)")
     
-    tab1, tab2 = st.tabs(["Dados de Içamento", "Informações do Guindauto"])
+    # Seletor no lugar de st.tabs: st.tabs executa e envia o conteúdo das duas abas,
+    # aqui só a tabela escolhida é montada
+    tabela = st.radio("Tabela", ["Dados de Içamento", "Informações do Guindauto"],
+                      horizontal=True, label_visibility="collapsed", key="historico_tabela")
 
-    with tab1:
+    if tabela == "Dados de Içamento":
         if not df_lifting.empty:
-            st.dataframe(df_lifting, use_container_width=True, hide_index=True)
+            render_tabela_paginada(df_lifting, "tabela_icamento")
         else:
             st.info("Nenhum histórico de dados de içamento encontrado.")
-
-    with tab2:
+    else:
         if not df_crane.empty:
             column_config = {
                 col_name: st.column_config.LinkColumn("Link", display_text="Abrir ↗")
                 for col_name in df_crane.columns if "URL" in col_name.upper()
             }
-            st.dataframe(df_crane, use_container_width=True, column_config=column_config, hide_index=True)
+            render_tabela_paginada(df_crane, "tabela_guindauto", column_config)
         else:
             st.info("Nenhum histórico de informações de guindauto encontrado.")
 
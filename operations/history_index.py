@@ -0,0 +1,63 @@
+import pandas as pd
+
+
+class IndiceAvaliacoes:
+    """
+    Visão pré-unida das abas de içamento e de guindauto, indexada pelo ID da avaliação.
+
+    Montada uma vez por carga dos dados: `icamento` e `guindauto` têm uma linha por
+    avaliação presente nas duas abas, alinhadas pela posição, e um dicionário (índice
+    de hash) leva cada ID à sua posição. Buscar uma avaliação é uma consulta ao hash
+    mais um acesso por posição, em vez de comparar a coluna de ID das duas abas inteiras. Com IDs
+    repetidos vale a primeira linha de cada aba, como na busca por ID da página.
+
+    Os DataFrames são compartilhados e não devem ser alterados.
+    """
+
+    def __init__(self, df_lifting, df_crane):
+        ids_lifting = df_lifting.iloc[:, 0]
+        ids_crane = df_crane.iloc[:, 0]
+        lifting = df_lifting[~ids_lifting.duplicated(keep='first').to_numpy()]
+        crane = df_crane[~ids_crane.duplicated(keep='first').to_numpy()]
+
+        posicoes_crane = pd.Index(crane.iloc[:, 0]).get_indexer(lifting.iloc[:, 0])
+        completas = posicoes_crane >= 0
+        self.icamento = lifting[completas]
+        self.guindauto = crane.iloc[posicoes_crane[completas]]
+        self.ids = self.icamento.iloc[:, 0]
+        # Dicionário ID -> posição: consulta O(1) sem custo por chamada do pandas
+        self._posicao = dict(zip(self.ids.tolist(), range(len(self.ids))))
+
+    def __len__(self):
+        return len(self._posicao)
+
+    def __contains__(self, id_avaliacao):
+        return id_avaliacao in self._posicao
+
+    def posicoes(self, ids):
+        """Posições dos IDs na visão (-1 para os ausentes)."""
+        posicao = self._posicao
+        return [posicao.get(id_avaliacao, -1) for id_avaliacao in ids]
+
+    def par(self, id_avaliacao):
+        """
+        Linhas de içamento e de guindauto de uma avaliação.
+
+        Returns:
+            tuple: (dados_icamento, dados_guindauto) como pd.Series, com o ID como nome da
+                   série de içamento; None se o ID não estiver nas duas abas
+        """
+        try:
+            posicao = self._posicao.get(id_avaliacao, -1)
+        except TypeError:  # ID não hasheável
+            return None
+        if posicao < 0:
+            return None
+        return self.icamento.iloc[posicao].rename(id_avaliacao), self.guindauto.iloc[posicao]
+
+    def pares(self, ids):
+        """Gera (dados_icamento, dados_guindauto) de cada ID presente nas duas abas, na ordem pedida."""
+        for id_avaliacao in ids:
+            par = self.par(id_avaliacao)
+            if par is not None:
+                yield par
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+TAMANHOS_PAGINA = [25, 50, 100, 250]
+TAMANHO_PAGINA_PADRAO = 50
+
+# Fração mínima de células preenchidas que precisam ser números para a coluna ser
+# ordenada numericamente (os valores da planilha chegam como texto: '12,5', '80%')
+FRACAO_NUMERICA_MINIMA = 0.9
+
+
+def chave_ordenacao(valores):
+    """
+    Chave de ordenação de uma coluna da planilha: numérica quando quase todas as
+    células preenchidas são números (aceita vírgula decimal e '%'), texto caso contrário.
+
+    Returns:
+        tuple: (chave como np.ndarray, vazias como máscara booleana)
+    """
+    texto = valores.fillna('').astype(str).str.strip()
+    vazias = (texto == '').to_numpy()
+    numeros = pd.to_numeric(texto.str.replace(',', '.', regex=False).str.rstrip('%'), errors='coerce').to_numpy()
+    preenchidas = (~vazias).sum()
+    if preenchidas and np.isfinite(numeros[~vazias]).sum() >= FRACAO_NUMERICA_MINIMA * preenchidas:
+        return numeros, vazias | ~np.isfinite(numeros)
+    return texto.str.lower().to_numpy(dtype=object), vazias
+
+
+def ordem_linhas(df, coluna_filtro=None, texto_filtro='', coluna_ordem=None, crescente=True):
+    """
+    Posições das linhas que passam pelo filtro, na ordem pedida. É a única etapa que
+    percorre a tabela inteira; o resultado é guardado em cache e cada página é só uma
+    fatia dele.
+
+    Args:
+        df (pd.DataFrame): Tabela completa
+        coluna_filtro (str): Coluna em que o texto é procurado
+        texto_filtro (str): Trecho procurado (sem diferenciar maiúsculas), vazio para todas as linhas
+        coluna_ordem (str): Coluna de ordenação, ou None para a ordem da planilha
+        crescente (bool): Direção da ordenação; células vazias ficam sempre no fim
+
+    Returns:
+        np.ndarray: Posições (iloc) das linhas
+    """
+    posicoes = np.arange(len(df))
+    if texto_filtro and coluna_filtro in df.columns:
+        valores = df[coluna_filtro].fillna('').astype(str)
+        posicoes = posicoes[valores.str.contains(texto_filtro, case=False, regex=False).to_numpy()]
+    if coluna_ordem in df.columns and len(posicoes):
+        chave, vazias = chave_ordenacao(df[coluna_ordem].iloc[posicoes])
+        ordem = np.argsort(chave, kind='stable')
+        if not crescente:
+            ordem = ordem[::-1]
+        # Vazias no fim nas duas direções, preservando a ordem entre as preenchidas
+        ordem = np.concatenate([ordem[~vazias[ordem]], ordem[vazias[ordem]]])
+        posicoes = posicoes[ordem]
+    return posicoes
+
+
+def numero_paginas(total, tamanho_pagina):
+    return max(1, -(-total // tamanho_pagina))
+
+
+def fatia_pagina(df, posicoes, pagina, tamanho_pagina):
+    """Linhas da página (começando em 1): custo proporcional ao tamanho da página, não ao da tabela."""
+    inicio = (pagina - 1) * tamanho_pagina
+    return df.iloc[posicoes[inicio:inicio + tamanho_pagina]]
@@ -0,0 +1,198 @@
+import numpy as np
+import logging
+
+from operations.calc import validar_guindaste
+
+logger = logging.getLogger(__name__)
+
+
+class LoadChart:
+    """
+    Gráfico de carga do guindaste: grade extensão da lança × raio → capacidade nominal.
+
+    Os eixos são guardados em float64 (poucos valores) e a grade de capacidades em
+    float32, com NaN nas combinações que o fabricante não homologa. Todas as consultas
+    são vetorizadas e aceitam escalares ou arrays.
+    """
+
+    def __init__(self, comprimentos_lanca, raios, capacidades, fabricante="", modelo=""):
+        """
+        Args:
+            comprimentos_lanca (array-like): Extensões da lança tabeladas em metros (linhas)
+            raios (array-like): Raios tabelados em metros (colunas)
+            capacidades (array-like): Matriz [lança × raio] de capacidades em kg (NaN = não homologado)
+            fabricante (str): Fabricante do guindaste
+            modelo (str): Modelo do guindaste
+
+        Raises:
+            ValueError: Se a grade for inconsistente
+        """
+        lancas = np.asarray(comprimentos_lanca, dtype=np.float64)
+        raios = np.asarray(raios, dtype=np.float64)
+        grade = np.asarray(capacidades, dtype=np.float32)
+
+        if lancas.ndim != 1 or raios.ndim != 1 or lancas.size == 0 or raios.size == 0:
+            raise ValueError("Os eixos do gráfico de carga devem ser listas não vazias.")
+        if grade.shape != (lancas.size, raios.size):
+            raise ValueError(
+                f"A grade de capacidades deve ter formato {(lancas.size, raios.size)}. "
+                f"Recebido: {grade.shape}"
+            )
+        if np.any(np.diff(lancas) <= 0) or np.any(np.diff(raios) <= 0):
+            raise ValueError("Os eixos do gráfico de carga devem ser estritamente crescentes.")
+        if np.any(lancas <= 0) or np.any(raios <= 0):
+            raise ValueError("Extensões da lança e raios devem ser valores positivos.")
+        if np.any(grade[~np.isnan(grade)] < 0):
+            raise ValueError("As capacidades do gráfico de carga não podem ser negativas.")
+
+        self.comprimentos_lanca = lancas
+        self.raios = raios
+        self.capacidades = grade
+        self.fabricante = fabricante
+        self.modelo = modelo
+
+    # ==================== CONSTRUTORES ====================
+
+    @classmethod
+    def from_pontos(cls, pontos, fabricante="", modelo=""):
+        """
+        Monta o gráfico a partir de pontos (extensão_lanca, raio, capacidade).
+        Combinações ausentes ficam como não homologadas.
+        """
+        pontos = np.asarray(pontos, dtype=np.float64)
+        if pontos.ndim != 2 or pontos.shape[1] != 3:
+            raise ValueError("Os pontos devem ser triplas (extensão da lança, raio, capacidade).")
+        lancas, idx_lanca = np.unique(pontos[:, 0], return_inverse=True)
+        raios, idx_raio = np.unique(pontos[:, 1], return_inverse=True)
+        grade = np.full((lancas.size, raios.size), np.nan, dtype=np.float32)
+        grade[idx_lanca, idx_raio] = pontos[:, 2]
+        return cls(lancas, raios, grade, fabricante, modelo)
+
+    @classmethod
+    def from_dataframe(cls, df, coluna_lanca, coluna_raio, coluna_capacidade, fabricante="", modelo=""):
+        """Monta o gráfico a partir de um DataFrame no formato longo (uma linha por ponto)."""
+        return cls.from_pontos(
+            df[[coluna_lanca, coluna_raio, coluna_capacidade]].to_numpy(dtype=np.float64),
+            fabricante, modelo
+        )
+
+    @classmethod
+    def from_dict(cls, dados):
+        """Reconstrói o gráfico a partir do dicionário gerado por to_dict (ex.: JSON)."""
+        capacidades = [[np.nan if c is None else c for c in linha] for linha in dados['capacidades']]
+        return cls(
+            dados['comprimentos_lanca'], dados['raios'], capacidades,
+            dados.get('fabricante', ""), dados.get('modelo', "")
+        )
+
+    def to_dict(self):
+        """Retorna um dicionário serializável em JSON (NaN vira None)."""
+        return {
+            'fabricante': self.fabricante,
+            'modelo': self.modelo,
+            'comprimentos_lanca': self.comprimentos_lanca.tolist(),
+            'raios': self.raios.tolist(),
+            'capacidades': [
+                [None if np.isnan(c) else float(c) for c in linha] for linha in self.capacidades
+            ]
+        }
+
+    # ==================== CONSULTAS ====================
+
+    @staticmethod
+    def _localizar(eixo, valores):
+        """
+        Retorna os índices vizinhos (i0, i1), o peso de interpolação e a máscara
+        de pontos dentro do eixo. Valores exatamente sobre a grade têm i0 == i1.
+        """
+        dentro = (valores >= eixo[0]) & (valores <= eixo[-1])
+        i0 = np.clip(np.searchsorted(eixo, valores, side='right') - 1, 0, eixo.size - 1)
+        i1 = np.minimum(i0 + 1, eixo.size - 1)
+        sobre_grade = valores == eixo[i0]
+        i1 = np.where(sobre_grade, i0, i1)
+        intervalo = eixo[i1] - eixo[i0]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            peso = np.where(intervalo > 0, (valores - eixo[i0]) / intervalo, 0.0)
+        return i0, i1, peso, dentro
+
+    def _cantos(self, raio, extensao_lanca):
+        raio = np.asarray(raio, dtype=np.float64)
+        extensao_lanca = np.asarray(extensao_lanca, dtype=np.float64)
+        raio, extensao_lanca = np.broadcast_arrays(raio, extensao_lanca)
+        l0, l1, tl, dentro_l = self._localizar(self.comprimentos_lanca, extensao_lanca)
+        r0, r1, tr, dentro_r = self._localizar(self.raios, raio)
+        g = self.capacidades
+        cantos = (g[l0, r0], g[l0, r1], g[l1, r0], g[l1, r1])
+        return cantos, tl, tr, dentro_l & dentro_r
+
+    @staticmethod
+    def _saida(valores):
+        return float(valores) if valores.ndim == 0 else valores
+
+    def capacidade(self, raio, extensao_lanca):
+        """
+        Capacidade nominal por interpolação bilinear da grade.
+
+        Fora da grade ou em região não homologada retorna 0.0 (operação não permitida).
+        """
+        (c00, c01, c10, c11), tl, tr, dentro = self._cantos(raio, extensao_lanca)
+        interpolada = (
+            (1 - tl) * ((1 - tr) * c00 + tr * c01) +
+            tl * ((1 - tr) * c10 + tr * c11)
+        )
+        valida = dentro & ~np.isnan(interpolada)
+        return self._saida(np.where(valida, interpolada, 0.0))
+
+    def capacidade_conservadora(self, raio, extensao_lanca):
+        """
+        Capacidade pelo critério conservador: entre pontos da grade, adota sempre a menor
+        capacidade dos pontos tabelados vizinhos (nunca interpola para cima).
+
+        Fora da grade ou em região não homologada retorna 0.0 (operação não permitida).
+        """
+        cantos, _, _, dentro = self._cantos(raio, extensao_lanca)
+        menor = np.minimum(np.minimum(cantos[0], cantos[1]), np.minimum(cantos[2], cantos[3]))
+        valida = dentro & ~np.isnan(menor)
+        return self._saida(np.where(valida, menor.astype(np.float64), 0.0))
+
+    def __repr__(self):
+        nome = f"{self.fabricante} {self.modelo}".strip() or "sem identificação"
+        return (
+            f"LoadChart({nome}, "
+            f"lança {self.comprimentos_lanca[0]:g}-{self.comprimentos_lanca[-1]:g} m, "
+            f"raio {self.raios[0]:g}-{self.raios[-1]:g} m)"
+        )
+
+
+def validar_guindaste_por_grafico(carga_total, grafico, raio_max, extensao_lanca,
+                                  angulo_minimo_fabricante, conservador=True):
+    """
+    Valida o guindaste consultando a capacidade nominal no raio e na extensão
+    exatos da operação, em vez das duas capacidades digitadas manualmente.
+
+    Args:
+        carga_total (float): Carga total calculada em kg
+        grafico (LoadChart): Gráfico de carga do guindaste
+        raio_max (float): Raio de operação em metros
+        extensao_lanca (float): Extensão da lança em metros
+        angulo_minimo_fabricante (float): Ângulo mínimo em graus
+        conservador (bool): True para arredondar sempre para a menor capacidade
+
+    Returns:
+        CraneValidation: Mesmo resultado de validar_guindaste
+
+    Raises:
+        ValueError: Se a configuração estiver fora do gráfico de carga
+    """
+    consulta = grafico.capacidade_conservadora if conservador else grafico.capacidade
+    capacidade = consulta(raio_max, extensao_lanca)
+    if capacidade <= 0:
+        raise ValueError(
+            f"Configuração fora do gráfico de carga: raio {raio_max}m com lança de "
+            f"{extensao_lanca}m não possui capacidade homologada."
+        )
+    # A capacidade tabelada no ponto exato já é a referência para raio e alcance
+    return validar_guindaste(
+        carga_total, capacidade, capacidade, raio_max, extensao_lanca, angulo_minimo_fabricante
+    )
+
@@ -0,0 +1,118 @@
+import numpy as np
+import logging
+
+from operations.calc import LIMITE_SEGURANCA, _carga_total_vetorizada, _validacao_vetorizada
+
+logger = logging.getLogger(__name__)
+
+DISTRIBUICOES = ('normal', 'triangular', 'uniforme')
+PERCENTIS = (5, 50, 95, 99)
+
+
+def _amostrar(rng, valor, incerteza, distribuicao, n):
+    """
+    Sorteia n amostras em torno do valor nominal.
+
+    Para 'normal', incerteza é o desvio padrão; para 'triangular' e 'uniforme',
+    é a semiamplitude do intervalo [valor - incerteza, valor + incerteza].
+    """
+    if incerteza <= 0:
+        return np.full(n, float(valor))
+    if distribuicao == 'normal':
+        return rng.normal(valor, incerteza, n)
+    if distribuicao == 'triangular':
+        return rng.triangular(valor - incerteza, valor, valor + incerteza, n)
+    if distribuicao == 'uniforme':
+        return rng.uniform(valor - incerteza, valor + incerteza, n)
+    raise ValueError(f"Distribuição inválida: {distribuicao}. Use uma de {', '.join(DISTRIBUICOES)}.")
+
+
+def simular_incerteza(peso_carga, equipamento_novo, peso_acessorios, raio_max, extensao_lanca,
+                      capacidade_raio, capacidade_alcance_max, angulo_minimo_fabricante,
+                      incerteza_peso=0.10, incerteza_acessorios=0.10, incerteza_raio=0.0,
+                      distribuicao='normal', n_amostras=200_000, semente=None, grafico=None):
+    """
+    Análise de Monte Carlo da incerteza de peso, acessórios e raio.
+
+    Cada amostra passa pelas mesmas regras de margem, cabos, ângulo e capacidade de
+    calcular_carga_total e validar_guindaste (núcleos vetorizados do módulo calc).
+    Amostras com raio acima da lança contam como inadequadas; pesos sorteados
+    negativos são truncados em zero.
+
+    Args:
+        peso_carga (float): Peso nominal da carga em kg
+        equipamento_novo (bool): True para margem de 10%, False para 25%
+        peso_acessorios (float): Peso nominal dos acessórios em kg
+        raio_max (float): Raio nominal de operação em metros
+        extensao_lanca (float): Extensão da lança em metros
+        capacidade_raio (float): Capacidade no raio em kg (ignorada com gráfico)
+        capacidade_alcance_max (float): Capacidade no alcance máximo em kg (ignorada com gráfico)
+        angulo_minimo_fabricante (float): Ângulo mínimo em graus
+        incerteza_peso (float): Incerteza relativa do peso da carga (0.10 = 10%)
+        incerteza_acessorios (float): Incerteza relativa do peso dos acessórios
+        incerteza_raio (float): Incerteza absoluta do raio em metros
+        distribuicao (str): 'normal', 'triangular' ou 'uniforme'
+        n_amostras (int): Número de amostras
+        semente (int): Semente do gerador, para resultados reprodutíveis
+        grafico (LoadChart): Gráfico de carga; quando informado, a capacidade é
+            consultada no raio sorteado (critério conservador)
+
+    Returns:
+        dict: 'n_amostras', 'prob_excedencia' (utilização acima de 80%),
+              'prob_angulo_inseguro', 'prob_inadequado', 'percentis' (por grandeza)
+              e 'histograma_utilizacao' (contagens e bordas)
+
+    Raises:
+        ValueError: Se os parâmetros forem inválidos
+    """
+    if peso_carga <= 0 or raio_max <= 0 or extensao_lanca <= 0:
+        raise ValueError("Peso da carga, raio e extensão da lança devem ser valores positivos.")
+    if min(incerteza_peso, incerteza_acessorios, incerteza_raio) < 0:
+        raise ValueError("As incertezas não podem ser negativas.")
+    if n_amostras <= 0:
+        raise ValueError("O número de amostras deve ser positivo.")
+
+    rng = np.random.default_rng(semente)
+    n = int(n_amostras)
+
+    peso = _amostrar(rng, peso_carga, peso_carga * incerteza_peso, distribuicao, n)
+    acessorios = _amostrar(rng, peso_acessorios, peso_acessorios * incerteza_acessorios, distribuicao, n)
+    raio = _amostrar(rng, raio_max, incerteza_raio, distribuicao, n)
+    np.maximum(peso, 0.0, out=peso)
+    np.maximum(acessorios, 0.0, out=acessorios)
+    np.maximum(raio, 0.0, out=raio)
+
+    carga_total = _carga_total_vetorizada(peso, equipamento_novo, acessorios)['carga_total']
+
+    if grafico is not None:
+        capacidade = grafico.capacidade_conservadora(raio, extensao_lanca)
+        capacidade_raio = capacidade_alcance_max = capacidade
+
+    validacao = _validacao_vetorizada(
+        carga_total, capacidade_raio, capacidade_alcance_max, raio, extensao_lanca, angulo_minimo_fabricante
+    )
+    utilizacao = validacao['porcentagem_segura']
+    angulo = validacao['angulo_lanca']
+
+    valores_percentis = np.percentile(np.vstack([carga_total, utilizacao, angulo]), PERCENTIS, axis=1)
+    percentis = {
+        nome: dict(zip(PERCENTIS, valores_percentis[:, i].tolist()))
+        for i, nome in enumerate(('carga_total', 'porcentagem_segura', 'angulo_lanca'))
+    }
+
+    utilizacao_finita = utilizacao[np.isfinite(utilizacao)]
+    contagens, bordas = np.histogram(utilizacao_finita, bins=60)
+
+    resultado = {
+        'n_amostras': n,
+        'prob_excedencia': np.count_nonzero(utilizacao > LIMITE_SEGURANCA) / n,
+        'prob_angulo_inseguro': np.count_nonzero(angulo < angulo_minimo_fabricante) / n,
+        'prob_inadequado': np.count_nonzero(~validacao['adequado']) / n,
+        'percentis': percentis,
+        'histograma_utilizacao': {'contagens': contagens, 'bordas': bordas}
+    }
+    logger.info(
+        "Monte Carlo: %d amostras, P(utilização > %.0f%%) = %.4f",
+        n, LIMITE_SEGURANCA, resultado['prob_excedencia']
+    )
+    return resultado
@@ -1,23 +1,168 @@
 import plotly.graph_objects as go
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Arc
 import io
+import os
 import base64
+import tempfile
+import functools
 import streamlit as st
 
-def criar_diagrama_guindaste(raio_max, extensao_lanca, carga_total, capacidade_raio, angulo_minimo_fabricante):
+from operations.calc import LIMITE_SEGURANCA
+from operations.solver import mapa_raio_carga, carga_total_maxima, raio_maximo
+from utils.lru_cache import LRUCache, memoizar, normalizar_valor
+from utils.disk_cache import DiskCache
+
+class FiguraCongelada(go.Figure):
     """
-    Cria um diagrama técnico do guindaste com Plotly, com cálculos trigonométricos corretos.
+    Figura compartilhada pelo cache de diagramas. Como não é modificada depois de
+    criada, o dicionário da figura é calculado uma única vez e reaproveitado pelo
+    st.plotly_chart, que serializa a figura a cada execução.
+
+    Cada chamada de to_dict devolve uma cópia rasa: quem trocar uma chave do nível
+    superior ('data', 'layout') não altera as outras sessões. O conteúdo de 'data' e
+    'layout' continua compartilhado; o st.plotly_chart só o lê para gerar o JSON
+    (plotly.io.to_json apenas remove o 'uid' dos traços, que este dicionário não tem).
+
+    O JSON em si não é memoizado: o st.plotly_chart sempre codifica o dicionário com
+    plotly.io.to_json e envia o resultado ao navegador, sem aceitar um JSON pronto.
+    Cada reexecução ainda custa essa codificação (~0,1 ms por diagrama) e o envio.
+    """
+
+    def to_dict(self):
+        dados = self.__dict__.get('_dict_memo')
+        if dados is None:
+            dados = self._dict_memo = super().to_dict()
+        return dict(dados)
+
+
+@functools.lru_cache(maxsize=1)
+def _modelo_diagrama():
+    """
+    Partes estáticas do diagrama técnico (estilos dos traços, formas, anotações e
+    layout), validadas pelo Plotly uma única vez por processo. Cada diagrama copia
+    este modelo e preenche apenas as coordenadas e textos que dependem dos dados.
     """
     fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        mode='lines', name='Base', line=dict(color='darkgray', width=4),
+        fill='toself', fillcolor='lightgray', hoverinfo='none'
+    ))
+    fig.add_trace(go.Scatter(mode='lines', name='Torre', line=dict(color='dimgray', width=8), hoverinfo='none'))
+    fig.add_trace(go.Scatter(
+        mode='lines+markers', name='Lança de Operação', line=dict(width=10), marker=dict(symbol='circle', size=8)
+    ))
+    fig.add_trace(go.Scatter(
+        mode='lines', fill='toself', fillcolor='rgba(220, 20, 60, 0.15)',
+        line=dict(color='rgba(220, 20, 60, 0.3)'), hoverinfo='none'
+    ))
+    fig.add_trace(go.Scatter(mode='lines', line=dict(color='darkgreen', width=2), hoverinfo='none', showlegend=False))
+    fig.add_trace(go.Scatter(
+        mode='markers', name='Ponto de Içamento',
+        marker=dict(symbol='circle-open', size=15, color='darkorange', line=dict(width=3))
+    ))
+    fig.add_shape(type="line", x0=0, y0=0, y1=0, line=dict(color="black", width=1, dash="dash"))
+    fig.add_annotation(y=0, showarrow=False, yshift=-20)
+    fig.add_annotation(showarrow=False, font=dict(color='darkgreen', size=14))
+    fig.update_layout(
+        title=dict(
+            text="<b>Diagrama Técnico da Operação de Içamento</b>", 
+            font=dict(size=20), 
+            x=0.5
+        ),
+        xaxis_title="Distância Horizontal (Raio) [m]", 
+        yaxis_title="Altura Vertical [m]",
+        showlegend=True, 
+        legend=dict(
+            orientation="h", 
+            yanchor="bottom", 
+            y=1.02, 
+            xanchor="right", 
+            x=1
+        ),
+        xaxis=dict(gridcolor='lightgrey'),
+        yaxis=dict(scaleanchor="x", scaleratio=1, gridcolor='lightgrey'),
+        margin=dict(l=80, r=40, t=80, b=80), 
+        hovermode='closest', 
+        plot_bgcolor='white'
+    )
+    return fig.to_dict()
+
 
+def _dados_diagrama(raio_max, extensao_lanca, carga_total, capacidade_raio, angulo_minimo_fabricante,
+                    altura_vertical, angulo_operacao_rad, angulo_operacao_graus, angulo_min_rad):
+    """Copia o modelo do diagrama e preenche as partes que dependem da operação."""
+    modelo = _modelo_diagrama()
+    base, torre, lanca, risco, arco, ponto = (dict(trace) for trace in modelo['data'])
+    layout = dict(modelo['layout'])
+
+    # Proporções da base e torre
+    base_width = max(4, raio_max * 0.1)
+    torre_height = max(2, altura_vertical * 0.1)
+
+    base['x'] = [-base_width/2, base_width/2, base_width/2, -base_width/2, -base_width/2]
+    base['y'] = [-torre_height/2, -torre_height/2, 0, 0, -torre_height/2]
+    torre['x'] = [0, 0]
+    torre['y'] = [0, torre_height]
+
+    # Lança de Operação
+    y_lan_end = torre_height + altura_vertical
+    cor_lanca = 'royalblue' if angulo_operacao_graus >= angulo_minimo_fabricante else 'crimson'
+    lanca['x'] = [0, raio_max]
+    lanca['y'] = [torre_height, y_lan_end]
+    lanca['line'] = dict(lanca['line'], color=cor_lanca)
+    lanca['marker'] = dict(lanca['marker'], color=cor_lanca)
+    lanca['hovertemplate'] = (
+        f"<b>Lança de Operação</b><br>Comprimento: {extensao_lanca:.2f} m<br>"
+        f"Ângulo: {angulo_operacao_graus:.2f}°<extra></extra>"
+    )
+
+    # Zona de Risco: arco de 100 pontos entre a horizontal e o ângulo mínimo, fechado na torre
+    theta_risco = np.linspace(0, angulo_min_rad, 100)
+    risco['x'] = np.concatenate([[0], extensao_lanca * np.cos(theta_risco), [0]])
+    risco['y'] = np.concatenate([[torre_height], torre_height + extensao_lanca * np.sin(theta_risco), [torre_height]])
+    risco['name'] = f'Zona de Risco (< {angulo_minimo_fabricante}°)'
+
+    # Arco do Ângulo da Operação
+    arc_radius_op = extensao_lanca * 0.25
+    theta_arco_op = np.linspace(0, angulo_operacao_rad, 50)
+    arco['x'] = arc_radius_op * np.cos(theta_arco_op)
+    arco['y'] = torre_height + arc_radius_op * np.sin(theta_arco_op)
+
+    # Ponto de Içamento (Carga)
+    ponto['x'] = [raio_max]
+    ponto['y'] = [y_lan_end]
+    ponto['hovertemplate'] = (
+        f"<b>Carga Total: {carga_total:,.2f} kg</b><br>Capacidade no Raio: {capacidade_raio:,.2f} kg<extra></extra>"
+    )
+
+    # Linha e texto do raio; texto do ângulo da operação
+    layout['shapes'] = [dict(layout['shapes'][0], x1=raio_max)]
+    text_angle_rad_op = angulo_operacao_rad / 2
+    anotacao_raio, anotacao_angulo = layout['annotations']
+    layout['annotations'] = [
+        dict(anotacao_raio, x=raio_max/2, text=f"<b>Raio: {raio_max:.2f} m</b>"),
+        dict(
+            anotacao_angulo,
+            x=float(arc_radius_op * 1.2 * np.cos(text_angle_rad_op)),
+            y=float(torre_height + arc_radius_op * 1.2 * np.sin(text_angle_rad_op)),
+            text=f"<b>{angulo_operacao_graus:.1f}°</b>"
+        )
+    ]
+    layout['xaxis'] = dict(layout['xaxis'], range=[-base_width, raio_max * 1.15])
+    layout['yaxis'] = dict(layout['yaxis'], range=[-torre_height, y_lan_end * 1.15])
+
+    return {'data': [base, torre, lanca, risco, arco, ponto], 'layout': layout}
+
+
+def _criar_diagrama(classe_figura, raio_max, extensao_lanca, carga_total, capacidade_raio, angulo_minimo_fabricante):
     # --- 1. Validação de Dados ---
     if not all([raio_max > 0, extensao_lanca > 0]):
+        fig = classe_figura()
         fig.update_layout(title="Dados insuficientes para gerar o diagrama")
         return fig
         
     if extensao_lanca <= raio_max:
+        fig = classe_figura()
         fig.update_layout(
             title_text=f"<b>Erro: Extensão da lança ({extensao_lanca}m) deve ser maior que o raio ({raio_max}m)</b>", 
             title_x=0.5
@@ -31,6 +176,7 @@ def criar_diagrama_guindaste(raio_max, extensao_lanca, carga_total, capacidade_r
         
         if diferenca_quadrados < 0:
             st.error("Erro: Configuração geometricamente impossível")
+            fig = classe_figura()
             fig.update_layout(title="Erro: Configuração inválida")
             return fig
             
@@ -45,320 +191,557 @@ def criar_diagrama_guindaste(raio_max, extensao_lanca, carga_total, capacidade_r
         
     except Exception as e:
         st.error(f"Erro nos cálculos trigonométricos: {e}")
+        fig = classe_figura()
         fig.update_layout(title="Erro ao calcular parâmetros do diagrama")
         return fig
 
-    # --- 3. Desenho dos Componentes ---
-    # Definição de proporções para a base e torre
-    base_width = max(4, raio_max * 0.1)
-    torre_height = max(2, altura_vertical * 0.1)
-    
-    # Base e Torre do Guindaste
-    fig.add_trace(go.Scatter(
-        x=[-base_width/2, base_width/2, base_width/2, -base_width/2, -base_width/2], 
-        y=[-torre_height/2, -torre_height/2, 0, 0, -torre_height/2], 
-        mode='lines', 
-        name='Base', 
-        line=dict(color='darkgray', width=4), 
-        fill='toself', 
-        fillcolor='lightgray', 
-        hoverinfo='none'
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=[0, 0], 
-        y=[0, torre_height], 
-        mode='lines', 
-        name='Torre', 
-        line=dict(color='dimgray', width=8), 
-        hoverinfo='none'
-    ))
+    # --- 3. Componentes, anotações e layout a partir do modelo em cache ---
+    dados = _dados_diagrama(
+        raio_max, extensao_lanca, carga_total, capacidade_raio, angulo_minimo_fabricante,
+        float(altura_vertical), float(angulo_operacao_rad), float(angulo_operacao_graus), float(angulo_min_rad)
+    )
+    # O modelo já foi validado e os valores preenchidos são números e textos calculados aqui
+    return classe_figura(dados, _validate=False)
 
-    # Lança de Operação
-    y_lan_end = torre_height + altura_vertical
-    cor_lanca = 'royalblue' if angulo_operacao_graus >= angulo_minimo_fabricante else 'crimson'
-    
-    fig.add_trace(go.Scatter(
-        x=[0, raio_max], 
-        y=[torre_height, y_lan_end],
-        mode='lines+markers', 
-        name='Lança de Operação',
-        line=dict(color=cor_lanca, width=10),
-        marker=dict(symbol='circle', size=8, color=cor_lanca),
-        hovertemplate=f"<b>Lança de Operação</b><br>Comprimento: {extensao_lanca:.2f} m<br>Ângulo: {angulo_operacao_graus:.2f}°<extra></extra>"
-    ))
 
-    # Zona de Risco (Área abaixo do ângulo mínimo)
-    try:
-        # Gera 100 pontos entre a horizontal (0 rad) e o ângulo mínimo
-        theta_risco = np.linspace(0, angulo_min_rad, 100)
-        # Calcula as coordenadas x e y para formar um arco com o comprimento da lança
-        x_risco_arc = extensao_lanca * np.cos(theta_risco)
-        y_risco_arc = torre_height + extensao_lanca * np.sin(theta_risco)
-        
-        # Concatena o ponto inicial (0, torre_height) e final (0, torre_height) para fechar o polígono
-        fig.add_trace(go.Scatter(
-            x=np.concatenate([[0], x_risco_arc, [0]]),
-            y=np.concatenate([[torre_height], y_risco_arc, [torre_height]]),
-            mode='lines', 
-            fill='toself', 
-            fillcolor='rgba(220, 20, 60, 0.15)',
-            line=dict(color='rgba(220, 20, 60, 0.3)'),
-            name=f'Zona de Risco (< {angulo_minimo_fabricante}°)',
-            hoverinfo='none'
-        ))
-    except Exception as e:
-        st.warning(f"Não foi possível desenhar a zona de risco: {e}")
-
-    # --- 4. Anotações e Detalhes ---
-    # Linha e texto para o Raio
-    fig.add_shape(
-        type="line", 
-        x0=0, y0=0, 
-        x1=raio_max, y1=0, 
-        line=dict(color="black", width=1, dash="dash")
+def criar_diagrama_guindaste(raio_max, extensao_lanca, carga_total, capacidade_raio, angulo_minimo_fabricante):
+    """
+    Cria um diagrama técnico do guindaste com Plotly, com cálculos trigonométricos corretos.
+    """
+    return _criar_diagrama(go.Figure, raio_max, extensao_lanca, carga_total, capacidade_raio, angulo_minimo_fabricante)
+
+
+# Cache do processo para os diagramas interativos (entradas normalizadas)
+cache_diagramas = LRUCache(tamanho_maximo=128)
+
+
+@memoizar(cache_diagramas)
+def criar_diagrama_guindaste_cached(raio_max, extensao_lanca, carga_total, capacidade_raio, angulo_minimo_fabricante):
+    """
+    Versão memoizada de criar_diagrama_guindaste. Retorna uma FiguraCongelada
+    compartilhada entre execuções, com o dicionário memoizado; não a modifique.
+    """
+    return _criar_diagrama(
+        FiguraCongelada, raio_max, extensao_lanca, carga_total, capacidade_raio, angulo_minimo_fabricante
     )
-    
-    fig.add_annotation(
-        x=raio_max/2, 
-        y=0, 
-        text=f"<b>Raio: {raio_max:.2f} m</b>", 
-        showarrow=False, 
-        yshift=-20
+
+
+# Resolução (pontos por eixo) do mapa what-if
+RESOLUCAO_MAPA = 120
+
+# Cache do processo para as superfícies what-if (independentes do ponto de operação)
+cache_mapas = LRUCache(tamanho_maximo=32)
+
+
+def _topo_eixo_carga(capacidade_referencia, carga_total):
+    """
+    Maior carga do eixo vertical: 1,25 × a capacidade de referência, dobrada quantas
+    vezes forem necessárias para o ponto atual caber no mapa. Poucos valores possíveis,
+    então o mapa base continua sendo reaproveitado enquanto a carga varia.
+    """
+    topo = capacidade_referencia * 1.25
+    if topo <= 0:
+        topo = max(carga_total, 1.0) * 1.25
+    while carga_total > topo / 1.1:
+        topo *= 2
+    return topo
+
+
+@memoizar(cache_mapas)
+def criar_mapa_what_if_base(extensao_lanca, capacidade_raio, capacidade_alcance_max, angulo_minimo_fabricante,
+                            carga_maxima_eixo=None, grafico=None):
+    """
+    Cria o mapa de calor raio × carga total (utilização e conformidade do ângulo) para
+    a lança e as capacidades informadas. Os eixos não dependem do ponto de operação,
+    então o mapa é calculado uma vez e reaproveitado enquanto o usuário explora valores.
+    Não modifique a figura retornada; use criar_mapa_what_if para sobrepor o ponto atual.
+
+    Com o gráfico de carga do guindaste, a capacidade de cada raio vem do gráfico
+    (critério conservador) e o limite de 80% vira uma curva; os raios sem capacidade
+    homologada ficam em cinza, como os de ângulo inseguro.
+
+    Args:
+        carga_maxima_eixo (float): Topo do eixo de carga (padrão: 1,25 × a capacidade)
+        grafico (LoadChart): Gráfico de carga do guindaste (opcional)
+    """
+    raios = np.linspace(extensao_lanca / RESOLUCAO_MAPA, extensao_lanca, RESOLUCAO_MAPA)
+    if grafico is not None:
+        capacidades = np.asarray(grafico.capacidade_conservadora(raios, extensao_lanca), dtype=np.float64)
+        capacidade = float(capacidades.max())
+    else:
+        capacidade = min(capacidade_raio, capacidade_alcance_max)
+    carga_maxima_eixo = carga_maxima_eixo or _topo_eixo_carga(capacidade, 0.0)
+    cargas = np.linspace(carga_maxima_eixo / 1.25 / RESOLUCAO_MAPA, carga_maxima_eixo, RESOLUCAO_MAPA)
+    mapa = mapa_raio_carga(
+        raios, cargas, extensao_lanca, angulo_minimo_fabricante, capacidade_raio, capacidade_alcance_max,
+        grafico=grafico
     )
-    
-    # Arco do Ângulo da Operação
-    try:
-        arc_radius_op = extensao_lanca * 0.25
-        theta_arco_op = np.linspace(0, angulo_operacao_rad, 50)
-        x_arco_op = arc_radius_op * np.cos(theta_arco_op)
-        y_arco_op = torre_height + arc_radius_op * np.sin(theta_arco_op)
-        
+    indisponivel = ~mapa['angulo_ok']
+    if grafico is not None:
+        indisponivel |= capacidades <= 0
+    indisponivel = indisponivel[None, :]
+
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        x=raios,
+        y=cargas,
+        z=np.where(indisponivel, np.nan, mapa['porcentagem_segura']),
+        zmin=0,
+        zmax=125,
+        colorscale=[[0, 'seagreen'], [0.6, 'gold'], [0.64, 'darkorange'], [1, 'crimson']],
+        colorbar=dict(title="Utilização (%)"),
+        name='Utilização',
+        hovertemplate="Raio: %{x:.2f} m<br>Carga: %{y:,.0f} kg<br>Utilização: %{z:.1f}%<extra></extra>"
+    ))
+    motivo = "Ângulo abaixo do mínimo ou fora do gráfico de carga" if grafico is not None else "Ângulo abaixo do mínimo"
+    fig.add_trace(go.Heatmap(
+        x=raios,
+        y=cargas,
+        z=np.where(indisponivel, 1.0, np.nan) * np.ones_like(mapa['porcentagem_segura']),
+        colorscale=[[0, 'rgba(110, 110, 110, 0.55)'], [1, 'rgba(110, 110, 110, 0.55)']],
+        showscale=False,
+        name='Ângulo Inseguro',
+        hovertemplate=f"Raio: %{{x:.2f}} m<br>{motivo}<extra></extra>"
+    ))
+    if grafico is not None:
         fig.add_trace(go.Scatter(
-            x=x_arco_op, 
-            y=y_arco_op, 
-            mode='lines', 
-            line=dict(color='darkgreen', width=2), 
-            hoverinfo='none', 
-            showlegend=False
+            x=raios,
+            y=capacidades * (LIMITE_SEGURANCA / 100),
+            mode='lines',
+            line=dict(color='black', width=1, dash='dash', shape='hv'),
+            name='Limite de 80%',
+            hovertemplate="Raio: %{x:.2f} m<br>Limite de 80%: %{y:,.0f} kg<extra></extra>"
         ))
-        
-        # Texto do Ângulo da Operação
-        text_angle_rad_op = angulo_operacao_rad / 2
-        fig.add_annotation(
-            x=arc_radius_op * 1.2 * np.cos(text_angle_rad_op),
-            y=torre_height + arc_radius_op * 1.2 * np.sin(text_angle_rad_op),
-            text=f"<b>{angulo_operacao_graus:.1f}°</b>",
-            showarrow=False, 
-            font=dict(color='darkgreen', size=14)
+    else:
+        fig.add_hline(
+            y=carga_total_maxima(capacidade_raio, capacidade_alcance_max),
+            line=dict(color='black', width=1, dash='dash'),
+            annotation_text="Limite de 80%",
+            annotation_position="top left"
         )
-    except Exception as e:
-        st.warning(f"Não foi possível adicionar anotações de ângulo: {e}")
+    fig.add_vline(
+        x=raio_maximo(extensao_lanca, angulo_minimo_fabricante),
+        line=dict(color='black', width=1, dash='dot'),
+        annotation_text=f"Ângulo mínimo ({angulo_minimo_fabricante:g}°)",
+        annotation_position="top right"
+    )
+    fig.update_layout(
+        title=dict(text="<b>Mapa What-if: Raio × Carga Total</b>", x=0.5),
+        xaxis_title="Raio de Operação [m]",
+        yaxis_title="Carga Total [kg]",
+        yaxis=dict(range=[0, carga_maxima_eixo]),
+        margin=dict(l=80, r=40, t=80, b=60),
+        plot_bgcolor='white',
+        showlegend=False
+    )
+    return FiguraCongelada(fig.to_dict(), _validate=False)
+
+
+@functools.lru_cache(maxsize=1)
+def _modelo_marcador_operacao():
+    """Traço do marcador da operação atual, validado uma vez por processo (sem coordenadas)."""
+    return go.Scatter(
+        mode='markers',
+        name='Operação Atual',
+        marker=dict(symbol='x', size=14, color='black', line=dict(width=2, color='white')),
+        hovertemplate="<b>Operação Atual</b><br>Raio: %{x:.2f} m<br>Carga: %{y:,.2f} kg<extra></extra>"
+    ).to_plotly_json()
+
+
+def criar_mapa_what_if(raio_max, carga_total, extensao_lanca, capacidade_raio,
+                       capacidade_alcance_max, angulo_minimo_fabricante, grafico=None):
+    """
+    Mapa what-if com o ponto de operação atual sobreposto. Só o marcador é novo a cada
+    chamada; a superfície vem do cache enquanto lança, capacidades, gráfico, ângulo e
+    a faixa do eixo de carga (que sempre inclui a carga atual) não mudarem. A figura
+    é montada a partir do dicionário do mapa base, sem validar de novo as superfícies.
+    """
+    if grafico is not None:
+        raios = np.linspace(extensao_lanca / RESOLUCAO_MAPA, extensao_lanca, RESOLUCAO_MAPA)
+        capacidade = float(np.max(grafico.capacidade_conservadora(raios, extensao_lanca)))
+    else:
+        capacidade = min(capacidade_raio, capacidade_alcance_max)
+    base = criar_mapa_what_if_base(
+        extensao_lanca, capacidade_raio, capacidade_alcance_max, angulo_minimo_fabricante,
+        _topo_eixo_carga(capacidade, carga_total), grafico
+    ).to_dict()
+    marcador = dict(_modelo_marcador_operacao(), x=[raio_max], y=[carga_total])
+    return go.Figure({'data': base['data'] + [marcador], 'layout': base['layout']}, _validate=False)
+
+# Acima deste número de avaliações, o gráfico da frota é reduzido no servidor antes do envio
+LIMITE_PONTOS_DISPERSAO = 20000
+
+# Grade (células por eixo) usada na redução: células pouco povoadas são mantidas inteiras
+RESOLUCAO_REDUCAO = 100
+
+
+def _celulas_grade(valores, resolucao):
+    minimo, maximo = np.min(valores), np.max(valores)
+    if maximo <= minimo:
+        return np.zeros(len(valores), dtype=np.int64)
+    celulas = ((valores - minimo) / (maximo - minimo) * resolucao).astype(np.int64)
+    return np.minimum(celulas, resolucao - 1)
 
-    # Ponto de Içamento (Carga)
-    fig.add_trace(go.Scatter(
-        x=[raio_max], 
-        y=[y_lan_end], 
-        mode='markers', 
-        name='Ponto de Içamento', 
-        marker=dict(symbol='circle-open', size=15, color='darkorange', line=dict(width=3)), 
-        hovertemplate=f"<b>Carga Total: {carga_total:,.2f} kg</b><br>Capacidade no Raio: {capacidade_raio:,.2f} kg<extra></extra>"
-    ))
 
-    # --- 5. Layout Final ---
+def reduzir_pontos_dispersao(x, y, limite=LIMITE_PONTOS_DISPERSAO, resolucao=RESOLUCAO_REDUCAO, semente=0):
+    """
+    Escolhe no máximo `limite` pontos de uma dispersão preservando sua forma.
+
+    O plano é dividido em uma grade resolucao × resolucao e cada célula contribui com
+    no máximo k pontos, com k o maior valor que respeita o limite. Regiões densas são
+    amostradas e regiões esparsas (casos extremos, como utilização muito alta ou
+    ângulos baixos) são mantidas por completo. A escolha é determinística pela semente.
+
+    Args:
+        x (array-like): Coordenadas x (sem NaN)
+        y (array-like): Coordenadas y (sem NaN)
+        limite (int): Número máximo de pontos retornados
+        resolucao (int): Células por eixo da grade
+        semente (int): Semente do sorteio dentro de cada célula
+
+    Returns:
+        ndarray: Índices ordenados dos pontos mantidos
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n <= limite:
+        return np.arange(n)
+
+    celula = _celulas_grade(x, resolucao) * resolucao + _celulas_grade(y, resolucao)
+    rng = np.random.default_rng(semente)
+
+    # Ordem aleatória dentro de cada célula: o posto do ponto na célula decide se ele fica
+    ordem = rng.permutation(n)
+    ordem = ordem[np.argsort(celula[ordem], kind='stable')]
+    celulas_ordenadas = celula[ordem]
+    posto = np.arange(n) - np.searchsorted(celulas_ordenadas, celulas_ordenadas, side='left')
+
+    # Maior cota por célula cujo total não passa do limite (busca binária)
+    contagens = np.bincount(celula)
+    contagens = contagens[contagens > 0]
+    menor, maior = 0, int(contagens.max())
+    while menor < maior:
+        meio = (menor + maior + 1) // 2
+        if np.minimum(contagens, meio).sum() <= limite:
+            menor = meio
+        else:
+            maior = meio - 1
+
+    if menor == 0:
+        # Mais células ocupadas que o limite: um ponto por célula, sorteando as células
+        mantidos = ordem[posto == 0]
+        mantidos = rng.choice(mantidos, size=limite, replace=False)
+    else:
+        mantidos = ordem[posto < menor]
+    return np.sort(mantidos)
+
+
+def criar_dispersao_frota(dados, limite=LIMITE_PONTOS_DISPERSAO):
+    """
+    Dispersão ângulo da lança × utilização de todas as avaliações da frota (WebGL).
+
+    Usa Scattergl, que desenha os pontos na GPU do navegador, e reduz a quantidade de
+    pontos no servidor quando passa de `limite`, para que o JSON enviado pelo websocket
+    do Streamlit continue pequeno com centenas de milhares de avaliações.
+
+    Args:
+        dados (pd.DataFrame): Colunas 'id', 'angulo', 'utilizacao', 'adequado',
+            'guindaste' e 'empresa' (ver history.carregar_dados_frota)
+        limite (int): Número máximo de pontos desenhados
+
+    Returns:
+        go.Figure: Figura com um traço por resultado (aprovada / reprovada)
+    """
+    dados = dados.dropna(subset=['angulo', 'utilizacao'])
+    total = len(dados)
+    indices = reduzir_pontos_dispersao(dados['angulo'].to_numpy(), dados['utilizacao'].to_numpy(), limite)
+    exibidos = dados.iloc[indices]
+
+    # Traços montados como dicionários, sem validação ponto a ponto; os textos do hover vão
+    # em listas 1-D (id, guindaste e empresa), bem mais rápidas de serializar que uma matriz
+    tracos = []
+    for adequado, nome, cor in ((True, 'Aprovada', 'seagreen'), (False, 'Reprovada', 'crimson')):
+        grupo = exibidos[exibidos['adequado'] == adequado]
+        tracos.append({
+            'type': 'scattergl',
+            'x': grupo['angulo'].to_numpy(dtype=float),
+            'y': grupo['utilizacao'].to_numpy(dtype=float),
+            'mode': 'markers',
+            'name': nome,
+            'marker': {'color': cor, 'size': 5, 'opacity': 0.6},
+            'customdata': grupo['id'].tolist(),
+            'text': grupo['guindaste'].tolist(),
+            'hovertext': grupo['empresa'].tolist(),
+            'hovertemplate': (
+                "<b>%{customdata}</b><br>Guindaste: %{text}<br>Empresa: %{hovertext}<br>"
+                "Ângulo: %{x:.1f}°<br>Utilização: %{y:.1f}%<extra></extra>"
+            )
+        })
+    fig = go.Figure({'data': tracos}, _validate=False)
+    fig.add_hline(
+        y=LIMITE_SEGURANCA,
+        line=dict(color='black', width=1, dash='dash'),
+        annotation_text=f"Limite de {LIMITE_SEGURANCA:g}%",
+        annotation_position="top left"
+    )
+
+    titulo = "<b>Frota: Ângulo da Lança × Utilização</b>"
+    if len(exibidos) < total:
+        titulo += f"<br><sup>{len(exibidos):,} de {total:,} avaliações exibidas (amostra)</sup>".replace(",", ".")
     fig.update_layout(
-        title=dict(
-            text="<b>Diagrama Técnico da Operação de Içamento</b>", 
-            font=dict(size=20), 
-            x=0.5
-        ),
-        xaxis_title="Distância Horizontal (Raio) [m]", 
-        yaxis_title="Altura Vertical [m]",
-        showlegend=True, 
-        legend=dict(
-            orientation="h", 
-            yanchor="bottom", 
-            y=1.02, 
-            xanchor="right", 
-            x=1
-        ),
-        xaxis=dict(
-            range=[-base_width, raio_max * 1.15], 
-            gridcolor='lightgrey'
-        ),
-        yaxis=dict(
-            range=[-torre_height, y_lan_end * 1.15], 
-            scaleanchor="x", 
-            scaleratio=1, 
-            gridcolor='lightgrey'
-        ),
-        margin=dict(l=80, r=40, t=80, b=80), 
-        hovermode='closest', 
+        title=dict(text=titulo, x=0.5),
+        xaxis_title="Ângulo da Lança [°]",
+        yaxis_title="Utilização [%]",
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+        margin=dict(l=60, r=30, t=90, b=60),
         plot_bgcolor='white'
     )
-    
     return fig
 
+# Versão do desenho estático; altere ao mudar a aparência para invalidar o cache em disco
+VERSAO_RENDERIZADOR_PDF = 1
+
+CAMINHO_PADRAO_CACHE_PDF = os.path.join(tempfile.gettempdir(), 'pip_rev01', 'diagramas_pdf')
+TAMANHO_MAXIMO_CACHE_PDF_MB = 256
 
-def generate_static_diagram_for_pdf(raio_max, alcance_max, angulo_minimo_fabricante):
+TIPOS_MIME_DIAGRAMA = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+
+def get_pdf_diagram_cache_dir():
+    """Diretório do cache de diagramas: variável de ambiente, secrets ou diretório temporário do host."""
+    caminho = os.getenv('PDF_DIAGRAM_CACHE_DIR')
+    if caminho:
+        return caminho
+    try:
+        return st.secrets.cache_config.pdf_diagram_dir
+    except Exception:
+        return CAMINHO_PADRAO_CACHE_PDF
+
+
+@functools.lru_cache(maxsize=None)
+def obter_cache_diagramas_pdf(formato='png'):
     """
-    Gera um diagrama estático para inclusão em PDF com validações completas.
+    Cache em disco das imagens do diagrama estático, compartilhado pelos processos do host.
+    PNG e SVG ficam no mesmo diretório e dividem o limite PDF_DIAGRAM_CACHE_MAX_MB.
     """
-    try:
-        fig, ax = plt.subplots(figsize=(8, 6))
-        ax.set_aspect('equal', adjustable='box')
-        
-        # Validações iniciais
-        if raio_max <= 0 or alcance_max <= 0:
-            ax.text(0.5, 0.5, 'Dados insuficientes para gerar o diagrama', 
-                   ha='center', va='center', transform=ax.transAxes)
-            buf = io.BytesIO()
-            fig.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-            buf.seek(0)
-            plt.close(fig)
-            img_base64 = base64.b64encode(buf.read()).decode("utf-8")
-            return f"data:image/png;base64,{img_base64}"
-        
-        # Cálculo do comprimento da lança
-        comprimento_lanca = np.sqrt(raio_max**2 + alcance_max**2)
-        
-        # Validação geométrica
-        if comprimento_lanca <= raio_max:
-            ax.text(0.5, 0.5, 'Erro: Configuração geometricamente inválida', 
-                   ha='center', va='center', transform=ax.transAxes, color='red')
-            buf = io.BytesIO()
-            fig.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-            buf.seek(0)
-            plt.close(fig)
-            img_base64 = base64.b64encode(buf.read()).decode("utf-8")
-            return f"data:image/png;base64,{img_base64}"
-        
-        # Cálculos trigonométricos
-        angulo_operacao_rad = np.arctan2(alcance_max, raio_max)
-        angulo_operacao_graus = np.degrees(angulo_operacao_rad)
-        angulo_min_rad = np.radians(angulo_minimo_fabricante)
-        
-        # Proporções da base e torre
-        base_width = max(4, raio_max * 0.05)
-        torre_height = max(2, alcance_max * 0.05)
-        
-        # Desenhar base
-        ax.fill(
-            [-base_width/2, base_width/2, base_width/2, -base_width/2], 
-            [-torre_height/2, -torre_height/2, 0, 0], 
-            color='lightgray', 
-            zorder=1
-        )
-        
-        # Desenhar torre
-        ax.plot([0, 0], [0, torre_height], color='dimgray', linewidth=8, zorder=2)
-        
-        # Desenhar lança
-        y_lan_end = torre_height + alcance_max
-        cor_lanca = 'royalblue' if angulo_operacao_graus >= angulo_minimo_fabricante else 'crimson'
-        ax.plot(
-            [0, raio_max], 
-            [torre_height, y_lan_end], 
-            color=cor_lanca, 
-            linewidth=8, 
-            zorder=4, 
-            label='Lança de Operação'
-        )
-        
-        # Zona de risco
-        raio_risco = comprimento_lanca
-        theta_risco = np.linspace(0, angulo_min_rad, 50)
-        x_risco_arc = raio_risco * np.cos(theta_risco)
-        y_risco_arc = torre_height + raio_risco * np.sin(theta_risco)
-        x_poly = np.concatenate([[0], x_risco_arc])
-        y_poly = np.concatenate([[torre_height], y_risco_arc])
-        ax.fill(
-            x_poly, 
-            y_poly, 
-            color='pink', 
-            alpha=0.5, 
-            zorder=3, 
-            label=f'Zona de Risco (< {angulo_minimo_fabricante}°)'
-        )
-        
-        # Linha do raio
-        ax.plot(
-            [0, raio_max], 
-            [-torre_height * 0.5, -torre_height * 0.5], 
-            color='black', 
-            linestyle='--', 
-            linewidth=1
-        )
-        ax.text(
-            raio_max / 2, 
-            -torre_height * 0.8, 
-            f"Raio: {raio_max:.2f} m", 
-            ha='center', 
-            fontsize=9
-        )
-        
-        # Arco do ângulo
-        arc_radius_op = comprimento_lanca * 0.25
-        arc_op = Arc(
-            (0, torre_height), 
-            arc_radius_op * 2, 
-            arc_radius_op * 2, 
-            angle=0, 
-            theta1=0, 
-            theta2=angulo_operacao_graus, 
-            color='darkgreen', 
-            linewidth=2
-        )
-        ax.add_patch(arc_op)
-        
-        # Texto do ângulo
-        text_angle_rad_op = angulo_operacao_rad / 2
-        text_x = arc_radius_op * 1.2 * np.cos(text_angle_rad_op)
-        text_y = torre_height + arc_radius_op * 1.2 * np.sin(text_angle_rad_op)
-        ax.text(
-            text_x, 
-            text_y, 
-            f'{angulo_operacao_graus:.1f}°', 
-            color='darkgreen', 
-            ha='center', 
-            va='center', 
-            fontsize=12, 
-            weight='bold'
-        )
-        
-        # Configurações finais
-        ax.set_title("Diagrama Técnico da Operação de Içamento", fontsize=14)
-        ax.set_xlabel("Distância Horizontal (Raio) [m]", fontsize=10)
-        ax.set_ylabel("Altura Vertical [m]", fontsize=10)
-        ax.grid(True, linestyle=':', alpha=0.6)
-        ax.legend(loc='upper left', fontsize=10)
-        ax.set_xlim(-raio_max * 0.1, raio_max * 1.1)
-        ax.set_ylim(-torre_height, y_lan_end * 1.1)
-        
-        # Salvar como base64
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close(fig)
-        img_base64 = base64.b64encode(buf.read()).decode("utf-8")
-        return f"data:image/png;base64,{img_base64}"
-        
-    except Exception as e:
-        # Em caso de erro, retorna uma imagem com mensagem de erro
-        fig, ax = plt.subplots(figsize=(8, 6))
-        ax.text(
-            0.5, 0.5, 
-            f'Erro ao gerar diagrama:\n{str(e)}', 
-            ha='center', 
-            va='center', 
-            transform=ax.transAxes,
-            color='red',
-            fontsize=12
-        )
-        ax.axis('off')
-        buf = io.BytesIO()
+    tamanho_mb = float(os.getenv('PDF_DIAGRAM_CACHE_MAX_MB', TAMANHO_MAXIMO_CACHE_PDF_MB))
+    return DiskCache(get_pdf_diagram_cache_dir(), tamanho_mb * 1024 * 1024, extensao=f'.{formato}')
+
+
+def _nova_figura():
+    """
+    Figura e eixo independentes do pyplot: cada chamada tem seu próprio canvas Agg,
+    sem estado global, e pode ser desenhada em paralelo por várias threads ou processos.
+    """
+    # matplotlib só é necessário para o PDF; importado aqui para não pesar nas páginas interativas
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(8, 6))
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def _figura_bytes(fig, formato='png'):
+    """Exporta a figura como PNG (rasterizado a 150 dpi) ou SVG (vetorial)."""
+    buf = io.BytesIO()
+    if formato == 'svg':
+        # Sem data de criação, para que o mesmo diagrama gere sempre o mesmo conteúdo
+        fig.savefig(buf, format='svg', bbox_inches='tight', metadata={'Date': None})
+    else:
         fig.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close(fig)
-        img_base64 = base64.b64encode(buf.read()).decode("utf-8")
-        return f"data:image/png;base64,{img_base64}"
+    return buf.getvalue()
+
+
+def _data_uri(dados, formato='png'):
+    img_base64 = base64.b64encode(dados).decode("utf-8")
+    return f"data:{TIPOS_MIME_DIAGRAMA[formato]};base64,{img_base64}"
+
+
+def _renderizar_diagrama_pdf(raio_max, alcance_max, angulo_minimo_fabricante, formato='png'):
+    """Desenha o diagrama estático e retorna os bytes da imagem no formato pedido."""
+    from matplotlib.patches import Arc
+
+    fig, ax = _nova_figura()
+    ax.set_aspect('equal', adjustable='box')
+
+    # Validações iniciais
+    if raio_max <= 0 or alcance_max <= 0:
+        ax.text(0.5, 0.5, 'Dados insuficientes para gerar o diagrama', 
+               ha='center', va='center', transform=ax.transAxes)
+        return _figura_bytes(fig, formato)
+
+    # Cálculo do comprimento da lança
+    comprimento_lanca = np.sqrt(raio_max**2 + alcance_max**2)
+
+    # Validação geométrica
+    if comprimento_lanca <= raio_max:
+        ax.text(0.5, 0.5, 'Erro: Configuração geometricamente inválida', 
+               ha='center', va='center', transform=ax.transAxes, color='red')
+        return _figura_bytes(fig, formato)
+
+    # Cálculos trigonométricos
+    angulo_operacao_rad = np.arctan2(alcance_max, raio_max)
+    angulo_operacao_graus = np.degrees(angulo_operacao_rad)
+    angulo_min_rad = np.radians(angulo_minimo_fabricante)
+
+    # Proporções da base e torre
+    base_width = max(4, raio_max * 0.05)
+    torre_height = max(2, alcance_max * 0.05)
+
+    # Desenhar base
+    ax.fill(
+        [-base_width/2, base_width/2, base_width/2, -base_width/2], 
+        [-torre_height/2, -torre_height/2, 0, 0], 
+        color='lightgray', 
+        zorder=1
+    )
+
+    # Desenhar torre
+    ax.plot([0, 0], [0, torre_height], color='dimgray', linewidth=8, zorder=2)
+
+    # Desenhar lança
+    y_lan_end = torre_height + alcance_max
+    cor_lanca = 'royalblue' if angulo_operacao_graus >= angulo_minimo_fabricante else 'crimson'
+    ax.plot(
+        [0, raio_max], 
+        [torre_height, y_lan_end], 
+        color=cor_lanca, 
+        linewidth=8, 
+        zorder=4, 
+        label='Lança de Operação'
+    )
+
+    # Zona de risco
+    raio_risco = comprimento_lanca
+    theta_risco = np.linspace(0, angulo_min_rad, 50)
+    x_risco_arc = raio_risco * np.cos(theta_risco)
+    y_risco_arc = torre_height + raio_risco * np.sin(theta_risco)
+    x_poly = np.concatenate([[0], x_risco_arc])
+    y_poly = np.concatenate([[torre_height], y_risco_arc])
+    ax.fill(
+        x_poly, 
+        y_poly, 
+        color='pink', 
+        alpha=0.5, 
+        zorder=3, 
+        label=f'Zona de Risco (< {angulo_minimo_fabricante}°)'
+    )
+
+    # Linha do raio
+    ax.plot(
+        [0, raio_max], 
+        [-torre_height * 0.5, -torre_height * 0.5], 
+        color='black', 
+        linestyle='--', 
+        linewidth=1
+    )
+    ax.text(
+        raio_max / 2, 
+        -torre_height * 0.8, 
+        f"Raio: {raio_max:.2f} m", 
+        ha='center', 
+        fontsize=9
+    )
+
+    # Arco do ângulo
+    arc_radius_op = comprimento_lanca * 0.25
+    arc_op = Arc(
+        (0, torre_height), 
+        arc_radius_op * 2, 
+        arc_radius_op * 2, 
+        angle=0, 
+        theta1=0, 
+        theta2=angulo_operacao_graus, 
+        color='darkgreen', 
+        linewidth=2
+    )
+    ax.add_patch(arc_op)
+
+    # Texto do ângulo
+    text_angle_rad_op = angulo_operacao_rad / 2
+    text_x = arc_radius_op * 1.2 * np.cos(text_angle_rad_op)
+    text_y = torre_height + arc_radius_op * 1.2 * np.sin(text_angle_rad_op)
+    ax.text(
+        text_x, 
+        text_y, 
+        f'{angulo_operacao_graus:.1f}°', 
+        color='darkgreen', 
+        ha='center', 
+        va='center', 
+        fontsize=12, 
+        weight='bold'
+    )
+
+    # Configurações finais
+    ax.set_title("Diagrama Técnico da Operação de Içamento", fontsize=14)
+    ax.set_xlabel("Distância Horizontal (Raio) [m]", fontsize=10)
+    ax.set_ylabel("Altura Vertical [m]", fontsize=10)
+    ax.grid(True, linestyle=':', alpha=0.6)
+    ax.legend(loc='upper left', fontsize=10)
+    ax.set_xlim(-raio_max * 0.1, raio_max * 1.1)
+    ax.set_ylim(-torre_height, y_lan_end * 1.1)
+
+    # Salvar como PNG
+    return _figura_bytes(fig, formato)
+
+
+def _renderizar_erro_pdf(e, formato='png'):
+    """Imagem com a mensagem de erro, usada quando o diagrama não pode ser desenhado."""
+    fig, ax = _nova_figura()
+    ax.text(
+        0.5, 0.5, 
+        f'Erro ao gerar diagrama:\n{str(e)}', 
+        ha='center', 
+        va='center', 
+        transform=ax.transAxes,
+        color='red',
+        fontsize=12
+    )
+    ax.axis('off')
+    return _figura_bytes(fig, formato)
+
+
+def chave_diagrama_pdf(raio_max, alcance_max, angulo_minimo_fabricante, formato='png'):
+    """Chave do diagrama no cache em disco: entradas normalizadas, versão do renderizador e formato."""
+    chave = [normalizar_valor(v) for v in (raio_max, alcance_max, angulo_minimo_fabricante)]
+    return chave + [VERSAO_RENDERIZADOR_PDF, formato]
+
+
+def generate_static_diagram_for_pdf(raio_max, alcance_max, angulo_minimo_fabricante, formato='png'):
+    """
+    Gera um diagrama estático para inclusão em PDF com validações completas.
+
+    A imagem é guardada no cache em disco, endereçada pelo hash de (raio, alcance,
+    ângulo mínimo, versão do renderizador, formato), de modo que o diagrama de uma
+    mesma avaliação é renderizado uma única vez no host. Imagens de erro não são guardadas.
+
+    Args:
+        raio_max (float): Raio de operação em metros
+        alcance_max (float): Alcance (altura) máximo em metros
+        angulo_minimo_fabricante (float): Ângulo mínimo em graus
+        formato (str): 'png' (rasterizado a 150 dpi) ou 'svg' (vetorial, embutido
+            pelo WeasyPrint sem rasterização)
+
+    Returns:
+        str: Imagem como data URI em base64
+
+    Raises:
+        ValueError: Se o formato não for suportado
+    """
+    if formato not in TIPOS_MIME_DIAGRAMA:
+        raise ValueError(f"Formato de diagrama inválido: {formato}. Use um de {', '.join(TIPOS_MIME_DIAGRAMA)}.")
+
+    chave = chave_diagrama_pdf(raio_max, alcance_max, angulo_minimo_fabricante, formato)
+    cache = obter_cache_diagramas_pdf(formato)
+
+    imagem = cache.get(chave)
+    if imagem is None:
+        try:
+            imagem = _renderizar_diagrama_pdf(raio_max, alcance_max, angulo_minimo_fabricante, formato)
+        except Exception as e:
+            # Em caso de erro, retorna uma imagem com mensagem de erro
+            return _data_uri(_renderizar_erro_pdf(e, formato), formato)
+        cache.set(chave, imagem)
+    return _data_uri(imagem, formato)
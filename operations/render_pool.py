@@ -0,0 +1,203 @@
+import os
+import sys
+import types
+import atexit
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from operations.plot import (
+    generate_static_diagram_for_pdf,
+    chave_diagrama_pdf,
+    get_pdf_diagram_cache_dir,
+    obter_cache_diagramas_pdf
+)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pool = None
+_workers_pool = 0
+
+
+def _reduzir_prioridade(pid, nice_alvo):
+    """Leva o processo (0 = o atual) ao nice alvo, sem nunca aumentar sua prioridade."""
+    try:
+        if os.getpriority(os.PRIO_PROCESS, pid) < nice_alvo:
+            os.setpriority(os.PRIO_PROCESS, pid, nice_alvo)
+    except OSError as e:
+        logger.warning("Não foi possível reduzir a prioridade do processo %s: %s", pid, e)
+
+
+def _inicializar_worker(ambiente, nice_alvo=None):
+    """
+    Prepara o processo de renderização: usa os mesmos caches em disco do processo
+    principal (variáveis em `ambiente`), confirma a prioridade de CPU reduzida se pedida
+    e renderiza um diagrama descartável para importar o matplotlib e montar o cache de
+    fontes antes do primeiro job real.
+    """
+    os.environ.update(ambiente)
+    if nice_alvo is not None:
+        _reduzir_prioridade(0, nice_alvo)
+    from operations.plot import _renderizar_diagrama_pdf
+    _renderizar_diagrama_pdf(10.0, 10.0, 45.0)
+
+
+def _aquecer():
+    return os.getpid()
+
+
+def _renderizar_job(indice, raio_max, alcance_max, angulo_minimo_fabricante, formato):
+    return indice, generate_static_diagram_for_pdf(raio_max, alcance_max, angulo_minimo_fabricante, formato)
+
+
+# Serializa as trocas de __main__ entre threads que criam pools ao mesmo tempo
+_lock_main = threading.Lock()
+
+
+@contextmanager
+def _main_neutro():
+    """
+    Substitui temporariamente o módulo __main__ por um módulo vazio.
+
+    Dentro do Streamlit, __main__ é o script da página; processos iniciados com 'spawn'
+    reexecutariam o script inteiro (a aplicação) ao importar o __main__ do processo pai.
+
+    A troca vale para o processo inteiro: enquanto dura, outras threads que consultem
+    sys.modules['__main__'] veem o módulo vazio. Por isso ela cobre apenas o lançamento
+    dos processos (sem esperar o aquecimento), as trocas são serializadas por _lock_main,
+    e o original só é restaurado se ninguém substituiu o módulo no intervalo (o
+    Streamlit instala um __main__ novo a cada execução de script).
+    """
+    with _lock_main:
+        original = sys.modules.get('__main__')
+        neutro = types.ModuleType('__main__')
+        sys.modules['__main__'] = neutro
+        try:
+            yield
+        finally:
+            if sys.modules.get('__main__') is neutro:
+                sys.modules['__main__'] = original
+
+
+def numero_workers_padrao():
+    return max(1, os.cpu_count() or 1)
+
+
+def criar_pool(max_workers, prioridade=0, ambiente=None):
+    """
+    Cria um pool de processos de renderização com todos os workers já iniciados e aquecidos.
+
+    Os workers são iniciados com 'spawn' (o servidor do Streamlit tem várias threads,
+    e fork com threads ativas não é seguro).
+
+    Args:
+        max_workers (int): Número de processos
+        prioridade (int): Incremento de nice dos workers (POSIX); valores maiores cedem
+            CPU às sessões interativas do servidor
+        ambiente (dict): Variáveis de ambiente extras repassadas aos workers
+
+    Returns:
+        ProcessPoolExecutor: Pool pronto para uso
+    """
+    variaveis = {'PDF_DIAGRAM_CACHE_DIR': get_pdf_diagram_cache_dir()}
+    variaveis.update(ambiente or {})
+    nice_alvo = None
+    if prioridade and hasattr(os, 'setpriority'):
+        nice_alvo = os.getpriority(os.PRIO_PROCESS, 0) + prioridade
+    pool = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_inicializar_worker,
+        initargs=(variaveis, nice_alvo)
+    )
+    # Todos os workers são lançados aqui, com o __main__ neutro: os envios seguidos
+    # encontram o pool sem workers ociosos e cada um inicia um processo, na própria
+    # chamada a submit. O aquecimento é aguardado depois, fora da troca.
+    with _main_neutro():
+        futuros = [pool.submit(_aquecer) for _ in range(max_workers)]
+    if nice_alvo is not None:
+        # Aplicada logo após o lançamento: as importações do worker, feitas antes do
+        # initializer, já cedem CPU às sessões
+        for processo in list(pool._processes.values()):
+            _reduzir_prioridade(processo.pid, nice_alvo)
+    for futuro in futuros:
+        futuro.result()
+    return pool
+
+
+def pool_quebrado(pool):
+    """True se um worker morreu e o executor não aceita mais jobs."""
+    return getattr(pool, '_broken', False)
+
+
+def obter_pool(max_workers=None):
+    """
+    Pool de processos de renderização compartilhado pelo processo do servidor.
+
+    Pedir um número diferente de workers, ou um worker terminar de forma anormal,
+    recria o pool.
+    """
+    global _pool, _workers_pool
+    max_workers = max_workers or numero_workers_padrao()
+    with _lock:
+        if _pool is not None and _workers_pool == max_workers and not pool_quebrado(_pool):
+            return _pool
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+
+        _pool = criar_pool(max_workers)
+        _workers_pool = max_workers
+        logger.info("Pool de renderização iniciado com %d processos", max_workers)
+        return _pool
+
+
+@atexit.register
+def encerrar_pool():
+    global _pool, _workers_pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+            _workers_pool = 0
+
+
+def renderizar_diagramas(parametros, formato='png', max_workers=None):
+    """
+    Renderiza diagramas em lote no pool de processos, entregando cada resultado assim que fica pronto.
+
+    Diagramas já presentes no cache em disco são entregues primeiro, sem passar pelo pool.
+    A ordem de entrega não é a ordem de entrada; use o índice para associar os resultados.
+
+    Args:
+        parametros (iterable): Tuplas (raio_max, alcance_max, angulo_minimo_fabricante)
+        formato (str): 'png' ou 'svg'
+        max_workers (int): Processos do pool (padrão: número de CPUs)
+
+    Yields:
+        tuple: (indice, data_uri) com o índice da tupla em parametros
+    """
+    cache = obter_cache_diagramas_pdf(formato)
+    pendentes = []
+    for indice, (raio_max, alcance_max, angulo_minimo) in enumerate(parametros):
+        chave = chave_diagrama_pdf(raio_max, alcance_max, angulo_minimo, formato)
+        if chave in cache:
+            yield indice, generate_static_diagram_for_pdf(raio_max, alcance_max, angulo_minimo, formato)
+        else:
+            pendentes.append((indice, raio_max, alcance_max, angulo_minimo))
+
+    if not pendentes:
+        return
+
+    pool = obter_pool(max_workers)
+    futuros = [pool.submit(_renderizar_job, *job, formato) for job in pendentes]
+    logger.info("Lote de renderização: %d diagramas enviados ao pool", len(futuros))
+    try:
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+    finally:
+        # Se o consumidor abandonar o gerador, os jobs ainda não iniciados são cancelados
+        for futuro in futuros:
+            futuro.cancel()
@@ -1,17 +1,122 @@
-from weasyprint import HTML, CSS
+import os
+import tempfile
+import functools
+import threading
+
 import pandas as pd
+import streamlit as st
 from datetime import datetime
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
 
 # Importa a função centralizada e o plot estático
 from utils.helpers import safe_to_numeric
-from operations.plot import generate_static_diagram_for_pdf
+from utils.disk_cache import DiskCache
+from operations.plot import generate_static_diagram_for_pdf, TIPOS_MIME_DIAGRAMA, VERSAO_RENDERIZADOR_PDF
+
+# Formato padrão do diagrama embutido no PDF ('png' rasterizado ou 'svg' vetorial)
+RENDERIZADOR_PADRAO = 'png'
+
+DIRETORIO_TEMPLATES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+TEMPLATE_RELATORIO = 'report_template.html'
+ESTILOS_RELATORIO = 'report_styles.css'
+
+# Versão do template e do CSS do relatório; altere ao mudá-los para invalidar os PDFs em cache
+VERSAO_TEMPLATE_RELATORIO = 1
+
+CAMINHO_PADRAO_CACHE_RELATORIOS = os.path.join(tempfile.gettempdir(), 'pip_rev01', 'relatorios_pdf')
+TAMANHO_MAXIMO_CACHE_RELATORIOS_MB = 256
+
+# O mapa de fontes do Pango compartilhado não é seguro entre threads; o layout do
+# WeasyPrint roda em Python puro (preso ao GIL), então serializá-lo custa pouco
+_lock_layout = threading.Lock()
+
+
+def get_diagram_renderer():
+    """Renderizador do diagrama: variável de ambiente PDF_DIAGRAM_RENDERER ou o padrão."""
+    return os.getenv('PDF_DIAGRAM_RENDERER', RENDERIZADOR_PADRAO).lower()
+
+
+def get_pdf_report_cache_dir():
+    """Diretório do cache de relatórios: variável de ambiente, secrets ou diretório temporário do host."""
+    caminho = os.getenv('PDF_REPORT_CACHE_DIR')
+    if caminho:
+        return caminho
+    try:
+        return st.secrets.cache_config.pdf_report_dir
+    except Exception:
+        return CAMINHO_PADRAO_CACHE_RELATORIOS
+
+
+@functools.lru_cache(maxsize=None)
+def obter_cache_relatorios():
+    """Cache em disco dos PDFs gerados, compartilhado pelos processos do host."""
+    tamanho_mb = float(os.getenv('PDF_REPORT_CACHE_MAX_MB', TAMANHO_MAXIMO_CACHE_RELATORIOS_MB))
+    return DiskCache(get_pdf_report_cache_dir(), tamanho_mb * 1024 * 1024, extensao='.pdf')
+
+
+def _data_emissao():
+    return datetime.now().strftime("%d de %B de %Y")
+
+
+@functools.lru_cache(maxsize=None)
+def _ambiente_templates():
+    """
+    Ambiente Jinja do relatório, criado uma vez por processo. O template é compilado
+    no primeiro uso e fica no cache do ambiente; auto_reload desligado evita consultar
+    o arquivo em disco a cada relatório.
+    """
+    return Environment(
+        loader=FileSystemLoader(DIRETORIO_TEMPLATES),
+        autoescape=select_autoescape(['html']),
+        undefined=StrictUndefined,
+        auto_reload=False
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_report_css():
+    """
+    Retorna a string CSS com estilos ABNT para o relatório.
+    """
+    with open(os.path.join(DIRETORIO_TEMPLATES, ESTILOS_RELATORIO), encoding='utf-8') as f:
+        return f.read()
+
 
+@functools.lru_cache(maxsize=None)
+def _recursos_pdf():
+    """
+    Folha de estilos já interpretada e configuração de fontes do WeasyPrint, criadas
+    uma vez por processo e reaproveitadas por todos os relatórios.
+
+    Returns:
+        tuple: (CSS, FontConfiguration)
+    """
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    fontes = FontConfiguration()
+    css = CSS(string=get_report_css(), font_config=fontes)
+    return css, fontes
 
 
-def generate_abnt_report(dados_icamento, dados_guindauto):
+def generate_abnt_report(dados_icamento, dados_guindauto, renderizador=None):
     """
     Função principal que orquestra a geração do relatório PDF em formato ABNT.
+
+    Args:
+        dados_icamento (pd.Series): Linha da aba de içamento (o nome é o ID da avaliação)
+        dados_guindauto (pd.Series): Linha da aba do guindauto
+        renderizador (str): Formato do diagrama, 'png' ou 'svg' (padrão: get_diagram_renderer())
+
+    Returns:
+        bytes: Conteúdo do PDF
     """
+    from weasyprint import HTML
+
+    renderizador = renderizador or get_diagram_renderer()
+    if renderizador not in TIPOS_MIME_DIAGRAMA:
+        raise ValueError(f"Renderizador de diagrama inválido: {renderizador}. Use 'png' ou 'svg'.")
+
     # Usa a função centralizada para converter os dados
     raio_max = safe_to_numeric(dados_icamento.get('Raio Máximo (m)'))
     alcance_max = safe_to_numeric(dados_icamento.get('Alcance Máximo (m)'))
@@ -19,45 +124,73 @@ def generate_abnt_report(dados_icamento, dados_guindauto):
     if pd.isna(angulo_minimo) or angulo_minimo == 0:
         angulo_minimo = 40.0 # Define um padrão seguro caso o dado não exista
 
-    diagrama_base64_url = generate_static_diagram_for_pdf(raio_max, alcance_max, angulo_minimo)
+    diagrama_base64_url = generate_static_diagram_for_pdf(raio_max, alcance_max, angulo_minimo, renderizador)
 
     context = {
         "id_avaliacao": dados_icamento.name,
         "cidade": "Barueri, SP",
-        "data_emissao": datetime.now().strftime("%d de %B de %Y"),
+        "data_emissao": _data_emissao(),
         "dados_icamento": dados_icamento,
         "dados_guindauto": dados_guindauto,
         "diagrama_base64": diagrama_base64_url
     }
 
     html_string = get_report_html(context)
-    css_string = get_report_css()
+    css, fontes = _recursos_pdf()
 
-    css = CSS(string=css_string)
-    pdf_bytes = HTML(string=html_string).write_pdf(stylesheets=[css])
+    with _lock_layout:
+        pdf_bytes = HTML(string=html_string).write_pdf(stylesheets=[css], font_config=fontes)
 
     return pdf_bytes
 
-def get_report_html(context):
+def chave_relatorio(dados_icamento, dados_guindauto, renderizador=None):
+    """
+    Chave do PDF no cache: conteúdo das duas linhas, versões do template e do diagrama,
+    renderizador e data de emissão (impressa no relatório).
+    """
+    return [
+        VERSAO_TEMPLATE_RELATORIO,
+        VERSAO_RENDERIZADOR_PDF,
+        renderizador or get_diagram_renderer(),
+        _data_emissao(),
+        str(dados_icamento.name),
+        {str(k): str(v) for k, v in dados_icamento.items()},
+        {str(k): str(v) for k, v in dados_guindauto.items()}
+    ]
+
+def caminho_relatorio_em_cache(dados_icamento, dados_guindauto, renderizador=None):
+    """Caminho do PDF já gerado para estes dados no cache em disco, ou None."""
+    cache = obter_cache_relatorios()
+    chave = chave_relatorio(dados_icamento, dados_guindauto, renderizador)
+    return cache.caminho(chave) if chave in cache else None
+
+def generate_abnt_report_cached(dados_icamento, dados_guindauto, renderizador=None):
+    """
+    generate_abnt_report com cache em disco: o mesmo par de linhas gera o PDF uma única
+    vez e os downloads seguintes (de qualquer sessão ou processo) leem os bytes prontos.
+
+    Returns:
+        bytes: Conteúdo do PDF
     """
-    Gera a string HTML completa do relatório usando f-strings e dados do contexto.
+    cache = obter_cache_relatorios()
+    chave = chave_relatorio(dados_icamento, dados_guindauto, renderizador)
+    pdf_bytes = cache.get(chave)
+    if pdf_bytes is None:
+        pdf_bytes = generate_abnt_report(dados_icamento, dados_guindauto, renderizador)
+        cache.set(chave, pdf_bytes)
+    return pdf_bytes
+
+def _contexto_template(context):
+    """
+    Valores já formatados para o template, com extração segura e valores padrão.
     """
     dados_icamento = context["dados_icamento"]
     dados_guindauto = context["dados_guindauto"]
 
-    # Extração segura de dados com valores padrão
-    peso_carga_f = f"{safe_to_numeric(dados_icamento.get('Peso Carga (kg)', 0)):.2f}"
-    margem_perc_f = f"{safe_to_numeric(dados_icamento.get('Margem Segurança (%)', 0)):.0f}"
-    peso_seguranca_f = f"{safe_to_numeric(dados_icamento.get('Peso Segurança (kg)', 0)):.2f}"
-    peso_cabos_f = f"{safe_to_numeric(dados_icamento.get('Peso Cabos (kg)', 0)):.2f}"
-    peso_acessorios_f = f"{safe_to_numeric(dados_icamento.get('Peso Acessórios (kg)', 0)):.2f}"
-    carga_total_f = f"{safe_to_numeric(dados_icamento.get('Carga Total (kg)', 0)):.2f}"
-
     utilizacao_raio = dados_icamento.get('% Utilização Raio', 'N/A')
     utilizacao_alcance = dados_icamento.get('% Utilização Alcance', 'N/A')
 
     adequado_str = str(dados_icamento.get('Adequado', 'FALSE')).strip().upper()
-    conclusao_status = "APROVADA" if adequado_str == 'TRUE' else "REPROVADA"
 
     try:
         util_raio_float = float(str(utilizacao_raio).replace('%', '').strip())
@@ -66,129 +199,32 @@ def get_report_html(context):
     except (ValueError, TypeError):
         limite_seguranca = "com limites de segurança indeterminados"
 
-    html = f"""
-    <!DOCTYPE html>
-    <html lang="pt-br">
-    <head>
-        <meta charset="UTF-8">
-        <title>Relatório de Análise de Içamento - {context['id_avaliacao']}</title>
-    </head>
-    <body>
-        <!-- Capa do Relatório -->
-        <div class="cover-page">
-            <h1>VIBRA ENERGIA</h1>
-            <br><br><br><br>
-            <h2>RELATÓRIO DE ANÁLISE TÉCNICA DE IÇAMENTO DE CARGA</h2>
-            <h3>ID da Avaliação: {context['id_avaliacao']}</h3>
-            <p><strong>Empresa Contratante:</strong> {dados_guindauto.get('Empresa', 'Não informado')}</p>
-            <br><br><br><br><br><br>
-            <p class="cover-footer">{context['cidade']}, {context['data_emissao']}</p>
-        </div>
-
-        <!-- Introdução -->
-        <section>
-            <h1>1. INTRODUÇÃO</h1>
-            <p>
-                Este relatório apresenta a análise técnica e a metodologia aplicada na avaliação da operação de
-                içamento de carga, identificada pelo ID {context['id_avaliacao']}. O objetivo deste documento é validar
-                a segurança e a conformidade dos equipamentos e procedimentos utilizados, com base nos dados
-                fornecidos e nos cálculos de engenharia realizados. A elaboração deste relatório é de responsabilidade da VIBRA ENERGIA.
-            </p>
-        </section>
-
-        <!-- Desenvolvimento -->
-        <section>
-            <h1>2. DESENVOLVIMENTO</h1>
-            <div class="content-wrapper">
-                <div class="column-left">
-                    <h2>2.1. Dados da Operação</h2>
-                    <p>A operação foi realizada com os seguintes parâmetros principais:</p>
-                    <ul>
-                        <li><strong>Operador Responsável:</strong> {dados_guindauto.get('Nome Operador', 'Não informado')}</li>
-                        <li><strong>Guindaste Utilizado:</strong> {dados_icamento.get('Fabricante Guindaste', 'N/A')} - {dados_icamento.get('Nome Guindaste', 'N/A')}</li>
-                        <li><strong>Placa do Veículo:</strong> {dados_guindauto.get('Placa Guindaste', 'Não informado')}</li>
-                    </ul>
-
-                    <h2>2.2. Metodologia de Cálculo de Carga</h2>
-                    <p>A carga total da operação foi determinada pela soma do peso da carga, acessórios, cabos e uma margem de segurança. Os valores calculados foram:</p>
-                    <table>
-                        <tr><td>Peso da Carga</td><td>{peso_carga_f} kg</td></tr>
-                        <tr><td>Margem de Segurança ({margem_perc_f}%)</td><td>{peso_seguranca_f} kg</td></tr>
-                        <tr><td>Peso dos Cabos</td><td>{peso_cabos_f} kg</td></tr>
-                        <tr><td>Peso dos Acessórios</td><td>{peso_acessorios_f} kg</td></tr>
-                        <tr class="total-row"><td><strong>Carga Total Calculada</strong></td><td><strong>{carga_total_f} kg</strong></td></tr>
-                    </table>
-                </div>
-                <div class="column-right">
-                    <h2>2.3. Diagrama e Análise de Capacidade</h2>
-                    <p>O diagrama abaixo ilustra a configuração do içamento. A análise de capacidade indicou uma utilização de {utilizacao_raio} no raio máximo e {utilizacao_alcance} no alcance máximo.</p>
-                    <img src="{context['diagrama_base64']}" alt="Diagrama de Içamento">
-                </div>
-            </div>
-        </section>
-
-        <!-- Conclusão -->
-        <section>
-            <h1>3. CONCLUSÃO</h1>
-            <p>
-                Com base na análise dos dados e nos cálculos realizados, a operação foi considerada
-                <strong>{conclusao_status}</strong>.
-                A carga total de {carga_total_f} kg está {limite_seguranca} da capacidade do equipamento nas configurações avaliadas.
-            </p>
-            <p>Recomenda-se que todos os procedimentos de segurança padrão sejam seguidos durante a execução da tarefa.</p>
-        </section>
-    </body>
-    </html>
-    """
-    return html
+    return {
+        "id_avaliacao": context["id_avaliacao"],
+        "cidade": context["cidade"],
+        "data_emissao": context["data_emissao"],
+        "diagrama_base64": context["diagrama_base64"],
+        "empresa": dados_guindauto.get('Empresa', 'Não informado'),
+        "operador": dados_guindauto.get('Nome Operador', 'Não informado'),
+        "placa": dados_guindauto.get('Placa Guindaste', 'Não informado'),
+        "fabricante_guindaste": dados_icamento.get('Fabricante Guindaste', 'N/A'),
+        "nome_guindaste": dados_icamento.get('Nome Guindaste', 'N/A'),
+        "peso_carga": f"{safe_to_numeric(dados_icamento.get('Peso Carga (kg)', 0)):.2f}",
+        "margem_percentual": f"{safe_to_numeric(dados_icamento.get('Margem Segurança (%)', 0)):.0f}",
+        "peso_seguranca": f"{safe_to_numeric(dados_icamento.get('Peso Segurança (kg)', 0)):.2f}",
+        "peso_cabos": f"{safe_to_numeric(dados_icamento.get('Peso Cabos (kg)', 0)):.2f}",
+        "peso_acessorios": f"{safe_to_numeric(dados_icamento.get('Peso Acessórios (kg)', 0)):.2f}",
+        "carga_total": f"{safe_to_numeric(dados_icamento.get('Carga Total (kg)', 0)):.2f}",
+        "utilizacao_raio": utilizacao_raio,
+        "utilizacao_alcance": utilizacao_alcance,
+        "conclusao_status": "APROVADA" if adequado_str == 'TRUE' else "REPROVADA",
+        "limite_seguranca": limite_seguranca
+    }
 
-def get_report_css():
+def get_report_html(context):
     """
-    Retorna a string CSS com estilos ABNT para o relatório.
+    Gera a string HTML completa do relatório a partir do template compilado.
+    Os valores são escapados pelo Jinja (nomes de empresa ou operador com '&' ou '<').
     """
-    css = """
-    @page {
-        size: A4 landscape;
-        margin: 2cm;
-        @bottom-right {
-            content: counter(page);
-            font-family: 'Times New Roman', serif;
-            font-size: 12pt;
-        }
-    }
-    body {
-        font-family: 'Times New Roman', serif;
-        font-size: 12pt;
-        line-height: 1.5;
-        text-align: justify;
-    }
-    h1, h2, h3 {
-        font-family: 'Arial', sans-serif;
-        color: #333;
-        font-weight: bold;
-        text-align: left;
-    }
-    h1 { font-size: 14pt; margin-top: 24pt; }
-    h2 { font-size: 12pt; margin-top: 18pt; }
-    p { text-indent: 4em; margin-bottom: 12pt; }
-    ul { list-style-position: inside; padding-left: 4em; }
-    .cover-page {
-        page-break-after: always;
-        text-align: center;
-        display: flex;
-        flex-direction: column;
-        justify-content: space-between;
-        height: 100%;
-    }
-    .cover-page h1, .cover-page h2, .cover-page h3 { text-align: center; }
-    .cover-footer { text-indent: 0; margin-top: auto; }
-    img { max-width: 95%; height: auto; display: block; margin: 10px auto; border: 1px solid #ccc; }
-    table { width: 100%; border-collapse: collapse; margin-top: 15px; margin-bottom: 15px; }
-    td { border: 1px solid #ccc; padding: 8px; }
-    .total-row { background-color: #f2f2f2; }
-    .content-wrapper { display: flex; flex-direction: row; gap: 20px; }
-    .column-left { flex: 1; }
-    .column-right { flex: 1.2; }
-    """
-    return css
-
+    template = _ambiente_templates().get_template(TEMPLATE_RELATORIO)
+    return template.render(_contexto_template(context))
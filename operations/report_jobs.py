@@ -0,0 +1,275 @@
+import os
+import time
+import uuid
+import atexit
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from operations.render_pool import criar_pool, pool_quebrado
+from operations.report_generator import (
+    chave_relatorio,
+    get_diagram_renderer,
+    get_pdf_report_cache_dir,
+    obter_cache_relatorios
+)
+
+logger = logging.getLogger(__name__)
+
+# Processos dedicados aos relatórios interativos (separados do pool de lotes e exportações)
+WORKERS_RELATORIOS_PADRAO = 2
+
+# Incremento de nice dos workers: o layout cede CPU às sessões do servidor no mesmo host
+PRIORIDADE_WORKERS = 10
+
+# Tempo que um job concluído continua consultável pelo ID
+RETENCAO_JOBS_S = 3600
+
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDO = 'concluido'
+ERRO = 'erro'
+
+_lock = threading.Lock()
+# Separado de _lock: protege o pool, a thread que o cria e os envios à espera dele
+_lock_pool = threading.Lock()
+_pool = None
+_thread_criacao = None
+# Jobs enviados enquanto o pool é criado: (job, argumentos de _gerar_relatorio_job)
+_envios_pendentes = []
+_jobs = {}
+_jobs_por_avaliacao = {}
+
+
+@dataclass
+class JobRelatorio:
+    """
+    Geração de um relatório PDF submetida ao pool de processos.
+
+    Enquanto o pool é criado, `futuro` é um Future local ainda não iniciado (estado
+    pendente); quando o pool fica pronto ele é trocado pelo Future do pool.
+    """
+    id: str
+    id_avaliacao: str
+    chave: list
+    futuro: object
+    criado_em: float = field(default_factory=time.time)
+    concluido_em: float = None
+
+
+def _gerar_relatorio_job(dados_icamento, dados_guindauto, renderizador):
+    """
+    Executado no pool: grava o PDF no cache em disco e devolve a chave com que ele foi
+    gravado (a data de emissão faz parte dela e é a do momento da geração) e o tamanho.
+    Falha se o PDF não puder ser gravado, em vez de concluir sem arquivo.
+
+    Returns:
+        tuple: (chave no cache, tamanho em bytes)
+    """
+    from operations.report_generator import generate_abnt_report
+
+    cache = obter_cache_relatorios()
+    chave = chave_relatorio(dados_icamento, dados_guindauto, renderizador)
+    pdf_bytes = cache.get(chave)
+    if pdf_bytes is None:
+        pdf_bytes = generate_abnt_report(dados_icamento, dados_guindauto, renderizador)
+        cache.set(chave, pdf_bytes)
+        if chave not in cache:
+            raise OSError("O PDF foi gerado, mas não pôde ser gravado no cache em disco.")
+    return chave, len(pdf_bytes)
+
+
+def numero_workers_relatorios():
+    """Processos do pool de relatórios: variável de ambiente REPORT_WORKERS ou o padrão."""
+    return max(1, int(os.getenv('REPORT_WORKERS', WORKERS_RELATORIOS_PADRAO)))
+
+
+def _pool_pronto():
+    """Pool utilizável, ou None (não criado, em criação ou quebrado). Chamar com _lock_pool."""
+    if _pool is not None and not pool_quebrado(_pool):
+        return _pool
+    return None
+
+
+def iniciar_pool_relatorios():
+    """
+    Inicia a criação do pool de relatórios em uma thread de fundo, se ele ainda não
+    existe (ou um worker morreu), e retorna sem esperar.
+
+    Criar e aquecer os processos leva alguns segundos; chamar esta função antes do
+    primeiro envio (ao exibir o botão de geração, por exemplo) esconde essa espera.
+    """
+    global _thread_criacao
+    with _lock_pool:
+        if _pool_pronto() is not None or _thread_criacao is not None:
+            return
+        _thread_criacao = threading.Thread(target=_criar_pool, name='criacao-pool-relatorios', daemon=True)
+        _thread_criacao.start()
+
+
+def _criar_pool():
+    """Executada na thread de fundo: cria o pool e envia a ele os jobs que o aguardavam."""
+    global _pool, _thread_criacao
+    with _lock_pool:
+        anterior = _pool
+    if anterior is not None:
+        anterior.shutdown(wait=False, cancel_futures=True)
+    pool, erro = None, None
+    try:
+        pool = criar_pool(
+            numero_workers_relatorios(),
+            prioridade=PRIORIDADE_WORKERS,
+            ambiente={'PDF_REPORT_CACHE_DIR': get_pdf_report_cache_dir()}
+        )
+        logger.info("Pool de relatórios iniciado com %d processos", numero_workers_relatorios())
+    except Exception as e:
+        erro = e
+        logger.error("Falha ao iniciar o pool de relatórios: %s", e)
+    with _lock_pool:
+        _pool = pool
+        _thread_criacao = None
+        pendentes = list(_envios_pendentes)
+        _envios_pendentes.clear()
+    for job, argumentos in pendentes:
+        if pool is None:
+            job.futuro.set_exception(erro)
+        else:
+            _submeter(job, pool, argumentos)
+
+
+def _submeter(job, pool, argumentos):
+    """Envia o job ao pool e passa a acompanhá-lo pelo Future do pool."""
+    try:
+        futuro = pool.submit(_gerar_relatorio_job, *argumentos)
+    except Exception as e:
+        job.futuro.set_exception(e)
+        return
+    with _lock:
+        job.futuro = futuro
+    futuro.add_done_callback(_ao_concluir(job))
+
+
+def _ao_concluir(job):
+    def callback(futuro):
+        job.concluido_em = time.time()
+        if futuro.cancelled():
+            return
+        erro = futuro.exception()
+        if erro is not None:
+            logger.error("Falha ao gerar o relatório %s (job %s): %s", job.id_avaliacao, job.id, erro)
+        else:
+            logger.info("Relatório %s gerado (job %s, %d bytes)", job.id_avaliacao, job.id, futuro.result()[1])
+    return callback
+
+
+def _remover_expirados(agora):
+    for id_job, job in list(_jobs.items()):
+        if job.concluido_em is not None and agora - job.concluido_em > RETENCAO_JOBS_S:
+            del _jobs[id_job]
+            if _jobs_por_avaliacao.get(job.id_avaliacao) == id_job:
+                del _jobs_por_avaliacao[job.id_avaliacao]
+
+
+def enviar_relatorio(dados_icamento, dados_guindauto, renderizador=None):
+    """
+    Coloca a geração do relatório na fila do pool de processos e retorna imediatamente.
+
+    A thread da requisição nunca faz o layout do PDF nem espera o pool ser criado: sem
+    pool pronto, o job fica pendente até a thread de criação enviá-lo. Se já existe um
+    job em andamento para os mesmos dados (outro clique ou outra sessão), o ID dele é
+    devolvido.
+
+    Args:
+        dados_icamento (pd.Series): Linha da aba de içamento (o nome é o ID da avaliação)
+        dados_guindauto (pd.Series): Linha da aba do guindauto
+        renderizador (str): Formato do diagrama (padrão: get_diagram_renderer())
+
+    Returns:
+        str: ID do job, para consultar com status_relatorio
+    """
+    renderizador = renderizador or get_diagram_renderer()
+    chave = chave_relatorio(dados_icamento, dados_guindauto, renderizador)
+    id_avaliacao = str(dados_icamento.name)
+    argumentos = (dados_icamento, dados_guindauto, renderizador)
+    with _lock:
+        _remover_expirados(time.time())
+        existente = _jobs.get(_jobs_por_avaliacao.get(id_avaliacao))
+        if existente is not None and existente.chave == chave and not existente.futuro.done():
+            return existente.id
+
+        espera = Future()
+        job = JobRelatorio(id=uuid.uuid4().hex, id_avaliacao=id_avaliacao, chave=chave, futuro=espera)
+        _jobs[job.id] = job
+        _jobs_por_avaliacao[id_avaliacao] = job.id
+    # Falhas antes do envio (criação do pool) concluem o Future de espera
+    espera.add_done_callback(_ao_concluir(job))
+
+    with _lock_pool:
+        pool = _pool_pronto()
+        if pool is None:
+            _envios_pendentes.append((job, argumentos))
+    if pool is None:
+        iniciar_pool_relatorios()
+        logger.info("Relatório %s aguardando o pool de relatórios (job %s)", id_avaliacao, job.id)
+    else:
+        _submeter(job, pool, argumentos)
+        logger.info("Relatório %s enviado ao pool (job %s)", id_avaliacao, job.id)
+    return job.id
+
+
+def status_relatorio(id_job):
+    """
+    Estado de um job de relatório.
+
+    Returns:
+        dict: 'estado' (pendente, executando, concluido ou erro), 'id_avaliacao',
+              'erro' (mensagem ou None) e 'decorrido_s'; None se o ID não existir
+              ou já tiver expirado
+    """
+    with _lock:
+        job = _jobs.get(id_job)
+    if job is None:
+        return None
+    futuro = job.futuro
+    erro = None
+    if futuro.done():
+        if futuro.cancelled():
+            estado, erro = ERRO, "Geração cancelada."
+        elif futuro.exception() is not None:
+            estado, erro = ERRO, str(futuro.exception())
+        else:
+            estado = CONCLUIDO
+    else:
+        estado = EXECUTANDO if futuro.running() else PENDENTE
+    fim = job.concluido_em or time.time()
+    return {
+        'estado': estado,
+        'id_avaliacao': job.id_avaliacao,
+        'erro': erro,
+        'decorrido_s': fim - job.criado_em
+    }
+
+
+def caminho_resultado_relatorio(id_job):
+    """
+    Caminho do PDF de um job concluído no cache em disco, pela chave que o próprio job
+    usou. None se o job não existe, não terminou ou falhou, ou se o arquivo já não está
+    no cache (removido pelo limite de tamanho).
+    """
+    with _lock:
+        job = _jobs.get(id_job)
+    if job is None or not job.futuro.done() or job.futuro.cancelled() or job.futuro.exception() is not None:
+        return None
+    chave_gerada, _ = job.futuro.result()
+    cache = obter_cache_relatorios()
+    return cache.caminho(chave_gerada) if chave_gerada in cache else None
+
+
+@atexit.register
+def encerrar_pool_relatorios():
+    global _pool
+    with _lock_pool:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
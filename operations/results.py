@@ -0,0 +1,150 @@
+import functools
+from dataclasses import dataclass, fields, astuple
+
+import numpy as np
+
+
+@dataclass(frozen=True, slots=True)
+class LoadResult:
+    """Resultado imutável de calcular_carga_total (valores em kg, margem em %)."""
+    peso_carga: float
+    peso_seguranca: float
+    peso_considerar: float
+    peso_cabos: float
+    peso_acessorios: float
+    carga_total: float
+    margem_seguranca_percentual: float
+
+    def to_dict(self):
+        """Dicionário no formato histórico de calcular_carga_total."""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def to_record(self):
+        """Registro NumPy estruturado (uma linha de LOAD_RESULT_DTYPE)."""
+        return np.array(astuple(self), dtype=LOAD_RESULT_DTYPE)[()]
+
+
+@dataclass(frozen=True, slots=True)
+class CraneValidation:
+    """Resultado imutável de validar_guindaste."""
+    porcentagem_segura: float
+    adequado: bool
+    mensagem: str
+    raio_max: float
+    extensao_lanca: float
+    capacidade_raio: float
+    capacidade_alcance: float
+    porcentagem_raio: float
+    porcentagem_alcance: float
+    angulo_lanca: float
+    angulo_minimo_fabricante: float
+    na_zona_atencao: bool
+
+    @property
+    def detalhes(self):
+        """Bloco 'detalhes' do formato histórico de validar_guindaste."""
+        return {
+            'raio_max': self.raio_max,
+            'extensao_lanca': self.extensao_lanca,
+            'capacidade_raio': self.capacidade_raio,
+            'capacidade_alcance': self.capacidade_alcance,
+            'porcentagem_raio': self.porcentagem_raio,
+            'porcentagem_alcance': self.porcentagem_alcance,
+            'angulo_lanca': self.angulo_lanca,
+            'angulo_minimo_fabricante': self.angulo_minimo_fabricante,
+            'na_zona_atencao': self.na_zona_atencao
+        }
+
+    def to_dict(self):
+        """Dicionário aninhado no formato histórico de validar_guindaste."""
+        return {
+            'porcentagem_segura': self.porcentagem_segura,
+            'adequado': self.adequado,
+            'mensagem': self.mensagem,
+            'detalhes': self.detalhes
+        }
+
+    def to_record(self):
+        """Registro NumPy estruturado (uma linha de CRANE_VALIDATION_DTYPE, sem a mensagem)."""
+        return np.array(
+            tuple(getattr(self, nome) for nome in CRANE_VALIDATION_DTYPE.names),
+            dtype=CRANE_VALIDATION_DTYPE
+        )[()]
+
+
+LOAD_RESULT_DTYPE = np.dtype([(f.name, np.float64) for f in fields(LoadResult)])
+
+CRANE_VALIDATION_DTYPE = np.dtype([
+    (f.name, np.bool_ if f.type is bool else np.float64)
+    for f in fields(CraneValidation) if f.name != 'mensagem'
+])
+
+
+def linha_planilha_icamento(id_avaliacao, data_hora, carga, validacao,
+                            fabricante_guindaste="", nome_guindaste="", modelo_guindaste=""):
+    """
+    Monta a linha da aba de içamento na ordem das colunas da planilha.
+
+    Args:
+        id_avaliacao (str): ID da avaliação
+        data_hora (str): Data e hora do registro
+        carga (LoadResult): Resultado do cálculo de carga
+        validacao (CraneValidation): Resultado da validação do guindaste
+        fabricante_guindaste (str): Fabricante informado
+        nome_guindaste (str): Nome do guindaste informado
+        modelo_guindaste (str): Modelo do guindaste informado
+
+    Returns:
+        list: Valores prontos para append_data_to_sheet
+    """
+    return [
+        id_avaliacao,
+        data_hora,
+        carga.peso_carga,
+        carga.margem_seguranca_percentual,
+        carga.peso_seguranca,
+        carga.peso_cabos,
+        carga.peso_acessorios,
+        carga.carga_total,
+        validacao.adequado,
+        f"{validacao.porcentagem_raio:.1f}%",
+        f"{validacao.porcentagem_alcance:.1f}%",
+        fabricante_guindaste,
+        nome_guindaste,
+        modelo_guindaste,
+        validacao.raio_max,
+        validacao.capacidade_raio,
+        validacao.extensao_lanca,
+        validacao.capacidade_alcance,
+        validacao.angulo_minimo_fabricante
+    ]
+
+
+@functools.lru_cache(maxsize=256)
+def tabela_resumo_carga(carga):
+    """
+    Tabela formatada do cálculo de carga exibida nas páginas da calculadora.
+
+    Memoizada pelo próprio LoadResult (imutável e hashable), de modo que reexecuções
+    com o mesmo resultado não refazem a formatação. Não modifique o DataFrame retornado.
+    """
+    import pandas as pd
+
+    return pd.DataFrame({
+        'Descrição': [
+            'Peso Carga',
+            'Margem (%)',
+            'Peso Segurança',
+            'Peso Acessórios',
+            'Peso Cabos (3%)',
+            'CARGA TOTAL'
+        ],
+        'Valor (kg)': [
+            f"{carga.peso_carga:.2f}",
+            f"{carga.margem_seguranca_percentual:.2f}",
+            f"{carga.peso_seguranca:.2f}",
+            f"{carga.peso_acessorios:.2f}",
+            f"{carga.peso_cabos:.2f}",
+            f"**{carga.carga_total:.2f}**"
+        ]
+    })
@@ -0,0 +1,346 @@
+import numpy as np
+import logging
+
+from operations.calc import (
+    MARGEM_EQUIPAMENTO_NOVO, MARGEM_EQUIPAMENTO_USADO, FATOR_CABOS, LIMITE_SEGURANCA
+)
+
+logger = logging.getLogger(__name__)
+
+# Resolução das varreduras sobre o gráfico de carga (em metros)
+PASSO_VARREDURA = 0.05
+
+
+def _saida(valores):
+    """Devolve float para entradas escalares e ndarray para entradas vetoriais."""
+    valores = np.asarray(valores)
+    return valores.item() if valores.ndim == 0 else valores
+
+
+def _angulo_graus(raio, extensao_lanca):
+    """Mesma fórmula de validar_guindaste para o ângulo da lança."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.degrees(np.arccos(np.clip(raio / extensao_lanca, -1.0, 1.0)))
+
+
+def _margem_seguranca(equipamento_novo):
+    """Margem de segurança (fração) conforme o estado do equipamento."""
+    return np.where(equipamento_novo, MARGEM_EQUIPAMENTO_NOVO, MARGEM_EQUIPAMENTO_USADO)
+
+
+def _utilizacao(carga_total, capacidade):
+    """Mesma fórmula de validar_guindaste para a porcentagem de utilização."""
+    return (carga_total / capacidade) * 100
+
+
+def carga_total_maxima(capacidade_raio, capacidade_alcance_max):
+    """
+    Maior carga total (kg) que mantém a utilização dentro do limite de 80%.
+
+    Args:
+        capacidade_raio (array-like): Capacidade no raio em kg
+        capacidade_alcance_max (array-like): Capacidade no alcance máximo em kg
+
+    Returns:
+        float ou ndarray: Carga total máxima admissível em kg
+    """
+    capacidade = np.minimum(
+        np.asarray(capacidade_raio, dtype=np.float64),
+        np.asarray(capacidade_alcance_max, dtype=np.float64)
+    )
+    carga = capacidade * (LIMITE_SEGURANCA / 100)
+
+    # Correção de arredondamento para que a validação direta não acuse 80.00000000000001%
+    for _ in range(4):
+        excede = _utilizacao(carga, capacidade) > LIMITE_SEGURANCA
+        if not np.any(excede):
+            break
+        carga = np.where(excede, np.nextafter(carga, 0.0), carga)
+
+    return _saida(carga)
+
+
+def peso_carga_maximo(capacidade_raio, capacidade_alcance_max, equipamento_novo=True, peso_acessorios=0):
+    """
+    Maior peso de carga (kg) que, após margem de segurança, cabos e acessórios,
+    mantém a utilização dentro de 80% — inverso de calcular_carga_total.
+
+    O resultado é ajustado para baixo no último dígito quando o arredondamento de
+    ponto flutuante faria o cálculo direto ultrapassar o limite.
+
+    Returns:
+        float ou ndarray: Peso máximo da carga em kg (0 quando os acessórios já esgotam a capacidade)
+    """
+    capacidade = np.minimum(
+        np.asarray(capacidade_raio, dtype=np.float64),
+        np.asarray(capacidade_alcance_max, dtype=np.float64)
+    )
+    limite = np.asarray(carga_total_maxima(capacidade_raio, capacidade_alcance_max), dtype=np.float64)
+    peso_acessorios = np.asarray(peso_acessorios, dtype=np.float64)
+    margem = _margem_seguranca(equipamento_novo)
+
+    peso = (limite - peso_acessorios) / ((1 + margem) * (1 + FATOR_CABOS))
+    peso = np.maximum(peso, 0.0)
+
+    # Correção de arredondamento: replica a ordem das operações de calcular_carga_total
+    for _ in range(8):
+        peso_considerar = peso + peso * margem
+        carga_total = peso_considerar + peso_acessorios + peso_considerar * FATOR_CABOS
+        excede = (_utilizacao(carga_total, capacidade) > LIMITE_SEGURANCA) & (peso > 0)
+        if not np.any(excede):
+            break
+        peso = np.where(excede, np.nextafter(peso, 0.0), peso)
+
+    return _saida(peso)
+
+
+def raio_maximo(extensao_lanca, angulo_minimo_fabricante):
+    """
+    Maior raio (m) que mantém o ângulo da lança igual ou acima do mínimo do fabricante.
+
+    Returns:
+        float ou ndarray: Raio máximo em metros
+    """
+    extensao_lanca = np.asarray(extensao_lanca, dtype=np.float64)
+    angulo_minimo = np.asarray(angulo_minimo_fabricante, dtype=np.float64)
+    raio = extensao_lanca * np.cos(np.radians(angulo_minimo))
+
+    for _ in range(4):
+        abaixo = _angulo_graus(raio, extensao_lanca) < angulo_minimo
+        if not np.any(abaixo):
+            break
+        raio = np.where(abaixo, np.nextafter(raio, 0.0), raio)
+
+    return _saida(raio)
+
+
+def extensao_minima(raio_max, angulo_minimo_fabricante):
+    """
+    Menor extensão da lança (m) que mantém o ângulo igual ou acima do mínimo do fabricante
+    para o raio informado.
+
+    Returns:
+        float ou ndarray: Extensão mínima da lança em metros
+    """
+    raio_max = np.asarray(raio_max, dtype=np.float64)
+    angulo_minimo = np.asarray(angulo_minimo_fabricante, dtype=np.float64)
+    extensao = raio_max / np.cos(np.radians(angulo_minimo))
+
+    for _ in range(4):
+        abaixo = _angulo_graus(raio_max, extensao) < angulo_minimo
+        if not np.any(abaixo):
+            break
+        extensao = np.where(abaixo, np.nextafter(extensao, np.inf), extensao)
+
+    return _saida(extensao)
+
+
+def _primeiro_valido(valores, validos, reverso=False):
+    """Para cada linha, o primeiro (ou último) valor válido da varredura; NaN se nenhum."""
+    if reverso:
+        valores, validos = valores[..., ::-1], validos[..., ::-1]
+    indice = np.argmax(validos, axis=-1)
+    encontrado = np.take_along_axis(validos, indice[..., None], axis=-1)[..., 0]
+    escolhido = np.take_along_axis(valores, indice[..., None], axis=-1)[..., 0]
+    return np.where(encontrado, escolhido, np.nan)
+
+
+def raio_maximo_grafico(grafico, carga_total, extensao_lanca, angulo_minimo_fabricante):
+    """
+    Maior raio (m) que atende simultaneamente o ângulo mínimo e o limite de 80%
+    da capacidade conservadora do gráfico de carga, para cada extensão da lança.
+
+    Returns:
+        float ou ndarray: Raio máximo em metros (NaN quando nenhum raio atende)
+    """
+    carga_total, extensao_lanca, angulo_minimo = np.broadcast_arrays(
+        np.asarray(carga_total, dtype=np.float64),
+        np.asarray(extensao_lanca, dtype=np.float64),
+        np.asarray(angulo_minimo_fabricante, dtype=np.float64)
+    )
+    raios = np.arange(grafico.raios[0], grafico.raios[-1] + PASSO_VARREDURA / 2, PASSO_VARREDURA)
+    r = raios[None, :]
+    lanca = extensao_lanca.reshape(-1, 1)
+    capacidade = grafico.capacidade_conservadora(r, lanca)
+    with np.errstate(divide='ignore'):
+        utilizacao = np.where(capacidade > 0, carga_total.reshape(-1, 1) / capacidade * 100, np.inf)
+    validos = (
+        (r <= lanca) &
+        (_angulo_graus(r, lanca) >= angulo_minimo.reshape(-1, 1)) &
+        (utilizacao <= LIMITE_SEGURANCA)
+    )
+    resultado = _primeiro_valido(np.broadcast_to(r, validos.shape), validos, reverso=True)
+    return _saida(resultado.reshape(extensao_lanca.shape))
+
+
+def extensao_minima_grafico(grafico, carga_total, raio_max, angulo_minimo_fabricante):
+    """
+    Menor extensão da lança (m) que atende simultaneamente o ângulo mínimo e o limite
+    de 80% da capacidade conservadora do gráfico de carga, para cada raio.
+
+    Returns:
+        float ou ndarray: Extensão mínima em metros (NaN quando nenhuma extensão atende)
+    """
+    carga_total, raio_max, angulo_minimo = np.broadcast_arrays(
+        np.asarray(carga_total, dtype=np.float64),
+        np.asarray(raio_max, dtype=np.float64),
+        np.asarray(angulo_minimo_fabricante, dtype=np.float64)
+    )
+    lancas = np.arange(
+        grafico.comprimentos_lanca[0],
+        grafico.comprimentos_lanca[-1] + PASSO_VARREDURA / 2,
+        PASSO_VARREDURA
+    )
+    lanca = lancas[None, :]
+    r = raio_max.reshape(-1, 1)
+    capacidade = grafico.capacidade_conservadora(r, lanca)
+    with np.errstate(divide='ignore'):
+        utilizacao = np.where(capacidade > 0, carga_total.reshape(-1, 1) / capacidade * 100, np.inf)
+    validos = (
+        (r <= lanca) &
+        (_angulo_graus(r, lanca) >= angulo_minimo.reshape(-1, 1)) &
+        (utilizacao <= LIMITE_SEGURANCA)
+    )
+    resultado = _primeiro_valido(np.broadcast_to(lanca, validos.shape), validos)
+    return _saida(resultado.reshape(raio_max.shape))
+
+
+def envelope_seguro(carga_total, raios, extensoes, angulo_minimo_fabricante,
+                    capacidade_raio=None, capacidade_alcance_max=None, grafico=None):
+    """
+    Avalia de uma só vez uma grade raio × extensão da lança com as mesmas regras de
+    validar_guindaste, formando o envelope de trabalho seguro para uma carga.
+
+    A capacidade vem do gráfico de carga (critério conservador) quando informado;
+    caso contrário, das duas capacidades digitadas.
+
+    Args:
+        carga_total (float): Carga total em kg
+        raios (array-like): Raios a avaliar em metros (colunas da grade)
+        extensoes (array-like): Extensões da lança a avaliar em metros (linhas da grade)
+        angulo_minimo_fabricante (float): Ângulo mínimo em graus
+        capacidade_raio (float): Capacidade no raio em kg (sem gráfico)
+        capacidade_alcance_max (float): Capacidade no alcance máximo em kg (sem gráfico)
+        grafico (LoadChart): Gráfico de carga do guindaste (opcional)
+
+    Returns:
+        dict: Grades [extensão × raio] 'angulo_lanca', 'porcentagem_segura', 'angulo_ok',
+              'capacidade_ok', 'geometria_ok' e 'seguro', além dos eixos 'raios' e 'extensoes'
+    """
+    raios = np.asarray(raios, dtype=np.float64)
+    extensoes = np.asarray(extensoes, dtype=np.float64)
+    r = raios[None, :]
+    lanca = extensoes[:, None]
+
+    if grafico is not None:
+        capacidade = grafico.capacidade_conservadora(r, lanca)
+    elif capacidade_raio is not None and capacidade_alcance_max is not None:
+        capacidade = np.full(
+            (extensoes.size, raios.size), min(capacidade_raio, capacidade_alcance_max), dtype=np.float64
+        )
+    else:
+        raise ValueError("Informe o gráfico de carga ou as capacidades no raio e no alcance.")
+
+    geometria_ok = (r > 0) & (r < lanca)
+    angulo = np.where(geometria_ok, _angulo_graus(r, lanca), np.nan)
+    with np.errstate(divide='ignore'):
+        porcentagem = np.where(capacidade > 0, carga_total / capacidade * 100, np.inf)
+
+    angulo_ok = geometria_ok & (angulo >= angulo_minimo_fabricante)
+    capacidade_ok = porcentagem <= LIMITE_SEGURANCA
+
+    return {
+        'raios': raios,
+        'extensoes': extensoes,
+        'angulo_lanca': angulo,
+        'porcentagem_segura': porcentagem,
+        'geometria_ok': geometria_ok,
+        'angulo_ok': angulo_ok,
+        'capacidade_ok': capacidade_ok,
+        'seguro': angulo_ok & capacidade_ok
+    }
+
+
+def mapa_raio_carga(raios, cargas_totais, extensao_lanca, angulo_minimo_fabricante,
+                    capacidade_raio=None, capacidade_alcance_max=None, grafico=None):
+    """
+    Superfície what-if raio × carga total para uma extensão de lança fixa, calculada
+    numa única passagem vetorizada com as regras de validar_guindaste.
+
+    Args:
+        raios (array-like): Raios em metros (colunas)
+        cargas_totais (array-like): Cargas totais em kg (linhas)
+        extensao_lanca (float): Extensão da lança em metros
+        angulo_minimo_fabricante (float): Ângulo mínimo em graus
+        capacidade_raio (float): Capacidade no raio em kg (sem gráfico)
+        capacidade_alcance_max (float): Capacidade no alcance máximo em kg (sem gráfico)
+        grafico (LoadChart): Gráfico de carga do guindaste (opcional)
+
+    Returns:
+        dict: 'porcentagem_segura' e 'seguro' [carga × raio], 'angulo_lanca' e
+              'angulo_ok' [raio], além dos eixos 'raios' e 'cargas_totais'
+    """
+    raios = np.asarray(raios, dtype=np.float64)
+    cargas_totais = np.asarray(cargas_totais, dtype=np.float64)
+
+    if grafico is not None:
+        capacidade = grafico.capacidade_conservadora(raios, extensao_lanca)
+    elif capacidade_raio is not None and capacidade_alcance_max is not None:
+        capacidade = np.full(raios.shape, min(capacidade_raio, capacidade_alcance_max), dtype=np.float64)
+    else:
+        raise ValueError("Informe o gráfico de carga ou as capacidades no raio e no alcance.")
+
+    geometria_ok = (raios > 0) & (raios < extensao_lanca)
+    angulo = np.where(geometria_ok, _angulo_graus(raios, extensao_lanca), np.nan)
+    angulo_ok = geometria_ok & (angulo >= angulo_minimo_fabricante)
+    with np.errstate(divide='ignore'):
+        porcentagem = np.where(
+            capacidade[None, :] > 0, _utilizacao(cargas_totais[:, None], capacidade[None, :]), np.inf
+        )
+
+    return {
+        'raios': raios,
+        'cargas_totais': cargas_totais,
+        'angulo_lanca': angulo,
+        'angulo_ok': angulo_ok,
+        'porcentagem_segura': porcentagem,
+        'seguro': angulo_ok[None, :] & (porcentagem <= LIMITE_SEGURANCA)
+    }
+
+
+def limites_operacao(carga_total, capacidade_raio, capacidade_alcance_max, raio_max,
+                     extensao_lanca, angulo_minimo_fabricante, equipamento_novo=True, peso_acessorios=0,
+                     grafico=None):
+    """
+    Resume os limites da configuração atual para exibição junto ao diagrama.
+
+    Com o gráfico de carga do guindaste, o raio máximo e a extensão mínima também
+    respeitam o limite de 80% da capacidade do gráfico (raio_maximo_grafico e
+    extensao_minima_grafico); sem ele, só o ângulo mínimo os limita.
+
+    Args:
+        grafico (LoadChart): Gráfico de carga do guindaste (opcional)
+
+    Returns:
+        dict: 'carga_total_maxima', 'peso_carga_maximo', 'raio_maximo', 'extensao_minima'
+              (NaN quando nenhuma configuração atende) e 'folga_carga' (kg disponíveis
+              até o limite de 80%)
+    """
+    carga_maxima = carga_total_maxima(capacidade_raio, capacidade_alcance_max)
+    if grafico is not None:
+        raio_limite = raio_maximo_grafico(grafico, carga_total, extensao_lanca, angulo_minimo_fabricante)
+        extensao_limite = extensao_minima_grafico(grafico, carga_total, raio_max, angulo_minimo_fabricante)
+    else:
+        raio_limite = raio_maximo(extensao_lanca, angulo_minimo_fabricante)
+        extensao_limite = extensao_minima(raio_max, angulo_minimo_fabricante)
+    limites = {
+        'carga_total_maxima': carga_maxima,
+        'peso_carga_maximo': peso_carga_maximo(
+            capacidade_raio, capacidade_alcance_max, equipamento_novo, peso_acessorios
+        ),
+        'raio_maximo': raio_limite,
+        'extensao_minima': extensao_limite,
+        'folga_carga': carga_maxima - carga_total
+    }
+    logger.debug("Limites de operação calculados: %s", limites)
+    return limites
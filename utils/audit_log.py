@@ -0,0 +1,177 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Variáveis de ambiente que ajustam o log sem alterar código
+ENV_NIVEL = 'LOG_LEVEL'
+ENV_CAMINHO = 'AUDIT_LOG_PATH'
+ENV_AMOSTRAGEM_DEBUG = 'LOG_DEBUG_SAMPLE_RATE'
+
+NIVEL_PADRAO = 'INFO'
+# Fração dos eventos DEBUG (alto volume) que chega ao log
+TAXA_AMOSTRAGEM_DEBUG_PADRAO = 0.01
+
+# ID da avaliação em curso, propagado para todos os registros emitidos no mesmo contexto
+_id_avaliacao = contextvars.ContextVar('id_avaliacao', default=None)
+
+# Atributos padrão de LogRecord; o que não estiver aqui é tratado como campo extra
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'id_avaliacao'}
+
+_lock = threading.Lock()
+_listener = None
+
+
+def definir_id_avaliacao(id_avaliacao):
+    """Associa os próximos registros do contexto atual ao ID de avaliação informado."""
+    return _id_avaliacao.set(id_avaliacao)
+
+
+def id_avaliacao_atual():
+    return _id_avaliacao.get()
+
+
+@contextmanager
+def contexto_avaliacao(id_avaliacao):
+    """Bloco em que todos os registros de log carregam o ID de avaliação informado."""
+    token = _id_avaliacao.set(id_avaliacao)
+    try:
+        yield id_avaliacao
+    finally:
+        _id_avaliacao.reset(token)
+
+
+class FiltroContexto(logging.Filter):
+    """Anexa o ID de avaliação ao registro na thread que o emitiu (antes de enfileirar)."""
+
+    def filter(self, record):
+        if getattr(record, 'id_avaliacao', None) is None:
+            record.id_avaliacao = _id_avaliacao.get()
+        return True
+
+
+class FiltroAmostragem(logging.Filter):
+    """
+    Deixa passar apenas uma fração dos registros até nivel_maximo (DEBUG por padrão).
+    Registros de nível mais alto nunca são descartados.
+    """
+
+    def __init__(self, taxa, nivel_maximo=logging.DEBUG):
+        super().__init__()
+        self.taxa = max(0.0, min(1.0, float(taxa)))
+        self.nivel_maximo = nivel_maximo
+
+    def filter(self, record):
+        if record.levelno > self.nivel_maximo or self.taxa >= 1.0:
+            return True
+        return random.random() < self.taxa
+
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro: horário UTC, nível, logger, mensagem, ID de avaliação e extras."""
+
+    def format(self, record):
+        dados = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': record.getMessage(),
+            'id_avaliacao': getattr(record, 'id_avaliacao', None)
+        }
+        for chave, valor in record.__dict__.items():
+            if chave not in _ATRIBUTOS_PADRAO and not chave.startswith('_'):
+                dados[chave] = valor
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            dados['excecao'] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class _QueueHandlerAuditoria(QueueHandler):
+    """
+    Enfileira o registro já com a mensagem resolvida e o traceback em texto, sem
+    formatar a linha final: a serialização JSON e a escrita ficam com o listener.
+    """
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _criar_handler_saida(caminho):
+    if caminho:
+        diretorio = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(diretorio, exist_ok=True)
+        handler = logging.FileHandler(caminho, encoding='utf-8')
+    else:
+        handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(FormatadorJSON())
+    return handler
+
+
+def configurar_logging(nivel=None, caminho=None, taxa_amostragem_debug=None):
+    """
+    Configura o log da aplicação uma única vez por processo (chamadas seguintes são ignoradas).
+
+    Os registros passam pelo logger raiz para um QueueHandler; um QueueListener em
+    thread própria os grava como JSON lines, de modo que a escrita não ocorre na thread
+    da requisição. Eventos DEBUG são amostrados.
+
+    Args:
+        nivel (str): Nível mínimo (padrão: variável LOG_LEVEL ou INFO)
+        caminho (str): Arquivo JSON lines (padrão: variável AUDIT_LOG_PATH; sem ela, stderr)
+        taxa_amostragem_debug (float): Fração de eventos DEBUG mantida
+            (padrão: variável LOG_DEBUG_SAMPLE_RATE ou 0.01)
+
+    Returns:
+        QueueListener: Listener em execução
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        nivel = (nivel or os.getenv(ENV_NIVEL, NIVEL_PADRAO)).upper()
+        caminho = caminho or os.getenv(ENV_CAMINHO)
+        if taxa_amostragem_debug is None:
+            taxa_amostragem_debug = float(os.getenv(ENV_AMOSTRAGEM_DEBUG, TAXA_AMOSTRAGEM_DEBUG_PADRAO))
+
+        fila = queue.SimpleQueue()
+        handler_fila = _QueueHandlerAuditoria(fila)
+        handler_fila.addFilter(FiltroAmostragem(taxa_amostragem_debug))
+        handler_fila.addFilter(FiltroContexto())
+
+        raiz = logging.getLogger()
+        for handler in list(raiz.handlers):
+            raiz.removeHandler(handler)
+        raiz.addHandler(handler_fila)
+        raiz.setLevel(nivel)
+
+        _listener = QueueListener(fila, _criar_handler_saida(caminho), respect_handler_level=True)
+        _listener.start()
+        atexit.register(encerrar_logging)
+        return _listener
+
+
+def encerrar_logging():
+    """Esvazia a fila e encerra o listener (registrado no atexit)."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
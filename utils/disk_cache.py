@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import uuid
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Fração do tamanho máximo mantida após uma limpeza (evita limpar a cada gravação)
+FRACAO_APOS_LIMPEZA = 0.9
+
+# A cada quantas gravações o tamanho em disco é recontado (outros processos também gravam)
+GRAVACOES_ENTRE_RECONTAGENS = 64
+
+# Idade a partir da qual um .tmp é considerado abandonado (processo encerrado no meio da gravação)
+IDADE_TEMPORARIO_ABANDONADO_S = 600
+
+
+class DiskCache:
+    """
+    Cache em disco endereçado por conteúdo, compartilhado por todos os processos do host.
+
+    A chave (qualquer valor serializável em JSON) é convertida em um hash SHA-256 que
+    dá nome ao arquivo. As gravações são atômicas (arquivo temporário + os.replace),
+    então leitores concorrentes nunca veem um arquivo parcial. Cada leitura atualiza
+    o mtime do arquivo; quando o total ultrapassa o limite, os arquivos com mtime mais
+    antigo são removidos (LRU aproximado).
+
+    O limite vale para o diretório inteiro: caches com extensões diferentes no mesmo
+    diretório (os diagramas PNG e SVG, por exemplo) dividem o mesmo limite e a remoção
+    escolhe os arquivos menos usados entre todos eles.
+
+    Falhas de disco nunca interrompem o chamador: get retorna None e set apenas registra
+    o erro no log.
+
+    Processos de usuários diferentes podem compartilhar o cache se a umask e as
+    permissões do diretório permitirem: os arquivos recebem as permissões de um open()
+    comum, e a remoção de arquivos alheios exige escrita no diretório (por exemplo, um
+    grupo comum com umask 002).
+    """
+
+    def __init__(self, diretorio, tamanho_maximo_bytes, extensao='.bin'):
+        if tamanho_maximo_bytes <= 0:
+            raise ValueError("O tamanho máximo do cache em disco deve ser positivo.")
+        self.diretorio = diretorio
+        self.tamanho_maximo_bytes = int(tamanho_maximo_bytes)
+        self.extensao = extensao
+        self._lock = threading.Lock()
+        self._tamanho_estimado = None
+        self._gravacoes = 0
+        self.acertos = 0
+        self.falhas = 0
+
+    @staticmethod
+    def hash_chave(chave):
+        """Hash SHA-256 da representação JSON canônica da chave."""
+        texto = json.dumps(chave, sort_keys=True, ensure_ascii=False, default=str, separators=(',', ':'))
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def caminho(self, chave):
+        digest = self.hash_chave(chave)
+        return os.path.join(self.diretorio, digest[:2], digest + self.extensao)
+
+    def get(self, chave):
+        caminho = self.caminho(chave)
+        try:
+            with open(caminho, 'rb') as f:
+                dados = f.read()
+            os.utime(caminho)
+        except FileNotFoundError:
+            with self._lock:
+                self.falhas += 1
+            return None
+        except OSError as e:
+            logger.warning("Falha ao ler o cache em disco %s: %s", caminho, e)
+            with self._lock:
+                self.falhas += 1
+            return None
+        with self._lock:
+            self.acertos += 1
+        return dados
+
+    def set(self, chave, dados):
+        caminho = self.caminho(chave)
+        diretorio = os.path.dirname(caminho)
+        temp_path = None
+        try:
+            os.makedirs(diretorio, exist_ok=True)
+            # Criado com 0666 e a umask aplicada pelo kernel, como um open() comum
+            # (mkstemp usaria 0600, ilegível para processos de outros usuários)
+            temp_path = f"{caminho}.{uuid.uuid4().hex}.tmp"
+            fd = os.open(temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(dados)
+            os.replace(temp_path, caminho)
+        except OSError as e:
+            logger.warning("Falha ao gravar no cache em disco %s: %s", caminho, e)
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        with self._lock:
+            self._gravacoes += 1
+            if self._tamanho_estimado is None or self._gravacoes % GRAVACOES_ENTRE_RECONTAGENS == 0:
+                self._tamanho_estimado = self._contar_bytes()
+            else:
+                self._tamanho_estimado += len(dados)
+            if self._tamanho_estimado > self.tamanho_maximo_bytes:
+                self._tamanho_estimado = self._remover_excedente()
+
+    def __contains__(self, chave):
+        return os.path.exists(self.caminho(chave))
+
+    def _arquivos(self):
+        """
+        Lista (mtime, tamanho, caminho) dos arquivos do diretório, de qualquer extensão.
+        Temporários abandonados entram na conta (são os mais antigos e os primeiros a sair);
+        os de gravações em andamento, não.
+        """
+        limite_temporario = time.time() - IDADE_TEMPORARIO_ABANDONADO_S
+        arquivos = []
+        try:
+            subdiretorios = list(os.scandir(self.diretorio))
+        except FileNotFoundError:
+            return arquivos
+        for sub in subdiretorios:
+            if not sub.is_dir():
+                continue
+            try:
+                for entrada in os.scandir(sub.path):
+                    if not entrada.is_file():
+                        continue
+                    info = entrada.stat()
+                    if not entrada.name.endswith('.tmp') or info.st_mtime < limite_temporario:
+                        arquivos.append((info.st_mtime, info.st_size, entrada.path))
+            except FileNotFoundError:
+                continue
+        return arquivos
+
+    def _contar_bytes(self):
+        return sum(tamanho for _, tamanho, _ in self._arquivos())
+
+    def _remover_excedente(self):
+        """
+        Remove os temporários abandonados e os arquivos menos usados até o total ficar
+        abaixo do alvo; retorna o novo total.
+        """
+        arquivos = sorted(self._arquivos())
+        # Temporários abandonados primeiro, todos eles; depois os demais por mtime
+        arquivos.sort(key=lambda arquivo: not arquivo[2].endswith('.tmp'))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        alvo = self.tamanho_maximo_bytes * FRACAO_APOS_LIMPEZA
+        removidos = 0
+        for _, tamanho, caminho in arquivos:
+            if total <= alvo and not caminho.endswith('.tmp'):
+                break
+            try:
+                os.remove(caminho)
+                removidos += 1
+            except FileNotFoundError:
+                pass  # já removido por outro processo
+            except OSError as e:
+                logger.warning("Falha ao remover %s do cache em disco: %s", caminho, e)
+                continue
+            total -= tamanho
+        logger.info("Cache em disco %s: %d arquivos removidos, %d bytes em uso", self.diretorio, removidos, total)
+        return total
+
+    def clear(self):
+        with self._lock:
+            for _, _, caminho in self._arquivos():
+                if not caminho.endswith(self.extensao):
+                    continue  # arquivos de outro cache no mesmo diretório
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+            self._tamanho_estimado = None  # outros caches podem ter arquivos no diretório
+            self.acertos = 0
+            self.falhas = 0
+
+    def estatisticas(self):
+        """Retorna acertos/falhas deste processo e a ocupação atual em disco."""
+        arquivos = self._arquivos()
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / total if total else 0.0,
+                'arquivos': len(arquivos),
+                'bytes': sum(tamanho for _, tamanho, _ in arquivos),
+                'bytes_maximo': self.tamanho_maximo_bytes
+            }
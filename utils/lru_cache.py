@@ -0,0 +1,107 @@
+import threading
+import functools
+from collections import OrderedDict
+
+# Casas decimais usadas para normalizar entradas numéricas das chaves do cache
+CASAS_DECIMAIS_CHAVE = 6
+
+
+class LRUCache:
+    """
+    Cache LRU limitado e seguro para uso concorrente (um lock por instância).
+
+    Instâncias definidas em nível de módulo são compartilhadas por todas as sessões
+    do Streamlit servidas pelo mesmo processo.
+    """
+
+    def __init__(self, tamanho_maximo=256):
+        if tamanho_maximo <= 0:
+            raise ValueError("O tamanho máximo do cache deve ser positivo.")
+        self.tamanho_maximo = tamanho_maximo
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def get(self, chave, padrao=None):
+        with self._lock:
+            try:
+                valor = self._dados[chave]
+            except KeyError:
+                self.falhas += 1
+                return padrao
+            self._dados.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def set(self, chave, valor):
+        with self._lock:
+            self._dados[chave] = valor
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.tamanho_maximo:
+                self._dados.popitem(last=False)
+
+    def __contains__(self, chave):
+        with self._lock:
+            return chave in self._dados
+
+    def __len__(self):
+        with self._lock:
+            return len(self._dados)
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+            self.acertos = 0
+            self.falhas = 0
+
+    def estatisticas(self):
+        """Retorna contadores de acertos/falhas, taxa de acerto e ocupação."""
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / total if total else 0.0,
+                'tamanho': len(self._dados),
+                'tamanho_maximo': self.tamanho_maximo
+            }
+
+
+def normalizar_valor(valor, casas_decimais=CASAS_DECIMAIS_CHAVE):
+    """Normaliza um argumento para compor a chave: números viram float arredondado."""
+    if isinstance(valor, bool) or valor is None or isinstance(valor, str):
+        return valor
+    try:
+        return round(float(valor), casas_decimais)
+    except (TypeError, ValueError):
+        return valor
+
+
+def memoizar(cache, casas_decimais=CASAS_DECIMAIS_CHAVE):
+    """
+    Decorador que memoiza a função no cache informado, com chave formada pelos
+    argumentos normalizados (números arredondados). A função é executada com os
+    valores normalizados, de modo que o resultado depende apenas da chave.
+
+    Exceções não são armazenadas. O resultado devolvido é compartilhado entre
+    chamadas e não deve ser modificado pelo chamador.
+    """
+    def decorador(funcao):
+        ausente = object()
+
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            args = tuple(normalizar_valor(a, casas_decimais) for a in args)
+            kwargs = {k: normalizar_valor(v, casas_decimais) for k, v in kwargs.items()}
+            chave = (funcao.__qualname__, args, tuple(sorted(kwargs.items())))
+            resultado = cache.get(chave, ausente)
+            if resultado is ausente:
+                resultado = funcao(*args, **kwargs)
+                cache.set(chave, resultado)
+            return resultado
+
+        envoltorio.cache = cache
+        return envoltorio
+
+    return decorador